@@ -0,0 +1,140 @@
+"""
+已解码题库的进程内缓存。
+
+按题库id缓存get_questions_by_quiz_name解码出的题目列表, 按估算的内存占用做LRU淘汰。
+大题库只按id读取抽中的题, 这些题另外按题目id缓存, 重新开始考试时不必再次解码。
+读写两个数据库连接共用同一个缓存, 写入题库时由QuizDatabase负责使对应条目失效。
+缓存中的Question对象被多处共享, 调用方不要修改。
+"""
+import sys
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+# 按id缓存的单个题目占用的内存上限为max_bytes的该比例
+QUESTION_CACHE_SHARE = 8
+
+
+def estimate_question_size(q):
+    # 选项和答案大多是intern过的共享字符串, 这里仍按每题独占估算, 结果偏保守
+    size = sys.getsizeof(q) + sys.getsizeof(q.question)
+    size += sys.getsizeof(q.options) + sum(sys.getsizeof(opt) for opt in q.options)
+    return size + sys.getsizeof(q.answer_key)
+
+
+class BankCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_question_bytes=None):
+        self.max_bytes = max_bytes
+        if max_question_bytes is None:
+            max_question_bytes = max_bytes // QUESTION_CACHE_SHARE
+        self.max_question_bytes = max_question_bytes
+        self._entries = OrderedDict()
+        # 题目id -> (quiz_id, Question, 估算大小)
+        self._questions = OrderedDict()
+        self._lock = threading.Lock()
+        self.size_bytes = 0
+        self.question_bytes = 0
+        self.question_hits = 0
+        self.question_misses = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, quiz_id):
+        with self._lock:
+            entry = self._entries.get(quiz_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(quiz_id)
+            self.hits += 1
+            return entry[0]
+
+    def peek(self, quiz_id):
+        """读取缓存但不计入命中统计, 也不改变淘汰顺序"""
+        with self._lock:
+            entry = self._entries.get(quiz_id)
+            return entry[0] if entry else None
+
+    def put(self, quiz_id, questions):
+        size = sys.getsizeof(questions) + sum(estimate_question_size(q) for q in questions)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(quiz_id, None)
+            if old:
+                self.size_bytes -= old[1]
+            self._entries[quiz_id] = (questions, size)
+            self.size_bytes += size
+
+            while self.size_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size_bytes -= evicted_size
+                self.evictions += 1
+
+    def get_questions(self, ids):
+        """返回{题目id: Question}, 只包含已缓存的题目"""
+        found = {}
+        with self._lock:
+            for question_id in ids:
+                entry = self._questions.get(question_id)
+                if entry is not None:
+                    self._questions.move_to_end(question_id)
+                    found[question_id] = entry[1]
+            self.question_hits += len(found)
+            self.question_misses += len(ids) - len(found)
+        return found
+
+    def put_questions(self, quiz_id, questions):
+        if self.max_question_bytes <= 0:
+            return
+
+        with self._lock:
+            for q in questions:
+                size = estimate_question_size(q)
+                old = self._questions.pop(q.id, None)
+                if old:
+                    self.question_bytes -= old[2]
+                self._questions[q.id] = (quiz_id, q, size)
+                self.question_bytes += size
+
+            while self.question_bytes > self.max_question_bytes:
+                _, (_, _, evicted_size) = self._questions.popitem(last=False)
+                self.question_bytes -= evicted_size
+
+    def invalidate(self, quiz_id=None):
+        """使某个题库的缓存失效, quiz_id为None时清空全部缓存"""
+        with self._lock:
+            if quiz_id is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                self.size_bytes = 0
+                self._questions.clear()
+                self.question_bytes = 0
+            else:
+                entry = self._entries.pop(quiz_id, None)
+                removed = 1 if entry else 0
+                if entry:
+                    self.size_bytes -= entry[1]
+                stale = [qid for qid, (owner, _, _) in self._questions.items() if owner == quiz_id]
+                for qid in stale:
+                    self.question_bytes -= self._questions.pop(qid)[2]
+            self.invalidations += removed
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'size_bytes': self.size_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'question_entries': len(self._questions),
+                'question_bytes': self.question_bytes,
+                'question_hits': self.question_hits,
+                'question_misses': self.question_misses,
+            }
@@ -0,0 +1,195 @@
+"""
+纸质考试答题卡的批量判分。
+
+答题卡按题目id作答, 判分规则与QuizSession相同(Question.grade)。
+答题卡分批交给进程池判分, 同时在途的批次数有上限, 每名考生的结果按输入顺序
+逐行写出, 每题的作答统计在全部判完后写出, 内存占用与答题卡数量无关。
+
+支持的输入格式:
+  JSONL: 每行 {"student": "张三", "answers": {"题目id": "A", "题目id": ["A", "C"]}}
+  CSV:   表头为 student,question_id,answer, 同一考生的行需要连续;
+         多选题答案写作"AC"或"A,C"
+"""
+import csv
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby, islice
+
+SHEET_BATCH_SIZE = 2000
+
+STUDENT_FIELDS = ['student', 'score', 'max_score', 'correct', 'answered', 'total', 'unknown']
+QUESTION_FIELDS = ['question_id', 'type', 'attempts', 'answered', 'correct', 'accuracy']
+
+
+def parse_choice(value, question):
+    """把答题卡上的答案转换为Question.grade接受的形式"""
+    if question.is_multi:
+        if isinstance(value, list):
+            return [str(v).strip().upper() for v in value]
+        return [c for c in str(value or '').upper() if 'A' <= c <= 'Z']
+    if value is None:
+        return ''
+    return str(value).strip()
+
+
+def iter_jsonl_sheets(file_path):
+    with open(file_path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            sheet = json.loads(line)
+            yield str(sheet['student']), list(sheet.get('answers', {}).items())
+
+
+def iter_csv_sheets(file_path):
+    with open(file_path, newline='', encoding='utf-8-sig') as f:
+        rows = csv.DictReader(f)
+        for student, group in groupby(rows, key=lambda row: row['student']):
+            yield student, [(row['question_id'], row['answer']) for row in group]
+
+
+def iter_sheets(file_path):
+    if file_path.lower().endswith('.csv'):
+        return iter_csv_sheets(file_path)
+    return iter_jsonl_sheets(file_path)
+
+
+def grade_sheet(answer_key, student, answers):
+    """
+    判一张答题卡, 返回(考生结果, [(题目id, 是否作答, 是否正确), ...])。
+    答题卡上不属于该题库的题目id计入unknown, 不影响得分。
+    """
+    score = max_score = correct = answered = unknown = 0
+    marks = []
+    for question_id, value in answers:
+        try:
+            question_id = int(question_id)
+            question = answer_key[question_id]
+        except (KeyError, ValueError):
+            unknown += 1
+            continue
+
+        choice = parse_choice(value, question)
+        is_correct, points = question.grade(choice)
+        max_score += question.score
+        score += points
+        correct += is_correct
+        answered += bool(choice)
+        marks.append((question_id, bool(choice), is_correct))
+
+    result = {
+        'student': student,
+        'score': score,
+        'max_score': max_score,
+        'correct': correct,
+        'answered': answered,
+        'total': len(marks),
+        'unknown': unknown,
+    }
+    return result, marks
+
+
+def grade_batch(answer_key, sheets):
+    """判一批答题卡, 返回考生结果列表和这一批的每题统计{题目id: [作答人次, 答题数, 正确数]}"""
+    results = []
+    question_stats = {}
+    for student, answers in sheets:
+        result, marks = grade_sheet(answer_key, student, answers)
+        results.append(result)
+        for question_id, was_answered, is_correct in marks:
+            stats = question_stats.get(question_id)
+            if stats is None:
+                stats = question_stats[question_id] = [0, 0, 0]
+            stats[0] += 1
+            stats[1] += was_answered
+            stats[2] += is_correct
+    return results, question_stats
+
+
+_worker_answer_key = None
+
+
+def _init_worker(answer_key):
+    global _worker_answer_key
+    _worker_answer_key = answer_key
+
+
+def _grade_batch_in_worker(sheets):
+    return grade_batch(_worker_answer_key, sheets)
+
+
+def _batches(sheets, batch_size):
+    sheets = iter(sheets)
+    while True:
+        batch = list(islice(sheets, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def iter_graded_batches(answer_key, sheets, workers=None, batch_size=SHEET_BATCH_SIZE):
+    """
+    按输入顺序产生每批的判分结果。workers为1时在当前进程中判分,
+    否则使用进程池, 同时在途的批次数不超过进程数的两倍。
+    """
+    batches = _batches(sheets, batch_size)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for batch in batches:
+            yield grade_batch(answer_key, batch)
+        return
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(answer_key,)) as pool:
+        max_pending = workers * 2
+        pending = deque()
+        for batch in batches:
+            pending.append(pool.submit(_grade_batch_in_worker, batch))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def grade_sheets(answer_key, sheets, student_output, question_output,
+                 workers=None, batch_size=SHEET_BATCH_SIZE, progress_callback=None):
+    """
+    判分并把考生结果逐批写入student_output(CSV), 每题统计写入question_output(CSV)。
+    progress_callback(已判答题卡数)在每批写出后调用, 返回答题卡总数。
+    """
+    question_stats = {}
+    graded = 0
+    with open(student_output, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=STUDENT_FIELDS)
+        writer.writeheader()
+        for results, batch_stats in iter_graded_batches(answer_key, sheets, workers, batch_size):
+            writer.writerows(results)
+            for question_id, (attempts, answered, correct) in batch_stats.items():
+                stats = question_stats.get(question_id)
+                if stats is None:
+                    question_stats[question_id] = [attempts, answered, correct]
+                else:
+                    stats[0] += attempts
+                    stats[1] += answered
+                    stats[2] += correct
+            graded += len(results)
+            if progress_callback:
+                progress_callback(graded)
+
+    with open(question_output, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(QUESTION_FIELDS)
+        for question_id in sorted(question_stats):
+            attempts, answered, correct = question_stats[question_id]
+            writer.writerow([
+                question_id,
+                answer_key[question_id].type,
+                attempts,
+                answered,
+                correct,
+                f"{correct / attempts:.4f}" if attempts else ''
+            ])
+
+    return graded
@@ -0,0 +1,53 @@
+"""
+组卷方案。
+
+方案规定每种题型的题数以及各题库所占的比例, 例如
+{"types": {"single": 20, "multi": 5, "judge": 5}, "banks": {"题库A": 0.6, "题库B": 0.4}}。
+allocate把方案分解为每个(题型, 题库)需要抽取的题数, 具体的抽题由QuizDatabase完成。
+"""
+
+
+def normalize_spec(types, banks):
+    """校验并规范化方案, 题型按给定顺序保存, 题库权重归一化"""
+    types = {str(t): int(n) for t, n in dict(types).items()}
+    if not types or any(n < 0 for n in types.values()) or not sum(types.values()):
+        raise ValueError("组卷方案至少需要一种题型, 题数不能为负")
+
+    banks = {str(b): float(w) for b, w in dict(banks).items()}
+    total_weight = sum(banks.values())
+    if not banks or any(w < 0 for w in banks.values()) or total_weight <= 0:
+        raise ValueError("组卷方案至少需要一个题库, 权重不能为负")
+
+    return {
+        'types': types,
+        'banks': {b: w / total_weight for b, w in banks.items()},
+    }
+
+
+def allocate(spec):
+    """
+    返回{(题型, 题库): 题数}。每种题型按题库权重用最大余数法分配,
+    余数相同时优先分给目前离自身总题数目标最远的题库。
+    """
+    banks = spec['banks']
+    total = sum(spec['types'].values())
+    assigned = {bank: 0 for bank in banks}
+    cells = {}
+
+    for q_type, count in spec['types'].items():
+        quotas = {bank: count * weight for bank, weight in banks.items()}
+        counts = {bank: int(quota) for bank, quota in quotas.items()}
+        remaining = count - sum(counts.values())
+        order = sorted(
+            banks,
+            key=lambda b: (quotas[b] - counts[b], total * banks[b] - assigned[b] - counts[b]),
+            reverse=True
+        )
+        for bank in order[:remaining]:
+            counts[bank] += 1
+
+        for bank, n in counts.items():
+            assigned[bank] += n
+            cells[(q_type, bank)] = n
+
+    return cells
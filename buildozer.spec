@@ -17,7 +17,7 @@ source.include_dirs = assets, data
 
 version = 1.2.2
 
-requirements = python3, kivy, jnius, pyjnius, plyer, sdl2, sdl2_image, sdl2_ttf, sdl2_mixer, android, pillow, sqlite3, pandas, openpyxl, et_xmlfile, xlrd
+requirements = python3, kivy, jnius, pyjnius, plyer, sdl2, sdl2_image, sdl2_ttf, sdl2_mixer, android, pillow, sqlite3, xlrd
 
 presplash.filename = %(source.dir)s/data/presplash.png
 
@@ -0,0 +1,292 @@
+"""
+数据库后台服务。
+
+SQLite连接只在专属线程中使用, 调用方通过队列提交请求, 得到Future,
+或者注册回调, 回调通过dispatch(例如Kivy的Clock)回到主线程执行。
+写请求和读请求分别由两个线程处理, 各自持有一个连接; 数据库使用WAL日志,
+因此导入大题库时读请求不会被阻塞。
+两个连接共用同一个已解码题库缓存(BankCache)和错题本抽样索引(WrongAnswerBook),
+写线程写入后负责使它们失效或同步更新。
+交卷记录先缓冲在内存中, 由写线程合并为一个事务批量写入。
+导入等耗时较长的任务用start_job在单独的线程中执行, 只把每一块写入提交给写线程,
+期间写线程仍然可以处理其他写请求。
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from bank_cache import BankCache
+from quiz_db import QuizDatabase
+from wrong_book import WrongAnswerBook
+
+# 会修改数据库的QuizDatabase方法, 由写线程执行
+WRITE_METHODS = {
+    'add_quiz',
+    'bulk_add_quiz',
+    'import_quiz',
+    'stream_import_quiz',
+    'begin_quiz_import',
+    'append_quiz_questions',
+    'finish_quiz_import',
+    'discard_quiz',
+    'save_blueprint',
+    'delete_blueprint',
+    'record_attempts',
+}
+
+# 交卷记录在内存中最多缓冲的秒数, 之后合并为一个事务写入
+ATTEMPT_FLUSH_DELAY = 1.0
+
+_STOP = object()
+
+
+class _LatencyStats:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.total_wait = 0.0
+        self.last_time = 0.0
+
+    def record(self, wait, elapsed, failed):
+        self.count += 1
+        self.errors += 1 if failed else 0
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self.total_wait += wait
+        self.last_time = elapsed
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'avg_ms': self.total_time / self.count * 1000 if self.count else 0.0,
+            'max_ms': self.max_time * 1000,
+            'last_ms': self.last_time * 1000,
+            'avg_wait_ms': self.total_wait / self.count * 1000 if self.count else 0.0,
+        }
+
+
+class _DatabaseWorker(threading.Thread):
+    def __init__(self, name, db_factory, stats, stats_lock):
+        super().__init__(name=name, daemon=True)
+        self.requests = queue.Queue()
+        self.ready = threading.Event()
+        self.error = None
+        self._db_factory = db_factory
+        self._stats = stats
+        self._stats_lock = stats_lock
+
+    def run(self):
+        try:
+            db = self._db_factory()
+        except Exception as e:
+            self.error = e
+            self.ready.set()
+            return
+        self.ready.set()
+
+        try:
+            while True:
+                request = self.requests.get()
+                if request is _STOP:
+                    break
+                self._execute(db, *request)
+        finally:
+            db.close()
+
+    def _execute(self, db, label, func, args, kwargs, future, submitted):
+        if not future.set_running_or_notify_cancel():
+            return
+
+        started = time.perf_counter()
+        failed = False
+        try:
+            result = func(db, *args, **kwargs)
+        except BaseException as e:
+            failed = True
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        finally:
+            finished = time.perf_counter()
+            with self._stats_lock:
+                stats = self._stats.setdefault(label, _LatencyStats())
+                stats.record(started - submitted, finished - started, failed)
+
+
+class DatabaseService:
+    def __init__(self, db_path='data/quiz.db', dispatch=None, cache=None):
+        self.db_path = db_path
+        self.cache = cache if cache is not None else BankCache()
+        self.wrong_book = WrongAnswerBook()
+        self._dispatch = dispatch or (lambda fn: fn())
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+        self._closed = False
+        self._pending_attempts = []
+        self._flush_timer = None
+        self._last_flush = None
+        self._attempt_lock = threading.Lock()
+
+        # 写线程先启动并完成迁移, 读线程再打开连接
+        self._writer = self._start_worker('quiz-db-writer')
+        self._reader = self._start_worker('quiz-db-reader')
+        self.submit('discard_incomplete_imports')
+
+    def _start_worker(self, name):
+        worker = _DatabaseWorker(
+            name,
+            lambda: QuizDatabase(self.db_path, cache=self.cache, wrong_book=self.wrong_book),
+            self._stats,
+            self._stats_lock
+        )
+        worker.start()
+        worker.ready.wait()
+        if worker.error:
+            raise worker.error
+        return worker
+
+    def submit(self, method, *args, callback=None, error_callback=None, **kwargs):
+        """在数据库线程中执行QuizDatabase的method方法, 返回Future"""
+        func = lambda db, *a, **kw: getattr(db, method)(*a, **kw)
+        return self._enqueue(
+            method, func, args, kwargs,
+            write=method in WRITE_METHODS,
+            callback=callback,
+            error_callback=error_callback
+        )
+
+    def run(self, func, *args, callback=None, error_callback=None, write=True, **kwargs):
+        """在数据库线程中执行func(db, *args, **kwargs), 用于需要多步操作的请求"""
+        return self._enqueue(
+            getattr(func, '__name__', 'run'), func, args, kwargs,
+            write=write,
+            callback=callback,
+            error_callback=error_callback
+        )
+
+    def start_job(self, func, *args, callback=None, error_callback=None, name='quiz-db-job', **kwargs):
+        """
+        在新的后台线程中执行func(self, *args, **kwargs), 返回Future。
+        func不占用数据库线程, 需要读写时通过submit/call提交请求。
+        """
+        if self._closed:
+            raise RuntimeError("数据库服务已关闭")
+
+        future = self._new_future(callback, error_callback)
+
+        def target():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                result = func(self, *args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+        threading.Thread(target=target, name=name, daemon=True).start()
+        return future
+
+    def call(self, method, *args, timeout=None, **kwargs):
+        """同步执行, 只能在后台线程中使用, 不要在主线程中调用"""
+        return self.submit(method, *args, **kwargs).result(timeout)
+
+    def _enqueue(self, label, func, args, kwargs, write, callback, error_callback):
+        if self._closed:
+            raise RuntimeError("数据库服务已关闭")
+
+        future = self._new_future(callback, error_callback)
+        worker = self._writer if write else self._reader
+        worker.requests.put((label, func, args, kwargs, future, time.perf_counter()))
+        return future
+
+    def _new_future(self, callback, error_callback):
+        future = Future()
+        if callback or error_callback:
+            future.add_done_callback(
+                lambda f: self._deliver(f, callback, error_callback)
+            )
+        return future
+
+    def _deliver(self, future, callback, error_callback):
+        error = future.exception()
+        if error is None:
+            if callback:
+                result = future.result()
+                self._dispatch(lambda: callback(result))
+        elif error_callback:
+            self._dispatch(lambda: error_callback(error))
+        else:
+            print(f"数据库操作失败: {error}")
+
+    def record_attempt(self, attempt):
+        """缓冲一次交卷记录, ATTEMPT_FLUSH_DELAY秒内的记录合并写入, 不阻塞调用方"""
+        with self._attempt_lock:
+            self._pending_attempts.append(attempt)
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(ATTEMPT_FLUSH_DELAY, self.flush_attempts)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def flush_attempts(self, callback=None, error_callback=None):
+        """
+        立即把缓冲的交卷记录提交给写线程, 返回Future, 结果为新记录的id列表。
+        读取历史记录前调用, 可以保证读到之前提交的所有记录。
+        """
+        with self._attempt_lock:
+            attempts, self._pending_attempts = self._pending_attempts, []
+            timer, self._flush_timer = self._flush_timer, None
+            if timer:
+                timer.cancel()
+            closed = self._closed
+            if attempts and not closed:
+                # 在锁内入队, 保证_last_flush总是最后一个提交的写入
+                self._last_flush = self.submit(
+                    'record_attempts', attempts,
+                    callback=callback,
+                    error_callback=error_callback
+                )
+                return self._last_flush
+            last_flush = self._last_flush
+
+        future = self._new_future(callback, error_callback)
+        if closed:
+            # 关闭后也要通知调用方, 否则挂在这次提交上的后续操作永远不会执行
+            future.set_exception(RuntimeError("数据库服务已关闭"))
+        elif last_flush is None:
+            # 没有缓冲的记录时不开空的写事务; 上一次提交还没写完时等它完成再返回
+            future.set_result([])
+        else:
+            last_flush.add_done_callback(lambda f: future.set_result([]))
+        return future
+
+    @property
+    def queue_depth(self):
+        return self._writer.requests.qsize() + self._reader.requests.qsize()
+
+    def get_stats(self):
+        """返回队列深度、每种请求的耗时统计(毫秒)以及题库缓存统计"""
+        with self._stats_lock:
+            latency = {label: stats.as_dict() for label, stats in self._stats.items()}
+        return {
+            'queue_depth': self.queue_depth,
+            'write_queue_depth': self._writer.requests.qsize(),
+            'read_queue_depth': self._reader.requests.qsize(),
+            'latency': latency,
+            'cache': self.cache.stats(),
+            'pending_attempts': len(self._pending_attempts),
+        }
+
+    def close(self, timeout=5):
+        if self._closed:
+            return
+        self.flush_attempts()
+        self._closed = True
+        for worker in (self._reader, self._writer):
+            worker.requests.put(_STOP)
+        for worker in (self._reader, self._writer):
+            worker.join(timeout)
@@ -0,0 +1,391 @@
+"""
+Excel题库解析。
+
+按列而不是按行处理数据: 先一次性确定各列的用途, 再对整列做题型、
+答案和选项的规范化, 结果与逐行解析完全一致。
+逐行读取的表格(sheet_reader)和pandas的DataFrame共用同一套列识别和规范化逻辑,
+导入流程本身不依赖pandas。
+"""
+import re
+import threading
+import time
+
+from sheet_reader import count_sheet_rows, iter_sheet_rows, sheet_encoding
+
+SERIAL_COLUMNS = ['序号', '编号', '题号']
+QUESTION_COLUMNS = ['题目', '题干', '问题', '试题']
+TYPE_COLUMNS = ['题型', '题目类型', '类型']
+ANSWER_COLUMNS = ['答案', '正确答案', '标准答案']
+OPTION_LETTER_COLUMNS = ['A', 'B', 'C', 'D', 'E', 'F']
+
+MULTI_TYPE_NAMES = ('多选', '多选题')
+JUDGE_TYPE_NAMES = ('判断', '判断题')
+JUDGE_TRUE_ANSWERS = ('A', '正确', '对', '是', 'Y', 'YES')
+JUDGE_OPTIONS = ['正确', '错误']
+
+OPTION_SEPARATORS = [re.compile(r'[A-Z][\.、:：]'), re.compile(r'\n'), re.compile(r'[;；]')]
+OPTION_PATTERN = re.compile(r'([A-Z][\.、:：]\s*[^A-Z]+)')
+OPTION_PREFIX = re.compile(r'^[A-Z][\.、:：]\s*')
+
+
+class ColumnMap:
+    __slots__ = ('serial', 'question', 'type', 'options', 'answer')
+
+    def __init__(self, columns):
+        columns = [col.strip() for col in columns]
+        self.serial = _first_match(columns, SERIAL_COLUMNS)
+        self.question = _first_match(columns, QUESTION_COLUMNS)
+        self.type = _first_match(columns, TYPE_COLUMNS)
+        self.options = [
+            col for col in columns
+            if col.startswith('选项') or col in OPTION_LETTER_COLUMNS
+        ]
+        self.answer = _first_match(columns, ANSWER_COLUMNS)
+
+
+def _first_match(columns, names):
+    for col in columns:
+        if col in names:
+            return col
+    return None
+
+
+def parse_serials(values, default_serials):
+    serials = []
+    for value, default in zip(values, default_serials):
+        try:
+            serials.append(int(value))
+        except:
+            serials.append(default)
+    return serials
+
+
+def parse_types(values):
+    types = []
+    for value in values:
+        type_str = str(value).strip()
+        if type_str in MULTI_TYPE_NAMES:
+            types.append('multi')
+        elif type_str in JUDGE_TYPE_NAMES:
+            types.append('judge')
+        else:
+            types.append('single')
+    return types
+
+
+def split_option_cell(option_str):
+    """把写在同一个单元格里的选项拆分为列表"""
+    if not option_str:
+        return []
+
+    options = []
+    for sep in OPTION_SEPARATORS:
+        if sep.search(option_str):
+            options = [opt.strip() for opt in sep.split(option_str) if opt.strip()]
+            if options:
+                break
+
+    if not options:
+        matches = OPTION_PATTERN.findall(option_str)
+        if matches:
+            options = [m.strip() for m in matches]
+        else:
+            options = [option_str]
+    return options
+
+
+def clean_option(option):
+    return OPTION_PREFIX.sub('', option.strip())
+
+
+def parse_answer(value, q_type):
+    answer = str(value).strip().upper()
+    if q_type == 'multi':
+        return [c for c in answer if c in 'ABCDEF']
+    if q_type == 'judge':
+        return 'A' if answer in JUDGE_TRUE_ANSWERS else 'B'
+    return answer
+
+
+def build_questions(row_count, column_map, column_values, present_mask, default_serials):
+    """
+    根据已经按列取出的数据生成题目字典列表。
+    column_values(col)返回该列所有值的列表, 列不存在时返回None;
+    present_mask(col)返回该列每个单元格是否非空的列表。
+    """
+    serials = default_serials
+    if column_map.serial:
+        values = column_values(column_map.serial)
+        if values is not None:
+            serials = parse_serials(values, default_serials)
+
+    question_values = column_values(column_map.question)
+    if question_values is not None:
+        question_texts = list(map(str, question_values))
+    else:
+        question_texts = [f"题目{serial}" for serial in serials]
+
+    types = ['single'] * row_count
+    if column_map.type:
+        values = column_values(column_map.type)
+        if values is not None:
+            types = parse_types(values)
+
+    options_per_row = [[] for _ in range(row_count)]
+    option_cols = column_map.options
+    if len(option_cols) > 1:
+        cache = {}
+        for col in option_cols:
+            values = column_values(col)
+            if values is None:
+                continue
+            for options, value, present in zip(options_per_row, values, present_mask(col)):
+                if present:
+                    option_str = str(value)
+                    cleaned = cache.get(option_str)
+                    if cleaned is None:
+                        cleaned = cache[option_str] = clean_option(option_str)
+                    options.append(cleaned)
+    elif option_cols:
+        values = column_values(option_cols[0])
+        if values is not None:
+            cache = {}
+            for i, value in enumerate(values):
+                option_str = str(value)
+                if option_str not in cache:
+                    cache[option_str] = [clean_option(opt) for opt in split_option_cell(option_str)]
+                options_per_row[i] = list(cache[option_str])
+
+    answers = None
+    if column_map.answer:
+        answers = column_values(column_map.answer)
+
+    questions = []
+    for i in range(row_count):
+        q_type = types[i]
+        if q_type == 'judge':
+            options = list(JUDGE_OPTIONS)
+        else:
+            options = options_per_row[i]
+
+        if answers is not None:
+            answer = parse_answer(answers[i], q_type)
+        else:
+            answer = [] if q_type == 'multi' else ''
+
+        questions.append({
+            'question': f"{serials[i]}. {question_texts[i]}",
+            'options': options,
+            'answer': answer,
+            'type': q_type,
+            'score': 2 if q_type == 'multi' else 1
+        })
+
+    return questions
+
+
+def process_excel_data(df):
+    """把Excel读出的DataFrame转换为题目字典列表"""
+    from pandas import notna
+
+    column_map = ColumnMap(df.columns)
+    if column_map.question is None:
+        return []
+
+    # 与DataFrame.iterrows()一样从df.values取值, 保证缺失值和数值类型的
+    # 字符串形式与逐行解析时相同
+    matrix = df.values
+    positions = {}
+    for position, col in enumerate(df.columns):
+        positions.setdefault(col, position)
+
+    def column_values(col):
+        if col not in positions:
+            return None
+        return matrix[:, positions[col]].tolist()
+
+    def present_mask(col):
+        return notna(matrix[:, positions[col]]).tolist()
+
+    default_serials = [idx + 1 for idx in df.index]
+    return build_questions(len(df), column_map, column_values, present_mask, default_serials)
+
+
+IMPORT_CHUNK_SIZE = 1000
+
+
+def _header_names(header):
+    return [
+        f"Unnamed: {i}" if name is None else str(name)
+        for i, name in enumerate(header)
+    ]
+
+
+def iter_question_chunks(rows, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    把逐行读取的表格(第一行为表头)按chunk_size行一块转换为题目字典列表,
+    列的识别和各列的规范化与process_excel_data相同, 内存占用与表格大小无关。
+    """
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        return
+
+    columns = _header_names(header)
+    column_map = ColumnMap(columns)
+    if column_map.question is None:
+        return
+
+    positions = {}
+    for position, col in enumerate(columns):
+        positions.setdefault(col, position)
+
+    chunk = []
+    blank_rows = []
+    for index, row in enumerate(rows):
+        # 与pd.read_excel一致: 保留中间的空行, 丢弃表格末尾的空行
+        if not any(value is not None for value in row):
+            blank_rows.append((index, row))
+            continue
+        chunk.extend(blank_rows)
+        blank_rows = []
+        chunk.append((index, row))
+        if len(chunk) >= chunk_size:
+            yield _chunk_questions(chunk, column_map, positions)
+            chunk = []
+
+    if chunk:
+        yield _chunk_questions(chunk, column_map, positions)
+
+
+def _chunk_questions(chunk, column_map, positions):
+    nan = float('nan')
+
+    def cell(row, position):
+        value = row[position] if position < len(row) else None
+        return nan if value is None else value
+
+    def column_values(col):
+        if col not in positions:
+            return None
+        position = positions[col]
+        return [cell(row, position) for _, row in chunk]
+
+    def present_mask(col):
+        position = positions[col]
+        return [position < len(row) and row[position] is not None for _, row in chunk]
+
+    default_serials = [index + 1 for index, _ in chunk]
+    return build_questions(len(chunk), column_map, column_values, present_mask, default_serials)
+
+
+def read_questions(file_path):
+    """一次性读取整个表格中的题目, 用于小文件; 大文件请使用iter_question_chunks"""
+    return [q for chunk in iter_question_chunks(iter_sheet_rows(file_path)) for q in chunk]
+
+
+class ImportCancelled(Exception):
+    pass
+
+
+class ImportJob:
+    """
+    一次可取消的Excel导入, 由DatabaseService.start_job在单独的线程中执行:
+    读取和解析在该线程中进行, 每一块只把写入提交给数据库写线程,
+    写入上一块的同时解析下一块, 其他写请求可以排在两块之间执行。
+    进度通过progress_callback(进度字典)报告, 最多每progress_interval秒一次;
+    cancel()后在下一块开始前停止, 已写入的部分会被删除。
+    """
+
+    def __init__(self, file_path, quiz_name, progress_callback=None,
+                 chunk_size=IMPORT_CHUNK_SIZE, progress_interval=0.25):
+        self.file_path = file_path
+        self.quiz_name = quiz_name
+        self.chunk_size = chunk_size
+        self.progress_interval = progress_interval
+        self._progress_callback = progress_callback
+        self._cancelled = threading.Event()
+        self._started = None
+        self._last_report = 0.0
+        self.total_rows = None
+        self.rows = 0
+        self._encoding = None
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def run(self, service):
+        self._started = time.perf_counter()
+        try:
+            self._encoding = sheet_encoding(self.file_path)
+            total = count_sheet_rows(self.file_path, self._encoding)
+            self.total_rows = total - 1 if total else None
+        except Exception:
+            self.total_rows = None
+
+        quiz_name, quiz_id = service.call(
+            'begin_quiz_import', self.quiz_name, source_type="excel"
+        )
+        written = 0
+        pending = None
+        try:
+            for chunk in self._chunks():
+                if pending:
+                    written += pending.result()
+                    self._on_rows_written(written)
+                pending = service.submit('append_quiz_questions', quiz_id, chunk)
+            if pending:
+                written += pending.result()
+                self._on_rows_written(written)
+            service.call('finish_quiz_import', quiz_id, written)
+        except BaseException:
+            # 写线程按顺序执行, 删除请求排在尚未完成的写入之后
+            try:
+                service.call('discard_quiz', quiz_id)
+            except RuntimeError:
+                # 服务已关闭, 下次启动时由discard_incomplete_imports删除
+                pass
+            raise
+
+        self._report(force=True)
+        return quiz_name, written
+
+    def _chunks(self):
+        rows = iter_sheet_rows(self.file_path, self._encoding)
+        for chunk in iter_question_chunks(rows, self.chunk_size):
+            if self.cancelled:
+                raise ImportCancelled("导入已取消")
+            yield chunk
+        if self.cancelled:
+            raise ImportCancelled("导入已取消")
+
+    def _on_rows_written(self, rows):
+        self.rows = rows
+        self._report()
+
+    def _report(self, force=False):
+        if not self._progress_callback:
+            return
+        now = time.perf_counter()
+        if not force and now - self._last_report < self.progress_interval:
+            return
+        self._last_report = now
+        self._progress_callback(self.progress(now))
+
+    def progress(self, now=None):
+        elapsed = (now or time.perf_counter()) - (self._started or 0)
+        rate = self.rows / elapsed if elapsed > 0 else 0.0
+        eta = None
+        if self.total_rows and rate > 0:
+            eta = max(self.total_rows - self.rows, 0) / rate
+        return {
+            'rows': self.rows,
+            'total_rows': self.total_rows,
+            'rows_per_sec': rate,
+            'eta': eta,
+            'elapsed': elapsed,
+        }
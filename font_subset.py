@@ -0,0 +1,113 @@
+"""
+按题库和界面实际用到的字符裁剪中文字体。
+
+构建时用tools/build_font_subset.py生成 simhei_subset.ttf 和记录其字符集的 simhei_subset.txt;
+启动时只注册裁剪后的字体, 导入的内容里出现字符集之外的字时再切换回完整字体。
+裁剪字体依赖fontTools, 只在构建时需要; 运行时只读取字符集文件。
+"""
+import ast
+import json
+import os
+from glob import glob
+
+SUBSET_SUFFIX = '_subset'
+# 无论题库里有没有都保留的字符: ASCII可打印字符和常用中文标点
+BASE_CHARS = (''.join(chr(c) for c in range(0x20, 0x7f))
+              + '，。、；：？！“”‘’（）【】《》—…·')
+
+
+def subset_font_path(font_path):
+    root, ext = os.path.splitext(font_path)
+    return root + SUBSET_SUFFIX + ext
+
+
+def charset_path(font_path):
+    return os.path.splitext(font_path)[0] + '.txt'
+
+
+def _drawable(ch):
+    # 换行、制表等控制字符不需要字形
+    return ch.isprintable() and not ch.isspace() or ch == ' '
+
+
+def collect_chars(texts):
+    chars = set(BASE_CHARS)
+    for text in texts:
+        chars.update(text)
+    return {ch for ch in chars if _drawable(ch)}
+
+
+def missing_chars(texts, charset):
+    """返回texts中不在charset里的字符"""
+    missing = set()
+    for text in texts:
+        if text:
+            missing.update(set(text) - charset)
+    return {ch for ch in missing if _drawable(ch)}
+
+
+def source_strings(paths):
+    """源码里的字符串常量, 包括kv规则和f-string的固定部分"""
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str):
+                yield node.value
+
+
+def _json_strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, list):
+        for item in value:
+            yield from _json_strings(item)
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _json_strings(item)
+
+
+def json_bank_strings(json_dir):
+    """assets/json下题库文件里的所有字符串和文件名(题库名)"""
+    for path in sorted(glob(os.path.join(json_dir, '*.json'))):
+        yield os.path.splitext(os.path.basename(path))[0]
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from _json_strings(json.load(f))
+
+
+def load_charset(path):
+    """读取字符集文件, 不存在时返回None"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return frozenset(f.read())
+    except OSError:
+        return None
+
+
+def write_charset(path, chars):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(''.join(sorted(chars)))
+
+
+def build_subset(font_path, out_path, chars):
+    """
+    只保留chars的字形, 写出out_path和同名的字符集文件。
+    返回完整字体里也没有的字符。
+    """
+    from fontTools import subset
+
+    options = subset.Options()
+    options.name_IDs = ['*']
+    options.notdef_outline = True
+    font = subset.load_font(font_path, options)
+    absent = {ch for ch in chars if ord(ch) not in font.getBestCmap()}
+
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=[ord(ch) for ch in chars])
+    subsetter.subset(font)
+    subset.save_font(font, out_path, options)
+    font.close()
+
+    # 完整字体里也没有的字切换字体也没用, 一并记入字符集
+    write_charset(charset_path(out_path), chars)
+    return absent
@@ -1,3 +1,6 @@
+from startup_timing import StartupTimer
+startup_timer = StartupTimer()
+
 from kivy.app import App
 from kivy.uix.screenmanager import ScreenManager, Screen
 from kivy.uix.boxlayout import BoxLayout
@@ -8,10 +11,14 @@ from kivy.uix.checkbox import CheckBox
 from kivy.uix.scrollview import ScrollView
 from kivy.uix.gridlayout import GridLayout
 from kivy.uix.relativelayout import RelativeLayout
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.factory import Factory
 from kivy.properties import (StringProperty, ListProperty, 
                            NumericProperty, BooleanProperty,
-                           DictProperty, ObjectProperty)
-from kivy.core.text import LabelBase
+                           ObjectProperty)
+from kivy.core.text import LabelBase, Label as CoreLabel
 from kivy.core.window import Window
 from kivy.metrics import dp
 from kivy.utils import platform
@@ -20,20 +27,31 @@ from kivy.config import Config
 from kivy.clock import Clock
 from kivy.clock import mainthread
 from kivy.graphics import Color, Rectangle
-import json
-import random
 import os
 import sys
 import time
-import sqlite3
-from pathlib import Path
-import pandas as pd
-import re
-from io import BytesIO
-from kivy.uix.filechooser import FileChooserListView
 from kivy.uix.popup import Popup
 from kivy.uix.textinput import TextInput
 
+from db_service import DatabaseService
+from excel_import import ImportCancelled, ImportJob
+from font_subset import charset_path, load_charset, missing_chars, subset_font_path
+from question import SINGLE_TYPES
+from quiz_session import QuizSession, format_answer, format_duration
+from texture_cache import TextureCache
+
+QUIZ_QUESTION_COUNT = 30
+HISTORY_PAGE_SIZE = 20
+WRONG_BOOK_NAME = '错题本'
+# 输入停止该秒数后再检索, 避免每输入一个字都查询一次
+SEARCH_DELAY = 0.3
+# 预渲染前后各几道题的文字纹理
+PRERENDER_NEIGHBORS = 1
+# 输入框和文件选择器显示的文字无法预知, 始终用这个名字注册的完整字体
+FULL_FONT_NAME = 'simhei_full'
+
+startup_timer.mark('imports')
+
 Config.set('graphics', 'multisamples', '0')
 Config.set('kivy', 'window_impl', 'sdl2')
 
@@ -97,200 +115,23 @@ def get_android_download_dir():
         return download_dir
     return None
 
-class QuizDatabase:
-    def __init__(self, db_path='data/quiz.db'):
-        self.db_path = db_path
-        self.conn = None
-        self._initialize_database()
-    
-    def _initialize_database(self):
-        db_dir = os.path.dirname(self.db_path)
-        if db_dir and not os.path.exists(db_dir):
-            os.makedirs(db_dir)
-
-        if not os.path.exists(self.db_path):
-            open(self.db_path, 'a').close()
-
-        self.conn = sqlite3.connect(self.db_path)
-        cursor = self.conn.cursor()
-
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='quizzes'")
-        table_exists = cursor.fetchone()
-
-        if not table_exists:
-            cursor.execute('''
-            CREATE TABLE quizzes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT UNIQUE NOT NULL,
-                description TEXT,
-                source_type TEXT DEFAULT 'json'
-            )
-            ''')
-
-            cursor.execute('''
-            CREATE TABLE questions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                quiz_id INTEGER NOT NULL,
-                question TEXT NOT NULL,
-                options TEXT NOT NULL,
-                answer TEXT NOT NULL,
-                type TEXT NOT NULL,
-                score INTEGER DEFAULT 1,
-                FOREIGN KEY (quiz_id) REFERENCES quizzes(id)
-            )
-            ''')
-            self.conn.commit()
-            return
-
-        cursor.execute("PRAGMA table_info(quizzes)")
-        columns = [column[1] for column in cursor.fetchall()]
-
-        if 'source_type' not in columns:
-            try:
-                cursor.execute("BEGIN TRANSACTION")
-                cursor.execute('''
-                CREATE TABLE quizzes_temp (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT UNIQUE NOT NULL,
-                    description TEXT,
-                    source_type TEXT DEFAULT 'json'
-                )
-                ''')
-
-                cursor.execute('''
-                INSERT INTO quizzes_temp (id, name, description, source_type)
-                SELECT id, name, description, 'json' FROM quizzes
-                ''')
-
-                cursor.execute("DROP TABLE quizzes")
-                cursor.execute("ALTER TABLE quizzes_temp RENAME TO quizzes")
-                cursor.execute("COMMIT")
-            except Exception as e:
-                cursor.execute("ROLLBACK")
-                raise e
-
-        self.conn.commit()
-
-    def get_available_quizzes(self):
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute('SELECT name FROM quizzes')
-            return [row[0] for row in cursor.fetchall()]
-        except sqlite3.OperationalError:
-            return []
-
-    def get_questions_by_quiz_name(self, quiz_name):
-        cursor = self.conn.cursor()
-        cursor.execute('''
-        SELECT 
-            q.question, 
-            q.options, 
-            q.answer, 
-            q.type, 
-            q.score
-        FROM questions q
-        JOIN quizzes qu ON q.quiz_id = qu.id
-        WHERE qu.name = ?
-        ''', (quiz_name,))
-
-        questions = []
-        for row in cursor.fetchall():
-            question, options_json, answer, q_type, score = row
-            questions.append({
-                'question': question,
-                'options': json.loads(options_json),
-                'answer': json.loads(answer) if q_type == 'multi' else answer,
-                'type': q_type,
-                'score': score
-            })
-        return questions
-
-    def get_quiz_info(self, quiz_name):
-        cursor = self.conn.cursor()
-
-        cursor.execute('PRAGMA table_info(quizzes)')
-        columns = [column[1] for column in cursor.fetchall()]
-        has_source_type = 'source_type' in columns
-
-        if has_source_type:
-            cursor.execute('''
-            SELECT q.id, q.name, q.description, COUNT(qu.id) as question_count, q.source_type
-            FROM quizzes q
-            LEFT JOIN questions qu ON q.id = qu.quiz_id
-            WHERE q.name = ?
-            GROUP BY q.id
-            ''', (quiz_name,))
-        else:
-            cursor.execute('''
-            SELECT q.id, q.name, q.description, COUNT(qu.id) as question_count
-            FROM quizzes q
-            LEFT JOIN questions qu ON q.id = qu.quiz_id
-            WHERE q.name = ?
-            GROUP BY q.id
-            ''', (quiz_name,))
-
-        result = cursor.fetchone()
-        if not result:
-            return None
-
-        if has_source_type:
-            return {
-                'id': result[0],
-                'name': result[1],
-                'description': result[2],
-                'question_count': result[3],
-                'source_type': result[4] if len(result) > 4 else 'json'
-            }
-        else:
-            return {
-                'id': result[0],
-                'name': result[1],
-                'description': result[2],
-                'question_count': result[3],
-                'source_type': 'json'
-            }
-
-    def add_quiz(self, quiz_name, questions_data, description="", source_type="json"):
-        cursor = self.conn.cursor()
-
-        cursor.execute('''
-        INSERT OR REPLACE INTO quizzes (name, description, source_type)
-        VALUES (?, ?, ?)
-        ''', (quiz_name, description, source_type))
-
-        cursor.execute('SELECT id FROM quizzes WHERE name = ?', (quiz_name,))
-        quiz_id = cursor.fetchone()[0]
-
-        cursor.execute('DELETE FROM questions WHERE quiz_id = ?', (quiz_id,))
-
-        for q in questions_data:
-            cursor.execute('''
-            INSERT INTO questions (
-                quiz_id, question, options, answer, type, score
-            ) VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                quiz_id,
-                q['question'],
-                json.dumps(q['options'], ensure_ascii=False),
-                json.dumps(q['answer'], ensure_ascii=False) if isinstance(q['answer'], list) else q['answer'],
-                q.get('type', 'single'),
-                q.get('score', 1)
-            ))
-
-        self.conn.commit()
-
-    def close(self):
-        if self.conn:
-            self.conn.close()
-
 class ExcelImportScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self._popup = None
         self._processing_popup = None
+        self._processing_label = None
+        self._import_job = None
         self.selected_file_path = None
         self.suggested_quiz_name = ""
-        self.setup_ui()
+        self.file_chooser = None
+        self._ui_ready = False
+
+    def on_pre_enter(self):
+        # 文件选择器等界面在第一次进入导入页面时才创建
+        if not self._ui_ready:
+            self.setup_ui()
+            self._ui_ready = True
 
     def setup_ui(self):
         self.clear_widgets()
@@ -334,7 +175,9 @@ class ExcelImportScreen(Screen):
 
             mime_types = [
                 "application/vnd.ms-excel",
-                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                "text/csv",
+                "text/comma-separated-values"
             ]
             intent.putExtra(Intent.EXTRA_MIME_TYPES, mime_types)
 
@@ -500,7 +343,7 @@ class ExcelImportScreen(Screen):
             multiline=False,
             size_hint_y=None,
             height=100,
-            font_name='simhei',
+            font_name=FULL_FONT_NAME,
             font_size='18sp',
             padding=[20, 20],
         )
@@ -568,56 +411,86 @@ class ExcelImportScreen(Screen):
         return popup
 
     def _safe_import_quiz(self, file_path, quiz_name):
-        self._show_processing_popup("正在导入题库...")
-
-        Clock.schedule_once(
-            lambda dt: self._execute_import(file_path, quiz_name),
-            0.2
-        )
+        self._show_processing_popup("正在导入题库...", on_cancel=self._cancel_running_import)
+        self._execute_import(file_path, quiz_name)
 
     def _execute_import(self, file_path, quiz_name):
         try:
-            if file_path.endswith('.xlsx'):
-                df = pd.read_excel(file_path, engine='openpyxl')
-            else:
-                df = pd.read_excel(file_path, engine='xlrd')
-
-            questions = self.process_excel_data(df)
-
-            if not questions:
-                raise Exception("Excel中没有找到有效的题目数据")
+            # 读取和解析在导入线程中进行, 每一块的写入提交给数据库写线程, 主线程只负责显示进度
+            self._import_job = ImportJob(
+                file_path, quiz_name,
+                progress_callback=self._update_import_progress
+            )
 
             app = App.get_running_app()
-            if not hasattr(app, 'db'):
-                app.db = QuizDatabase()
+            app.db.start_job(
+                self._import_job.run,
+                callback=self._on_import_done,
+                error_callback=self._on_import_failed
+            )
 
-            existing = app.db.get_available_quizzes()
-            while quiz_name in existing:
-                if re.search(r'\(\d+\)$', quiz_name):
-                    quiz_name = re.sub(r'\(\d+\)$', lambda m: f"({int(m.group(1))+1})", quiz_name)
-                else:
-                    quiz_name = f"{quiz_name}(1)"
+        except Exception as e:
+            self._on_import_failed(e)
 
-            app.db.add_quiz(quiz_name, questions, source_type="excel")
+    def _cancel_running_import(self, instance=None):
+        if self._import_job:
+            self._import_job.cancel()
+            self._set_processing_text("正在取消导入...")
 
-            self.show_message(f"成功导入题库【{quiz_name}】共{len(questions)}道题目")
-            self.manager.current = 'file_select'
-            self.manager.get_screen('file_select').load_quiz_list()
+    @mainthread
+    def _update_import_progress(self, progress):
+        if self._import_job and self._import_job.cancelled:
+            return
 
-        except Exception as e:
-            self.show_message(f'导入失败: {str(e)}')
-        finally:
-            self._dismiss_processing_popup()
+        if progress['total_rows']:
+            text = f"正在导入题库...\n已处理 {progress['rows']}/{progress['total_rows']} 行"
+        else:
+            text = f"正在导入题库...\n已处理 {progress['rows']} 行"
+        text += f"\n{progress['rows_per_sec']:.0f} 行/秒"
+        if progress['eta'] is not None:
+            text += f"  剩余约 {int(progress['eta']) + 1} 秒"
+        self._set_processing_text(text)
+
+    def _set_processing_text(self, text):
+        if self._processing_label:
+            self._processing_label.text = text
+
+    def _on_import_done(self, result):
+        self._import_job = None
+        self._dismiss_processing_popup()
+        quiz_name, question_count = result
+        self._finalize_import(quiz_name, question_count)
+
+    def _on_import_failed(self, error):
+        self._import_job = None
+        self._dismiss_processing_popup()
+        if isinstance(error, ImportCancelled):
+            self.show_message('已取消导入')
+        else:
+            self.show_message(f'导入失败: {str(error)}')
 
     @mainthread
-    def _show_processing_popup(self, message):
+    def _show_processing_popup(self, message, on_cancel=None):
         if self._processing_popup:
             self._dismiss_processing_popup()
 
+        content = BoxLayout(orientation='vertical', padding=dp(10), spacing=dp(10))
+        self._processing_label = Label(text=message, font_size='18sp')
+        content.add_widget(self._processing_label)
+
+        if on_cancel:
+            cancel_btn = Button(
+                text='取消',
+                size_hint_y=None,
+                height=dp(50)
+            )
+            cancel_btn.bind(on_press=on_cancel)
+            content.add_widget(cancel_btn)
+
         self._processing_popup = Popup(
             title='处理中',
             title_font='simhei',
-            content=Label(text=message, font_size='18sp'),
+            content=content,
             size_hint=(0.7, 0.4),
             auto_dismiss=False
         )
@@ -632,55 +505,16 @@ class ExcelImportScreen(Screen):
                 pass
             finally:
                 self._processing_popup = None
-
-    def _safe_import(self, file_path, quiz_name, processing_popup):
-        try:
-            app = App.get_running_app()
-            if not hasattr(app, 'db') or app.db.conn is None:
-                app.db = QuizDatabase()
-
-            try:
-                if file_path.endswith('.xlsx'):
-                    df = pd.read_excel(file_path, engine='openpyxl')
-                else:
-                    df = pd.read_excel(file_path, engine='xlrd')
-            except Exception as e:
-                raise Exception(f"读取Excel失败: {str(e)}")
-
-            questions = self.process_excel_data(df)
-            if not questions:
-                raise Exception("Excel中没有找到有效的题目数据")
-
-            existing = app.db.get_available_quizzes()
-            while quiz_name in existing:
-                base_name = re.sub(r'\(\d+\)$', '', quiz_name)
-                counter = 1
-                while f"{base_name}({counter})" in existing:
-                    counter += 1
-                quiz_name = f"{base_name}({counter})"
-
-            app.db.add_quiz(quiz_name, questions, source_type="excel")
-
-            self.show_message(f"成功导入题库【{quiz_name}】共{len(questions)}道题目")
-
-            self.manager.current = 'file_select'
-            self.manager.get_screen('file_select').load_quiz_list()
-
-        except Exception as e:
-            self.show_message(f"导入失败: {str(e)}")
-        finally:
-            processing_popup.dismiss()
-            try:
-                os.remove(file_path)
-            except:
-                pass
+                self._processing_label = None
 
     def show_kivy_file_chooser(self):
+        from kivy.uix.filechooser import FileChooserListView
+
         layout = BoxLayout(orientation='vertical', padding=dp(10), spacing=dp(10))
 
         self.file_chooser = FileChooserListView(
-            filters=['*.xls', '*.xlsx'],
-            font_name='simhei',
+            filters=['*.xls', '*.xlsx', '*.csv'],
+            font_name=FULL_FONT_NAME,
             size_hint=(1, 1)
         )
 
@@ -729,47 +563,20 @@ class ExcelImportScreen(Screen):
         finally:
             self.dismiss_popup()
 
-    def _do_import(self, file_path, quiz_name):
-        try:
-            if file_path.endswith('.xlsx'):
-                df = pd.read_excel(file_path, engine='openpyxl')
-            else:
-                df = pd.read_excel(file_path, engine='xlrd')
-
-            questions = self.process_excel_data(df)
-
-            app = App.get_running_app()
-            existing = app.db.get_available_quizzes()
-            while quiz_name in existing:
-                quiz_name = f"{quiz_name}(1)"
-
-            app.db.add_quiz(quiz_name, questions, source_type="excel")
-
-            Clock.schedule_once(
-                lambda dt: self._finalize_import(quiz_name, len(questions), 
-                0)
-            )
-
-        except Exception as e:
-            Clock.schedule_once(lambda dt, msg=f"导入失败: {str(e)}": self.show_message(msg))
-        finally:
-            try:
-                os.remove(file_path)
-            except:
-                pass
-
     @mainthread
     def _finalize_import(self, quiz_name, question_count):
         self.show_message(f"成功导入题库【{quiz_name}】共{question_count}道题目")
+        # 进入题库列表时只会读取新导入的题库
         self.manager.current = 'file_select'
-        self.manager.get_screen('file_select').load_quiz_list()
 
     def show_kivy_file_chooser(self):
+        from kivy.uix.filechooser import FileChooserListView
+
         layout = BoxLayout(orientation='vertical', padding=dp(10), spacing=dp(10))
 
         self.file_chooser = FileChooserListView(
-            filters=['*.xls', '*.xlsx'],
-            font_name='simhei',
+            filters=['*.xls', '*.xlsx', '*.csv'],
+            font_name=FULL_FONT_NAME,
             size_hint=(1, 1)
         )
 
@@ -809,122 +616,10 @@ class ExcelImportScreen(Screen):
             finally:
                 self._popup = None
 
-    def process_excel_data(self, df):
-        questions = []
-
-        columns = [col.strip() for col in df.columns]
-
-        serial_col = None
-        for col in columns:
-            if col in ['序号', '编号', '题号']:
-                serial_col = col
-                break
-
-        question_col = None
-        for col in columns:
-            if col in ['题目', '题干', '问题', '试题']:
-                question_col = col
-                break
-
-        if question_col is None:
-            return questions
-
-        type_col = None
-        for col in columns:
-            if col in ['题型', '题目类型', '类型']:
-                type_col = col
-                break
-
-        option_cols = []
-        for col in columns:
-            if col.startswith('选项') or col in ['A', 'B', 'C', 'D', 'E', 'F']:
-                option_cols.append(col)
-
-        answer_col = None
-        for col in columns:
-            if col in ['答案', '正确答案', '标准答案']:
-                answer_col = col
-                break
-
-        for idx, row in df.iterrows():
-            serial = idx + 1
-            if serial_col and serial_col in row:
-                try:
-                    serial = int(row[serial_col])
-                except:
-                    serial = idx + 1
-
-            question = str(row[question_col]) if question_col in row else f"题目{serial}"
-
-            q_type = 'single'
-            if type_col and type_col in row:
-                type_str = str(row[type_col]).strip()
-                if type_str in ['多选', '多选题']:
-                    q_type = 'multi'
-                elif type_str in ['判断', '判断题']:
-                    q_type = 'judge'
-
-            options = []
-            if q_type == 'judge':
-                options = ['正确', '错误']
-            elif option_cols:
-                if len(option_cols) > 1:
-                    for col in option_cols:
-                        if col in row and pd.notna(row[col]):
-                            options.append(str(row[col]))
-                else:
-                    option_str = str(row[option_cols[0]]) if option_cols[0] in row else ''
-                    if option_str:
-                        separators = [r'[A-Z][\.、:：]', r'\n', r'[;；]']
-                        for sep in separators:
-                            if re.search(sep, option_str):
-                                split_options = re.split(sep, option_str)
-                                options = [opt.strip() for opt in split_options if opt.strip()]
-                                if options:
-                                    break
-                        
-                        if not options:
-                            pattern = r'([A-Z][\.、:：]\s*[^A-Z]+)'
-                            matches = re.findall(pattern, option_str)
-                            if matches:
-                                options = [m.strip() for m in matches]
-                            else:
-                                options = [option_str]
-
-            cleaned_options = []
-            for opt in options:
-                opt = re.sub(r'^[A-Z][\.、:：]\s*', '', opt.strip())
-                cleaned_options.append(opt)
-            options = cleaned_options
-
-            answer = ''
-            if answer_col and answer_col in row:
-                answer = str(row[answer_col]).strip().upper()
-                
-                if q_type == 'multi':
-                    answer = re.sub(r'[、\s]', ',', answer)
-                    answer = [c for c in answer if c in 'ABCDEF']
-                elif q_type == 'judge':
-                    answer = 'A' if answer in ['A', '正确', '对', '是', 'Y', 'YES'] else 'B'
-
-            score = 1
-            if q_type == 'multi':
-                score = 2
-
-            question_data = {
-                'question': f"{serial}. {question}",
-                'options': options,
-                'answer': answer if q_type != 'multi' else list(answer),
-                'type': q_type,
-                'score': score
-            }
-
-            questions.append(question_data)
-
-        return questions
-
     @mainthread
     def show_message(self, message):
+        # 消息里可能有题库名、文件路径或异常信息
+        ensure_font_covers([message])
         content = BoxLayout(orientation='vertical', padding=10)
         content.add_widget(Label(text=message))
 
@@ -951,58 +646,68 @@ class QuizScreen(Screen):
     def on_enter(self):
         self.update_option_buttons()
         app = App.get_running_app()
-        if not app.question_start_time:
+        if app.session and app.session.question_start_time is None:
             app.reset_question_timer()
 
-    def update_option_buttons(self):
-        options_container = self.ids.options_container
-        options_container.clear_widgets()
-
-        app = App.get_running_app()
-        if not hasattr(app, 'questions') or not app.questions:
-            return
+    def on_leave(self):
+        self.cancel_prerender()
 
-        current_question = app.questions[app.question_index]
-        options = current_question.get('options', [])
-        is_multi = current_question.get('type', 'single') in ['multi']
-        single_types = ['single', 'grammar', 'vocabulary', 'culture', 'judge', 'cloze']
+    _option_pool = None
 
-        for i, option in enumerate(options):        
-            prefix = chr(65 + i)
-            if is_multi:
-                option_widget = MultiSelectOption(
-                    prefix=prefix,
-                    text=f"{prefix}. {option}"
-                )
+    def update_option_buttons(self):
+        app = App.get_running_app()
+        if self._option_pool is None:
+            self._option_pool = OptionWidgetPool(
+                self.ids.options_container,
+                on_select=app.select_answer,
+                on_toggle=app.update_multi_answer
+            )
 
-                if (len(app.user_answers) > app.question_index and 
-                    isinstance(app.user_answers[app.question_index], list)):
-                    option_widget.selected = prefix in app.user_answers[app.question_index]
+        session = app.session
+        if not session or not session.questions:
+            self.cancel_prerender()
+            self._option_pool.clear()
+            return
 
-                option_widget.bind(
-                    selected=lambda instance, value, p=prefix: 
-                    app.update_multi_answer(p, value))
+        self._option_pool.show(session.current_question, session.current_answer)
+        self.schedule_prerender(session)
+
+    _prerender_event = None
+
+    def schedule_prerender(self, session):
+        """空闲帧里逐个渲染前后题目的文字纹理, 每帧一个"""
+        self.cancel_prerender()
+        jobs = []
+        for offset in range(1, PRERENDER_NEIGHBORS + 1):
+            for index in (session.question_index + offset, session.question_index - offset):
+                if 0 <= index < len(session.questions):
+                    question = session.questions[index]
+                    jobs.append((self.ids.question_label, '\n' + question.question, None))
+                    jobs.extend(self._option_pool.texture_jobs(
+                        question, session.user_answers[index]))
+        if not jobs:
+            return
+        jobs.reverse()
 
-                options_container.add_widget(option_widget)
-            elif current_question.get('type') in single_types:
-                btn = DynamicOptionButton(
-                    text=f"{prefix}. {option}",
-                    on_press=lambda instance, p=prefix: setattr(app, 'selected_answer', p),
-                    group='answers_' + str(app.question_index),
-                )
+        def step(dt):
+            label, text, color = jobs.pop()
+            render_text_texture(label, text, color)
+            if not jobs:
+                self._prerender_event = None
+                return False
 
-                if (len(app.user_answers) > app.question_index and 
-                    isinstance(app.user_answers[app.question_index], str)):
-                    btn.state = 'down' if app.user_answers[app.question_index] == prefix else 'normal'
-                else:
-                    btn.state = 'normal'
+        self._prerender_event = Clock.schedule_interval(step, 0)
 
-                options_container.add_widget(btn)
+    def cancel_prerender(self):
+        if self._prerender_event is not None:
+            self._prerender_event.cancel()
+            self._prerender_event = None
 
 class ResultScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self._layout_initialized = False
+        self.results_view = None
 
     def on_pre_enter(self):
         self._layout_initialized = False
@@ -1016,6 +721,7 @@ class ResultScreen(Screen):
                 import traceback
                 traceback.print_exc()
                 self.clear_widgets()
+                ensure_font_covers([str(e)])
                 self.add_widget(Label(
                     text=f"加载结果出错: {str(e)}",
                     font_name='simhei',
@@ -1031,10 +737,6 @@ class ResultScreen(Screen):
         try:
             app = App.get_running_app()
 
-            quiz_info = None
-            if hasattr(app, 'last_quiz_name') and app.last_quiz_name:
-                quiz_info = app.db.get_quiz_info(app.last_quiz_name)
-
             self.clear_widgets()
 
             root_layout = BoxLayout(orientation='vertical', spacing=dp(10))
@@ -1082,100 +784,11 @@ class ResultScreen(Screen):
                 Rectangle(pos=separator.pos, size=separator.size)
             separator.bind(pos=self._update_rect, size=self._update_rect)
 
-            scroll_view = ScrollView(
-                size_hint=(1, 1),
-                bar_width=dp(20),
-                bar_color=(0.5, 0.5, 0.5, 0.7),
-                scroll_type=['bars', 'content']
-            )
-
-            results_layout = GridLayout(
-                cols=1,
-                size_hint_y=None,
-                spacing=dp(10),
-                padding=[dp(10), dp(5)]
-            )
-            results_layout.bind(minimum_height=results_layout.setter('height'))
-
-            for detail in app.result_details:
-                item = BoxLayout(
-                    orientation='vertical',
-                    size_hint_y=None,
-                    height=dp(200),
-                    spacing=dp(5),
-                    padding=[dp(10), dp(5)]
-                )
-
-                question_scroll = ScrollView(
-                    size_hint_y=None, 
-                    height=dp(100),
-                    bar_width=dp(26),
-                    bar_color=(0.5, 0.5, 0.5, 0.5)
-                )
-                question = Label(
-                    text=detail['question'],
-                    font_name='simhei',
-                    font_size=dp(18),
-                    size_hint_y=None,
-                    text_size=(Window.width - dp(40), None),
-                    halign='left',
-                    valign='middle',
-                    padding=(0, dp(5))
-                )
-                question.bind(texture_size=lambda lbl, val: setattr(lbl, 'height', max(dp(100), val[1])))
-                question_scroll.add_widget(question)
-
-                answer_label = Label(
-                    text=f"您的答案: {detail['user_answer']} | 正确答案: {detail['correct_answer']}",
-                    font_name='simhei',
-                    font_size=dp(16),
-                    color=(0, 0.7, 0, 1) if detail['is_correct'] else (1, 0, 0, 1),
-                    text_size=(Window.width - dp(40), None),
-                    halign='left',
-                    valign='middle',
-                    size_hint_y=None,
-                    height=dp(40)
-                )
-
-                bottom_info = BoxLayout(
-                    size_hint_y=None,
-                    height=dp(30),
-                    spacing=dp(10)
-                )
-                
-                bottom_info.add_widget(Label(
-                    text=f'得分: {detail["score"]}',
-                    font_name='simhei',
-                    font_size=dp(16),
-                    color=(0, 0.7, 0, 1) if detail['is_correct'] else (1, 0, 0, 1)
-                ))
-                
-                bottom_info.add_widget(Label(
-                    text=f'用时: {detail["time_used"]}',
-                    font_name='simhei',
-                    font_size=dp(16),
-                    color=(0.4, 0.4, 0.4, 1),
-                    halign='right'
-                ))
-
-                item_separator = BoxLayout(size_hint_y=None, height=dp(2))
-                with item_separator.canvas.before:
-                    Color(rgb=(0.8, 0.8, 0.8))
-                    Rectangle(pos=item_separator.pos, size=item_separator.size)
-                item_separator.bind(pos=self._update_rect, size=self._update_rect)
-
-                item.add_widget(question_scroll)
-                item.add_widget(answer_label)
-                item.add_widget(bottom_info)
-                item.add_widget(item_separator)
-                
-                results_layout.add_widget(item)
-            
-            scroll_view.add_widget(results_layout)
+            results_view = self.build_results_view(app.result_details)
 
             main_layout.add_widget(top_info_bar)
             main_layout.add_widget(separator)
-            main_layout.add_widget(scroll_view)
+            main_layout.add_widget(results_view)
 
             root_layout.add_widget(main_layout)
 
@@ -1202,22 +815,73 @@ class ResultScreen(Screen):
                 background_color=(0.8, 0.2, 0.2, 1)
             )
 
-            if quiz_info and quiz_info.get('source_type', 'json') == 'excel':
-                btn_layout.add_widget(restart_btn)
-                btn_layout.add_widget(home_btn)
-            else:
-                btn_layout.add_widget(restart_btn)
-                btn_layout.add_widget(home_btn)
+            btn_layout.add_widget(restart_btn)
+            btn_layout.add_widget(home_btn)
 
             root_layout.add_widget(btn_layout)
             
             self.add_widget(root_layout)
+            self.load_question_stats()
 
         except Exception as e:
             import traceback
             traceback.print_exc()
+            ensure_font_covers([str(e)])
             self.add_widget(Label(text=f"加载结果出错: {str(e)}", font_name='simhei'))
 
+    def build_results_view(self, result_details):
+        """
+        结果列表用RecycleView显示, 只为可见的几行创建控件, 滚动时复用。
+        每行高度固定, 打开结果页的耗时与题目数量无关。
+        """
+        self.results_view = RecycleView(
+            size_hint=(1, 1),
+            bar_width=dp(20),
+            bar_color=(0.5, 0.5, 0.5, 0.7),
+            scroll_type=['bars', 'content']
+        )
+        results_layout = RecycleBoxLayout(
+            orientation='vertical',
+            default_size=(None, dp(230)),
+            default_size_hint=(1, None),
+            size_hint_y=None,
+            spacing=dp(10),
+            padding=[dp(10), dp(5)]
+        )
+        results_layout.bind(minimum_height=results_layout.setter('height'))
+        self.results_view.add_widget(results_layout)
+        # viewclass要在添加布局之后设置, 才会传给布局
+        self.results_view.viewclass = ResultItem
+        self.results_view.data = [dict(detail, stats='') for detail in result_details]
+        return self.results_view
+
+    def load_question_stats(self):
+        """本次交卷记录写入后读取每题的累计统计, 统计包含本次作答"""
+        app = App.get_running_app()
+        question_ids = list({
+            row['question_id'] for row in self.results_view.data
+            if row.get('question_id') is not None
+        })
+        if not question_ids:
+            return
+        app.db.flush_attempts(
+            callback=lambda ids: app.db.submit(
+                'get_question_stats', question_ids,
+                callback=self.show_question_stats
+            )
+        )
+
+    def show_question_stats(self, stats):
+        if self.results_view is None:
+            return
+        for row in self.results_view.data:
+            item = stats.get(row.get('question_id'))
+            if item:
+                row['stats'] = (f"全部作答 {item['attempts']} 次  "
+                                f"正确率 {item['correct_rate']:.0%}  "
+                                f"平均用时 {self.format_time(item['avg_time'])}")
+        self.results_view.refresh_from_data()
+
     def _update_rect(self, instance, value):
         instance.canvas.before.clear()
         with instance.canvas.before:
@@ -1227,13 +891,120 @@ class ResultScreen(Screen):
                 Color(rgb=(0.8, 0.8, 0.8))
             Rectangle(pos=instance.pos, size=instance.size)
 
+
+class ResultItem(RecycleDataViewBehavior, BoxLayout):
+    """结果列表中的一行, 由RecycleView创建并在滚动时换上其他题目的数据"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.orientation = 'vertical'
+        self.size_hint_y = None
+        self.height = dp(230)
+        self.spacing = dp(5)
+        self.padding = [dp(10), dp(5)]
+
+        self.question_scroll = ScrollView(
+            size_hint_y=None,
+            height=dp(100),
+            bar_width=dp(26),
+            bar_color=(0.5, 0.5, 0.5, 0.5)
+        )
+        self.question_label = Label(
+            font_name='simhei',
+            font_size=dp(18),
+            size_hint_y=None,
+            text_size=(Window.width - dp(40), None),
+            halign='left',
+            valign='middle',
+            padding=(0, dp(5))
+        )
+        self.question_label.bind(
+            texture_size=lambda lbl, val: setattr(lbl, 'height', max(dp(100), val[1]))
+        )
+        self.question_scroll.add_widget(self.question_label)
+
+        self.answer_label = Label(
+            font_name='simhei',
+            font_size=dp(16),
+            text_size=(Window.width - dp(40), None),
+            halign='left',
+            valign='middle',
+            size_hint_y=None,
+            height=dp(40)
+        )
+
+        bottom_info = BoxLayout(
+            size_hint_y=None,
+            height=dp(30),
+            spacing=dp(10)
+        )
+        self.score_label = Label(
+            font_name='simhei',
+            font_size=dp(16)
+        )
+        self.time_label = Label(
+            font_name='simhei',
+            font_size=dp(16),
+            color=(0.4, 0.4, 0.4, 1),
+            halign='right'
+        )
+        bottom_info.add_widget(self.score_label)
+        bottom_info.add_widget(self.time_label)
+
+        self.stats_label = Label(
+            font_name='simhei',
+            font_size=dp(14),
+            color=(0.4, 0.4, 0.4, 1),
+            size_hint_y=None,
+            height=dp(30)
+        )
+
+        separator = BoxLayout(size_hint_y=None, height=dp(2))
+        with separator.canvas.before:
+            Color(rgb=(0.8, 0.8, 0.8))
+            separator_rect = Rectangle(pos=separator.pos, size=separator.size)
+        separator.bind(
+            pos=lambda instance, value: setattr(separator_rect, 'pos', value),
+            size=lambda instance, value: setattr(separator_rect, 'size', value)
+        )
+
+        self.add_widget(self.question_scroll)
+        self.add_widget(self.answer_label)
+        self.add_widget(bottom_info)
+        self.add_widget(self.stats_label)
+        self.add_widget(separator)
+
+    def refresh_view_attrs(self, rv, index, data):
+        # 只更新文字和颜色, 不把data中的键设置为控件属性
+        color = (0, 0.7, 0, 1) if data['is_correct'] else (1, 0, 0, 1)
+        self.question_label.text = data['question']
+        self.question_scroll.scroll_y = 1
+        self.answer_label.text = f"您的答案: {data['user_answer']} | 正确答案: {data['correct_answer']}"
+        self.answer_label.color = color
+        self.score_label.text = f'得分: {data["score"]}'
+        self.score_label.color = color
+        self.time_label.text = f'用时: {data["time_used"]}'
+        self.stats_label.text = data.get('stats', '')
+
 class FileSelectScreen(Screen):
-    def on_enter(self):
-        Clock.schedule_once(lambda dt: self.load_quiz_list(), 0.1)
+    """
+    题库列表。界面只创建一次, 列表由RecycleView显示;
+    每次进入只读取上次之后新增或被替换的题库, 并就地更新对应的行。
+    """
 
-    def load_quiz_list(self):
-        self.clear_widgets()
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._ready_seq = 0
+        self._quiz_index = {}
+        self._blueprint_names = None
+        self._refreshing = False
+        self._refresh_pending = False
+        self.setup_ui()
 
+    def on_enter(self):
+        self.refresh_quiz_list()
+
+    def setup_ui(self):
         layout = BoxLayout(orientation='vertical', spacing=dp(10), padding=dp(10))
 
         import_btn = Button(
@@ -1246,6 +1017,39 @@ class FileSelectScreen(Screen):
         import_btn.bind(on_press=self.goto_import)
         layout.add_widget(import_btn)
 
+        history_btn = Button(
+            text='历史记录',
+            size_hint_y=None,
+            height=dp(50),
+            font_name='simhei',
+            background_color=(0.5, 0.5, 0.5, 1)
+        )
+        history_btn.bind(on_press=self.goto_history)
+
+        wrong_btn = Button(
+            text='错题练习',
+            size_hint_y=None,
+            height=dp(50),
+            font_name='simhei',
+            background_color=(0.9, 0.5, 0.1, 1)
+        )
+        wrong_btn.bind(on_press=lambda instance: App.get_running_app().load_wrong_questions())
+
+        search_btn = Button(
+            text='搜索题目',
+            size_hint_y=None,
+            height=dp(50),
+            font_name='simhei',
+            background_color=(0.3, 0.6, 0.6, 1)
+        )
+        search_btn.bind(on_press=self.goto_search)
+
+        shortcut_layout = BoxLayout(size_hint_y=None, height=dp(50), spacing=dp(10))
+        shortcut_layout.add_widget(history_btn)
+        shortcut_layout.add_widget(wrong_btn)
+        shortcut_layout.add_widget(search_btn)
+        layout.add_widget(shortcut_layout)
+
         title = Label(
             text='选择题库',
             size_hint_y=None,
@@ -1256,61 +1060,403 @@ class FileSelectScreen(Screen):
         )
         layout.add_widget(title)
 
+        self.empty_label = Label(
+            text='',
+            size_hint_y=None,
+            height=0,
+            font_name='simhei',
+            font_size=dp(18),
+            color=(0.8, 0.2, 0.2, 1)
+        )
+        layout.add_widget(self.empty_label)
+
+        self.list_view = RecycleView()
+        list_layout = RecycleBoxLayout(
+            orientation='vertical',
+            default_size=(None, dp(60)),
+            default_size_hint=(1, None),
+            size_hint_y=None,
+            spacing=dp(10),
+            key_viewclass='viewclass'
+        )
+        list_layout.bind(minimum_height=list_layout.setter('height'))
+        self.list_view.add_widget(list_layout)
+        layout.add_widget(self.list_view)
+
+        self.add_widget(layout)
+
+    def refresh_quiz_list(self):
+        # 上一次读取还没有返回时, 等它完成后再读一次
+        if self._refreshing:
+            self._refresh_pending = True
+            return
+        self._refreshing = True
+
         app = App.get_running_app()
-        quiz_names = app.db.get_available_quizzes()
+        app.db.submit(
+            'get_quiz_summaries', self._ready_seq,
+            callback=self.apply_quiz_summaries,
+            error_callback=self._on_refresh_failed
+        )
 
-        if not quiz_names:
-            no_quiz_label = Label(
-                text='当前没有题库，请先导入题库',
-                size_hint_y=None,
-                height=dp(100),
-                font_name='simhei',
-                font_size=dp(18),
-                color=(0.8, 0.2, 0.2, 1)
-            )
-            layout.add_widget(no_quiz_label)
+    def apply_quiz_summaries(self, summaries):
+        ensure_font_covers(name for _, name, _ in summaries)
+        data = self.list_view.data
+        for ready_seq, name, count in summaries:
+            row = {'viewclass': 'QuizListRow', 'name': name, 'count': count}
+            index = self._quiz_index.get(name)
+            if index is None:
+                index = len(self._quiz_index)
+                data.insert(index, row)
+                self._quiz_index[name] = index
+            else:
+                data[index] = row
+            self._ready_seq = max(self._ready_seq, ready_seq)
+
+        if self._quiz_index:
+            self.empty_label.text = ''
+            self.empty_label.height = 0
         else:
-            scroll = ScrollView()
-            quiz_layout = GridLayout(cols=1, size_hint_y=None, spacing=dp(10))
-            quiz_layout.bind(minimum_height=quiz_layout.setter('height'))
-            scroll.add_widget(quiz_layout)
-            layout.add_widget(scroll)
-            
-            for name in quiz_names:
-                btn = Button(
-                    text=name,
-                    size_hint_y=None,
-                    height=dp(60),
-                    font_name='simhei'
-                )
-                btn.bind(on_press=lambda instance, n=name: app.load_questions(n))
-                quiz_layout.add_widget(btn)
+            self.empty_label.text = '当前没有题库，请先导入题库'
+            self.empty_label.height = dp(100)
 
-        self.add_widget(layout)
+        App.get_running_app().db.submit(
+            'get_blueprint_names',
+            callback=self.apply_blueprint_names,
+            error_callback=self._on_refresh_failed
+        )
+        startup_timer.report_once('quiz_list')
+
+    def apply_blueprint_names(self, blueprint_names):
+        if blueprint_names != self._blueprint_names:
+            ensure_font_covers(blueprint_names)
+            rows = []
+            if blueprint_names:
+                rows.append({'viewclass': 'QuizListTitle', 'text': '组卷方案', 'height': dp(40)})
+                rows.extend({'viewclass': 'BlueprintListRow', 'name': name} for name in blueprint_names)
+            data = self.list_view.data
+            # RecycleView不支持省略终点的切片赋值
+            data[len(self._quiz_index):len(data)] = rows
+            self._blueprint_names = blueprint_names
+        self._finish_refresh()
+
+    def _on_refresh_failed(self, error):
+        print(f"读取题库列表失败: {error}")
+        self._finish_refresh()
+
+    def _finish_refresh(self):
+        self._refreshing = False
+        if self._refresh_pending:
+            self._refresh_pending = False
+            self.refresh_quiz_list()
 
     def goto_import(self, instance):
         self.manager.current = 'excel_import'
 
+    def goto_history(self, instance):
+        self.manager.current = 'history'
+
+    def goto_search(self, instance):
+        self.manager.current = 'search'
+
+
+class QuizListRow(RecycleDataViewBehavior, BoxLayout):
+    """题库列表中的一行: 题库名称和题目数量, 右侧是今日复习按钮"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.name = ''
+        self.spacing = dp(10)
+
+        self.quiz_btn = Button(font_name='simhei', size_hint_y=1)
+        self.quiz_btn.bind(on_press=lambda instance: App.get_running_app().load_questions(self.name))
+        self.add_widget(self.quiz_btn)
+
+        review_btn = Button(
+            text='今日复习',
+            size_hint=(None, 1),
+            width=dp(100),
+            font_name='simhei',
+            background_color=(0.4, 0.4, 0.9, 1)
+        )
+        review_btn.bind(on_press=lambda instance: App.get_running_app().load_review(self.name))
+        self.add_widget(review_btn)
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.name = data['name']
+        self.quiz_btn.text = f"{data['name']}  ({data['count']}题)"
+
+
+class BlueprintListRow(RecycleDataViewBehavior, Button):
+    def __init__(self, **kwargs):
+        # 高度由列表布局决定, 不使用<Label>规则中按文字计算的高度
+        kwargs.setdefault('height', dp(60))
+        super().__init__(**kwargs)
+        self.name = ''
+        self.font_name = 'simhei'
+        self.background_color = (0.3, 0.7, 0.4, 1)
+        self.bind(on_press=lambda instance: App.get_running_app().load_blueprint(self.name))
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.name = data['name']
+        self.text = data['name']
+
+
+class QuizListTitle(RecycleDataViewBehavior, Label):
+    def __init__(self, **kwargs):
+        kwargs.setdefault('height', dp(40))
+        super().__init__(**kwargs)
+        self.font_name = 'simhei'
+        self.font_size = dp(20)
+        self.bold = True
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.text = data['text']
+
+
+Factory.register('QuizListRow', cls=QuizListRow)
+Factory.register('BlueprintListRow', cls=BlueprintListRow)
+Factory.register('QuizListTitle', cls=QuizListTitle)
+
+class HistoryScreen(Screen):
+    """交卷历史, 按时间倒序分页加载"""
+
+    def on_enter(self):
+        self.clear_widgets()
+        self._last_id = None
+        self._loading = False
+
+        layout = BoxLayout(orientation='vertical', spacing=dp(10), padding=dp(10))
+        layout.add_widget(Label(
+            text='历史记录',
+            size_hint_y=None,
+            height=dp(40),
+            font_name='simhei',
+            font_size=dp(20),
+            bold=True
+        ))
+
+        scroll = ScrollView()
+        self.history_layout = GridLayout(cols=1, size_hint_y=None, spacing=dp(5))
+        self.history_layout.bind(minimum_height=self.history_layout.setter('height'))
+        scroll.add_widget(self.history_layout)
+        layout.add_widget(scroll)
+
+        btn_layout = BoxLayout(size_hint_y=None, height=dp(60), spacing=dp(10))
+        self.more_btn = Button(
+            text='加载更多',
+            font_name='simhei',
+            font_size=dp(18),
+            disabled=True
+        )
+        self.more_btn.bind(on_press=lambda x: self.load_page())
+        back_btn = Button(
+            text='返回主页',
+            font_name='simhei',
+            font_size=dp(18),
+            background_color=(0.8, 0.2, 0.2, 1)
+        )
+        back_btn.bind(on_press=lambda x: setattr(self.manager, 'current', 'file_select'))
+        btn_layout.add_widget(self.more_btn)
+        btn_layout.add_widget(back_btn)
+        layout.add_widget(btn_layout)
+
+        self.add_widget(layout)
+
+        # 先写入缓冲中的交卷记录, 再读取第一页
+        app = App.get_running_app()
+        app.db.flush_attempts(
+            callback=lambda ids: self.load_page(),
+            error_callback=lambda error: self.load_page()
+        )
+
+    def load_page(self):
+        if self._loading:
+            return
+        self._loading = True
+        self.more_btn.disabled = True
+        app = App.get_running_app()
+        app.db.submit(
+            'get_attempts',
+            before_id=self._last_id,
+            limit=HISTORY_PAGE_SIZE,
+            callback=self.show_page,
+            error_callback=self._on_page_failed
+        )
+
+    def show_page(self, attempts):
+        self._loading = False
+        if self.manager.current != 'history':
+            return
+
+        if not attempts and self._last_id is None:
+            self.history_layout.add_widget(Label(
+                text='还没有交卷记录',
+                size_hint_y=None,
+                height=dp(60),
+                font_name='simhei',
+                font_size=dp(18)
+            ))
+
+        ensure_font_covers(attempt['blueprint_name'] or attempt['quiz_name'] or ''
+                           for attempt in attempts)
+        for attempt in attempts:
+            finished = time.strftime('%Y-%m-%d %H:%M', time.localtime(attempt['finished_at']))
+            name = attempt['blueprint_name'] or attempt['quiz_name'] or ''
+            self.history_layout.add_widget(Label(
+                text=(f"{finished}  {name}\n"
+                      f"得分 {attempt['total_score']}/{attempt['max_score']}  "
+                      f"答对 {attempt['correct_count']}/{attempt['question_count']}  "
+                      f"用时 {format_duration(attempt['total_time'])}"),
+                size_hint_y=None,
+                height=dp(60),
+                font_name='simhei',
+                font_size=dp(16),
+                halign='left',
+                valign='middle',
+                text_size=(Window.width - dp(40), None)
+            ))
+
+        if attempts:
+            self._last_id = attempts[-1]['id']
+        self.more_btn.disabled = len(attempts) < HISTORY_PAGE_SIZE
+
+    def _on_page_failed(self, error):
+        self._loading = False
+        print(f"读取历史记录失败: {error}")
+
+class SearchScreen(Screen):
+    """在所有题库中全文检索题干和选项"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._search_event = None
+        self._request = 0
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = BoxLayout(orientation='vertical', spacing=dp(10), padding=dp(10))
+
+        search_layout = BoxLayout(size_hint_y=None, height=dp(50), spacing=dp(10))
+        self.search_input = TextInput(
+            hint_text='输入题干或选项中的文字',
+            multiline=False,
+            font_name=FULL_FONT_NAME,
+            font_size=dp(18)
+        )
+        self.search_input.bind(text=self.on_search_text)
+        self.search_input.bind(on_text_validate=lambda instance: self.search())
+        search_btn = Button(
+            text='搜索',
+            size_hint_x=None,
+            width=dp(80),
+            font_name='simhei'
+        )
+        search_btn.bind(on_press=lambda instance: self.search())
+        search_layout.add_widget(self.search_input)
+        search_layout.add_widget(search_btn)
+        layout.add_widget(search_layout)
+
+        scroll = ScrollView()
+        self.result_layout = GridLayout(cols=1, size_hint_y=None, spacing=dp(5))
+        self.result_layout.bind(minimum_height=self.result_layout.setter('height'))
+        scroll.add_widget(self.result_layout)
+        layout.add_widget(scroll)
+
+        back_btn = Button(
+            text='返回主页',
+            size_hint_y=None,
+            height=dp(60),
+            font_name='simhei',
+            font_size=dp(18),
+            background_color=(0.8, 0.2, 0.2, 1)
+        )
+        back_btn.bind(on_press=lambda x: setattr(self.manager, 'current', 'file_select'))
+        layout.add_widget(back_btn)
+
+        self.add_widget(layout)
+
+    def on_search_text(self, instance, value):
+        if self._search_event:
+            self._search_event.cancel()
+        self._search_event = Clock.schedule_once(lambda dt: self.search(), SEARCH_DELAY)
+
+    def search(self):
+        if self._search_event:
+            self._search_event.cancel()
+            self._search_event = None
+
+        # 只显示最后一次检索的结果
+        self._request += 1
+        request = self._request
+        query = self.search_input.text.strip()
+        if not query:
+            self.result_layout.clear_widgets()
+            return
+
+        App.get_running_app().db.submit(
+            'search_questions', query,
+            callback=lambda hits: self.show_results(request, hits),
+            error_callback=self._on_search_failed
+        )
+
+    def show_results(self, request, hits):
+        if request != self._request:
+            return
+
+        self.result_layout.clear_widgets()
+        if not hits:
+            self.result_layout.add_widget(Label(
+                text='没有找到相关题目',
+                size_hint_y=None,
+                height=dp(60),
+                font_name='simhei',
+                font_size=dp(18)
+            ))
+            return
+
+        ensure_font_covers(text for quiz_name, question in hits
+                           for text in (quiz_name, question.question, *question.options))
+        for quiz_name, question in hits:
+            label = Label(
+                text=(f"[{quiz_name}] {question.question}\n"
+                      f"{'  '.join(question.options)}\n"
+                      f"答案: {format_answer(question.answer)}"),
+                size_hint_y=None,
+                font_name='simhei',
+                font_size=dp(16),
+                halign='left',
+                valign='top',
+                text_size=(Window.width - dp(40), None)
+            )
+            label.bind(texture_size=lambda instance, size: setattr(instance, 'height', size[1] + dp(10)))
+            self.result_layout.add_widget(label)
+
+    def _on_search_failed(self, error):
+        print(f"搜索题目失败: {error}")
+
 class QuizApp(App):
     current_question = StringProperty('请选择考卷...')
     options = ListProperty([])
     question_index = NumericProperty(0)
     selected_answer = StringProperty('')
     total_score = NumericProperty(0)
-    user_answers = ListProperty([])
     is_submitted = BooleanProperty(False)
     result_details = ListProperty([])
     last_quiz_name = StringProperty('')
-    question_types = DictProperty({})
+    last_blueprint_name = StringProperty('')
+    last_review = BooleanProperty(False)
     total_time_used = NumericProperty(0)
     current_time_used = StringProperty('00:00')
 
-    question_start_time = None
+    session = None
     time_event = None
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.db = QuizDatabase()
+        self.db = DatabaseService(
+            dispatch=lambda fn: Clock.schedule_once(lambda dt: fn(), 0)
+        )
 
     def build(self):
         if platform == 'android':
@@ -1323,15 +1469,28 @@ class QuizApp(App):
         self.quiz_screen = QuizScreen(name='quiz')
         self.result_screen = ResultScreen(name='result')
         self.excel_import_screen = ExcelImportScreen(name='excel_import')
+        self.history_screen = HistoryScreen(name='history')
+        self.search_screen = SearchScreen(name='search')
 
         self.sm.add_widget(self.file_select_screen)
         self.sm.add_widget(self.quiz_screen)
         self.sm.add_widget(self.result_screen)
         self.sm.add_widget(self.excel_import_screen)
+        self.sm.add_widget(self.history_screen)
+        self.sm.add_widget(self.search_screen)
+
+        # 排版宽度变了, 缓存的纹理都用不上了
+        Window.bind(on_resize=self.on_window_resize)
 
+        startup_timer.mark('build')
         return self.sm
 
+    def on_window_resize(self, window, width, height):
+        self.quiz_screen.cancel_prerender()
+        text_textures.clear()
+
     def on_start(self):
+        startup_timer.mark('on_start')
         self.time_event = Clock.schedule_interval(self.update_timer, 1)
 
     def on_stop(self):
@@ -1340,175 +1499,179 @@ class QuizApp(App):
             self.time_event.cancel()
 
     def reset_question_timer(self):
-        self.question_start_time = time.time()
+        if self.session:
+            self.session.start_timer()
         self.current_time_used = '00:00'
 
-    def record_current_question_time(self):
-        if self.question_start_time and hasattr(self, 'question_time_records'):
-            time_used = time.time() - self.question_start_time
-            self.question_time_records[self.question_index] += time_used
-            self.total_time_used += time_used
-            self.question_start_time = None
-
     def update_timer(self, dt):
-        if self.question_start_time and self.sm.current == 'quiz':
-            elapsed = time.time() - self.question_start_time
-            mins, secs = divmod(int(elapsed), 60)
-            self.current_time_used = f"{mins:02d}:{secs:02d}"
+        if self.session and self.session.question_start_time and self.sm.current == 'quiz':
+            self.current_time_used = format_duration(self.session.current_elapsed())
 
-    def get_available_quizzes(self):
-        return self.db.get_available_quizzes()
+    def get_available_quizzes(self, callback):
+        return self.db.submit('get_available_quizzes', callback=callback)
 
     def load_questions(self, quiz_name):
+        self.db.submit(
+            'sample_questions', quiz_name, QUIZ_QUESTION_COUNT,
+            callback=lambda questions: self._on_questions_loaded(quiz_name, questions),
+            error_callback=self._on_questions_failed
+        )
+
+    def load_wrong_questions(self):
+        self.db.flush_attempts(
+            callback=lambda ids: self.db.submit(
+                'sample_wrong_questions', QUIZ_QUESTION_COUNT,
+                callback=self._on_wrong_questions_loaded,
+                error_callback=self._on_questions_failed
+            )
+        )
+
+    def load_review(self, quiz_name):
+        # 先保存未写入的交卷记录, 刚复习过的题不会再次到期
+        self.db.flush_attempts(
+            callback=lambda ids: self.db.submit(
+                'get_due_questions', quiz_name,
+                callback=lambda questions: self._on_review_loaded(quiz_name, questions),
+                error_callback=self._on_questions_failed
+            )
+        )
+
+    def _on_review_loaded(self, quiz_name, questions):
+        if not questions:
+            self.show_error_message(f"题库 '{quiz_name}' 今天没有需要复习的题目")
+            if self.sm.current == 'result':
+                self.sm.current = 'file_select'
+            return
+
+        self.start_quiz(questions, quiz_name=quiz_name, review=True)
+        self.last_quiz_name = quiz_name
+        self.last_blueprint_name = ''
+        self.last_review = True
+
+    def _on_wrong_questions_loaded(self, questions):
+        if not questions:
+            self.show_error_message("错题本中还没有题目")
+            if self.sm.current == 'result':
+                self.sm.current = 'file_select'
+            return
+
+        self.start_quiz(questions, quiz_name=WRONG_BOOK_NAME)
+        self.last_quiz_name = WRONG_BOOK_NAME
+        self.last_blueprint_name = ''
+        self.last_review = False
+
+    def load_blueprint(self, blueprint_name):
+        self.db.submit(
+            'sample_blueprint', blueprint_name,
+            callback=lambda questions: self._on_blueprint_loaded(blueprint_name, questions),
+            error_callback=self._on_questions_failed
+        )
+
+    def _on_blueprint_loaded(self, blueprint_name, questions):
+        if not questions:
+            self._on_questions_failed(ValueError(f"组卷方案 '{blueprint_name}' 没有抽到题目"))
+            return
+
+        self.start_quiz(questions, blueprint_name=blueprint_name)
+        self.last_quiz_name = ''
+        self.last_blueprint_name = blueprint_name
+        self.last_review = False
+
+    def _on_questions_loaded(self, quiz_name, questions):
         try:
-            all_questions = self.db.get_questions_by_quiz_name(quiz_name)
-            if not all_questions:
+            if not questions:
                 raise ValueError(f"题库 '{quiz_name}' 中没有题目")
-            
-            self.start_quiz(all_questions)
+
+            self.start_quiz(questions, quiz_name=quiz_name)
             self.last_quiz_name = quiz_name
-            return True
+            self.last_blueprint_name = ''
+            self.last_review = False
 
         except Exception as e:
-            print(f"加载题库失败: {str(e)}")
-            self.current_question = f"加载题目失败: {str(e)}"
-            return False
+            self._on_questions_failed(e)
 
-    def start_quiz(self, all_questions):
+    def _on_questions_failed(self, error):
+        print(f"加载题库失败: {str(error)}")
+        text = f"加载题目失败: {str(error)}"
+        ensure_font_covers([text])
+        self.current_question = text
+
+    def start_quiz(self, questions, quiz_name=None, blueprint_name=None, review=False):
         if hasattr(self, 'result_screen'):
             self.result_screen._layout_initialized = False
             self.result_screen.clear_widgets()
 
-        question_count = min(30, len(all_questions))
-        self.questions = random.sample(all_questions, question_count)
-
-        self.user_answers = []
-        self.question_types = {}
-        self.total_time_used = 0
-        self.question_time_records = []
-
-        for i, q in enumerate(self.questions):
-            q_type = q.get('type', 'single')
-            self.question_types[i] = q_type
-            if q_type == 'multi':
-                self.user_answers.append([])
-            else:
-                self.user_answers.append('')
-            self.question_time_records.append(0)
-
-        self.question_index = 0
-        self.is_submitted = False
-        self.total_score = 0
-        self.result_details = []
-        self.selected_answer = ''
-        self.reset_question_timer()
+        ensure_font_covers(text for q in questions for text in (q.question, *q.options))
+        self.session = QuizSession(
+            questions, quiz_name=quiz_name, blueprint_name=blueprint_name, review=review
+        )
+        self._sync_session()
 
         self.update_question()
         self.sm.current = 'quiz'
 
-    def update_question(self):
-        if hasattr(self, 'questions') and self.questions:
-            self.record_current_question_time()
+    def _sync_session(self):
+        session = self.session
+        self.question_index = session.question_index
+        self.total_score = session.total_score
+        self.total_time_used = session.total_time_used
+        self.is_submitted = session.is_submitted
+        self.result_details = session.result_details
 
-            q = self.questions[self.question_index]
-            self.current_question = '\n' + q.get('question', '')
-            self.options = q.get('options', [])
+    def update_question(self):
+        if not self.session:
+            return
 
-            if len(self.user_answers) > self.question_index:
-                if self.question_types.get(self.question_index) == 'multi':
-                    pass
-                else:
-                    self.selected_answer = self.user_answers[self.question_index]
-            else:
-                self.selected_answer = ''
+        session = self.session
+        q = session.current_question
+        self.question_index = session.question_index
+        self.current_question = '\n' + q.question
+        self.options = list(q.options)
+        self.selected_answer = '' if q.is_multi else session.current_answer
 
-            if hasattr(self, 'quiz_screen'):
-                self.quiz_screen.update_option_buttons()
+        if hasattr(self, 'quiz_screen'):
+            self.quiz_screen.update_option_buttons()
 
-            next_btn = self.quiz_screen.ids.next_btn
-            next_btn.text = '交卷' if self.question_index == len(self.questions)-1 else '下一题'
+        next_btn = self.quiz_screen.ids.next_btn
+        next_btn.text = '交卷' if session.is_last else '下一题'
 
-            self.reset_question_timer()
+        self.reset_question_timer()
 
-    def update_multi_answer(self, prefix, is_selected):
-        if (self.question_index >= len(self.user_answers) or 
-            not isinstance(self.user_answers[self.question_index], list)):
-            return
+    def _reset_quiz_state(self):
+        self.session = None
+        self.question_index = 0
+        self.selected_answer = ''
+        self.total_score = 0
+        self.is_submitted = False
+        self.result_details = []
+        self.total_time_used = 0
+        self.current_time_used = '00:00'
 
-        current_answers = self.user_answers[self.question_index]
+    def select_answer(self, prefix):
+        self.selected_answer = prefix
+        self.session.select_answer(prefix)
 
-        if is_selected and prefix not in current_answers:
-            current_answers.append(prefix)
-        elif not is_selected and prefix in current_answers:
-            current_answers.remove(prefix)
+    def update_multi_answer(self, prefix, is_selected):
+        if self.session:
+            self.session.set_multi_option(prefix, is_selected)
 
     def prev_question(self):
-        if self.question_index > 0:
-            self.record_current_question_time()
-
-            if self.question_types.get(self.question_index) != 'multi':
-                self.user_answers[self.question_index] = self.selected_answer
-            self.question_index -= 1
+        if self.session and self.session.prev():
             self.update_question()
 
     def next_question(self):
-        if not hasattr(self, 'questions') or not self.questions:
+        if not self.session:
             return
 
-        self.record_current_question_time()
-
-        if self.question_types.get(self.question_index) != 'multi':
-            self.user_answers[self.question_index] = self.selected_answer
-
-        if self.question_index < len(self.questions) - 1:
-            self.question_index += 1
+        if self.session.next():
             self.update_question()
         else:
             self.submit_quiz()
 
     def submit_quiz(self):
-        self.record_current_question_time()
-
-        if self.question_types.get(self.question_index) != 'multi':
-            self.user_answers[self.question_index] = self.selected_answer
-
-        self.is_submitted = True
-        self.total_score = 0
-        self.result_details = []
-
-        for i, user_answer in enumerate(self.user_answers):
-            if i >= len(self.questions):
-                continue
-
-            correct_answer = self.questions[i].get('answer', '')
-            q_type = self.questions[i].get('type', 'single')
-
-            if q_type in ['single', 'grammar', 'vocabulary', 'culture', 'judge', 'cloze']:
-                is_correct = str(user_answer).upper() == str(correct_answer).upper()
-                score = self.questions[i].get('score', 0) if is_correct else 0
-                self.total_score += score
-            elif q_type == 'multi':
-                correct_answers = sorted([x.upper() for x in (correct_answer if isinstance(correct_answer, list) else [correct_answer])])
-                user_answers = sorted([x.upper() for x in (user_answer if isinstance(user_answer, list) else [])])
-                is_correct = correct_answers == user_answers
-                score = self.questions[i].get('score', 0) if is_correct else 0
-                self.total_score += score
-
-            time_used = self.question_time_records[i]
-            minutes = int(time_used // 60)
-            seconds = int(time_used % 60)
-            time_str = f"{minutes:02d}:{seconds:02d}"
-
-            self.result_details.append({
-                'question': f"{i+1}. {self.questions[i].get('question', '')}",
-                'user_answer': ', '.join(user_answer) if isinstance(user_answer, list) else user_answer if user_answer else '未作答',
-                'correct_answer': ', '.join(correct_answer) if isinstance(correct_answer, list) else correct_answer,
-                'is_correct': is_correct,
-                'score': score,
-                'time_used': time_str,
-                'type': q_type
-            })
-
+        self.session.submit()
+        self._sync_session()
+        self.db.record_attempt(self.session.attempt_record())
         self.sm.current = 'result'
 
     def restart_quiz(self):
@@ -1517,21 +1680,31 @@ class QuizApp(App):
                 self.result_screen._layout_initialized = False
                 self.result_screen.clear_widgets()
 
-            self.question_index = 0
-            self.selected_answer = ''
-            self.total_score = 0
-            self.user_answers = []
-            self.is_submitted = False
-            self.result_details = []
-            self.total_time_used = 0
-            self.current_time_used = '00:00'
-            self.question_start_time = None
+            self._reset_quiz_state()
+
+            if self.last_quiz_name == WRONG_BOOK_NAME:
+                self.load_wrong_questions()
+                return
+
+            if self.last_review and self.last_quiz_name:
+                self.load_review(self.last_quiz_name)
+                return
+
+            if self.last_blueprint_name:
+                self.db.submit(
+                    'sample_blueprint', self.last_blueprint_name,
+                    callback=self._on_restart_loaded,
+                    error_callback=self._on_restart_failed
+                )
+                return
 
             if hasattr(self, 'last_quiz_name') and self.last_quiz_name:
-                all_questions = self.db.get_questions_by_quiz_name(self.last_quiz_name)
-                if all_questions:
-                    self.start_quiz(all_questions)
-                    return
+                self.db.submit(
+                    'sample_questions', self.last_quiz_name, QUIZ_QUESTION_COUNT,
+                    callback=self._on_restart_loaded,
+                    error_callback=self._on_restart_failed
+                )
+                return
 
             self.sm.current = 'file_select'
 
@@ -1541,7 +1714,22 @@ class QuizApp(App):
             self.show_error_message(f"重新测试失败: {str(e)}")
             self.sm.current = 'file_select'
 
+    def _on_restart_loaded(self, questions):
+        if questions:
+            self.start_quiz(
+                questions,
+                quiz_name=self.last_quiz_name or None,
+                blueprint_name=self.last_blueprint_name or None
+            )
+        else:
+            self.sm.current = 'file_select'
+
+    def _on_restart_failed(self, error):
+        self.show_error_message(f"重新测试失败: {str(error)}")
+        self.sm.current = 'file_select'
+
     def show_error_message(self, message):
+        ensure_font_covers([message])
         content = BoxLayout(orientation='vertical', padding=dp(10), spacing=dp(10))
         content.add_widget(Label(text=message, font_name='simhei'))
 
@@ -1556,21 +1744,148 @@ class QuizApp(App):
             self.result_screen._layout_initialized = False
             self.result_screen.clear_widgets()
 
-        self.question_index = 0
-        self.selected_answer = ''
-        self.total_score = 0
-        self.user_answers = []
-        self.is_submitted = False
-        self.result_details = []
-        self.total_time_used = 0
-        self.current_time_used = '00:00'
-        self.question_start_time = None
+        self._reset_quiz_state()
 
         self.sm.current = 'file_select'
 
-class DynamicOptionButton(ToggleButton):
+text_textures = TextureCache()
+
+
+def render_text_texture(label, text, color=None):
+    """
+    按label当前的字体和排版参数渲染text, 结果放进纹理缓存。
+    文字颜色会画进纹理里, 所以颜色也是键的一部分。
+    """
+    options = label._label.options
+    usersize = label._label.usersize
+    color = tuple(color or options['color'])
+    key = (text, tuple(usersize), options['font_name'], options['font_size'],
+           tuple(options['padding']), options['halign'], options['valign'],
+           options['bold'], color)
+    texture = text_textures.get(key)
+    if texture is None:
+        # 每次用新的CoreLabel渲染, 它会复用自己的纹理对象, 不能和缓存共用
+        core = CoreLabel(**dict(options, text=text, color=color))
+        core.usersize = usersize
+        core.refresh()
+        texture = core.texture
+        if texture is None:
+            return None
+        text_textures.put(key, texture)
+    return texture
+
+
+class CachedTextureMixin:
+    """文字纹理先查缓存, 翻回看过或预渲染过的题目时只替换纹理"""
+
+    def texture_update(self, *largs):
+        if self.markup or not self.text.strip():
+            return super().texture_update(*largs)
+        texture = render_text_texture(self, self.text)
+        if texture is None:
+            return super().texture_update(*largs)
+        self.texture = texture
+        self.texture_size = list(texture.size)
+        self.is_shortened = False
+
+
+class CachedLabel(CachedTextureMixin, Label):
     pass
 
+
+Factory.register('CachedLabel', cls=CachedLabel)
+
+
+class DynamicOptionButton(CachedTextureMixin, ToggleButton):
+    prefix = StringProperty('')
+
+
+class OptionWidgetPool:
+    """
+    复用题目的选项控件。翻页时只修改已有控件的文字和选中状态,
+    不再每题重新创建按钮、绑定事件和画布指令; 控件数量只按最多选项数增长。
+    """
+
+    def __init__(self, container, on_select, on_toggle):
+        self.container = container
+        self.on_select = on_select
+        self.on_toggle = on_toggle
+        self._buttons = []
+        self._multi_options = []
+        # 切换题目时设置选中状态不应回调到会话
+        self._updating = False
+
+    def _button(self, index):
+        while len(self._buttons) <= index:
+            btn = DynamicOptionButton(group='answers')
+            btn.bind(on_press=self._on_button_press)
+            self._buttons.append(btn)
+        return self._buttons[index]
+
+    def _multi_option(self, index):
+        while len(self._multi_options) <= index:
+            option = MultiSelectOption()
+            option.bind(selected=self._on_multi_selected)
+            self._multi_options.append(option)
+        return self._multi_options[index]
+
+    def _on_button_press(self, instance):
+        if not self._updating:
+            self.on_select(instance.prefix)
+
+    def _on_multi_selected(self, instance, value):
+        if not self._updating:
+            self.on_toggle(instance.prefix, value)
+
+    def show(self, question, answer):
+        widgets = []
+        self._updating = True
+        try:
+            for i, option in enumerate(question.options):
+                prefix = chr(65 + i)
+                if question.is_multi:
+                    widget = self._multi_option(i)
+                    widget.prefix = prefix
+                    widget.text = f"{prefix}. {option}"
+                    widget.selected = isinstance(answer, list) and prefix in answer
+                elif question.type in SINGLE_TYPES:
+                    widget = self._button(i)
+                    widget.prefix = prefix
+                    widget.text = f"{prefix}. {option}"
+                    widget.state = 'down' if answer == prefix else 'normal'
+                else:
+                    continue
+                widgets.append(widget)
+        finally:
+            self._updating = False
+
+        # 控件顺序不变时不触碰容器, 避免重新布局
+        if self.container.children[::-1] != widgets:
+            self.container.clear_widgets()
+            for widget in widgets:
+                self.container.add_widget(widget)
+
+    def texture_jobs(self, question, answer):
+        """返回显示question时各选项要渲染的(标签, 文字, 颜色)"""
+        jobs = []
+        for i, option in enumerate(question.options):
+            prefix = chr(65 + i)
+            text = f"{prefix}. {option}"
+            if question.is_multi:
+                widget = self._multi_option(0)
+                selected = isinstance(answer, list) and prefix in answer
+                color = widget.selected_text_color if selected else widget.default_text_color
+                jobs.append((widget.label, text, color))
+            elif question.type in SINGLE_TYPES:
+                # 按钮的排版宽度来自容器布局, 还没显示过按钮时无法预知
+                if not self._buttons or self._buttons[0].parent is None:
+                    break
+                jobs.append((self._buttons[0], text, None))
+        return jobs
+
+    def clear(self):
+        self.container.clear_widgets()
+
 class MultiSelectOption(BoxLayout):
     prefix = StringProperty('')
     text = StringProperty('')
@@ -1582,6 +1897,7 @@ class MultiSelectOption(BoxLayout):
         self.bg_color = (0.3, 0.3, 0.3, 1)
         self.default_text_color = (1, 1, 1, 1)
         self.selected_bg_color = (0.1, 0.5, 0.8, 1)
+        self.selected_text_color = (0, 0, 0.5, 1)
 
         self.orientation = 'horizontal'
         self.size_hint_y = None
@@ -1603,7 +1919,7 @@ class MultiSelectOption(BoxLayout):
             size_hint_y=None
         )
 
-        self.label = Label(
+        self.label = CachedLabel(
             text=self.text,
             size_hint_y=None,
             halign='left',
@@ -1639,7 +1955,7 @@ class MultiSelectOption(BoxLayout):
 
     def _init_background(self):
         with self.canvas.before:
-            Color(*self.bg_color)
+            self.background_color = Color(*self.bg_color)
             self.background_rect = Rectangle(pos=self.pos, size=self.size)
 
     def _update_background(self, *args):
@@ -1660,15 +1976,14 @@ class MultiSelectOption(BoxLayout):
         self.selected = not self.selected
 
     def _update_style(self, instance, value):
-        with self.canvas.before:
-            self.canvas.before.clear()
-            if value:
-                Color(*self.selected_bg_color)
-                self.label.color = (0, 0, 0.5, 1)
-            else:
-                Color(*self.bg_color)
-                self.label.color = self.default_text_color
-            self.background_rect = Rectangle(pos=self.pos, size=self.size)
+        # 只修改已有的颜色指令, 复用控件时不产生新的画布指令
+        self.checkbox.active = value
+        if value:
+            self.background_color.rgba = self.selected_bg_color
+            self.label.color = self.selected_text_color
+        else:
+            self.background_color.rgba = self.bg_color
+            self.label.color = self.default_text_color
 
 if platform == 'android':
     font_path = 'assets/font/simhei.ttf'
@@ -1693,7 +2008,37 @@ if not loaded and platform == 'android':
 
 if not loaded:
     print(f"字体文件加载失败: {font_path}")
-    LabelBase.register(name='simhei', fn_regular='DroidSans')
+    LabelBase.register(name='simhei', fn_regular='data/fonts/Roboto-Regular.ttf')
+
+LabelBase.register(name=FULL_FONT_NAME,
+                   fn_regular=font_path if loaded else 'data/fonts/Roboto-Regular.ttf')
+
+# 有构建时生成的裁剪字体就先用它, 字体文件小很多, 启动更快、占用内存更少
+font_charset = None
+if loaded:
+    subset_path = subset_font_path(font_path)
+    font_charset = load_charset(charset_path(subset_path))
+    if font_charset is not None:
+        try:
+            LabelBase.register(name='simhei', fn_regular=subset_path)
+        except Exception as e:
+            print(f"裁剪字体加载失败: {e}")
+            font_charset = None
+
+
+def ensure_font_covers(texts):
+    """要显示的文字里有裁剪字体没有的字时, 切换回完整字体"""
+    global font_charset
+    if font_charset is None:
+        return
+    missing = missing_chars(texts, font_charset)
+    if not missing:
+        return
+    print(f"裁剪字体缺少 {len(missing)} 个字, 改用完整字体")
+    LabelBase.register(name='simhei', fn_regular=font_path)
+    font_charset = None
+    # 缓存的纹理是用裁剪字体渲染的
+    text_textures.clear()
 
 Builder.load_string('''
 #:import dp kivy.metrics.dp
@@ -1767,7 +2112,7 @@ Builder.load_string('''
                     size_hint_x: 0.2
 
             ScrollView:
-                Label:
+                CachedLabel:
                     id: question_label
                     text: app.current_question
                     font_name: 'simhei'
@@ -1810,132 +2155,6 @@ Builder.load_string('''
                 font_name: 'simhei'
                 font_size: dp(20)
                 halign: 'center'
-
-<ResultScreen>:
-    ScrollView:
-        GridLayout:
-            cols: 1
-            size_hint_y: None
-            height: self.minimum_height
-            spacing: dp(10)
-            padding: dp(10)
-
-            BoxLayout:
-                size_hint_y: None
-                height: dp(50)
-                spacing: dp(10)
-
-                BoxLayout:
-                    orientation: 'vertical'
-                    size_hint_x: 0.7
-                    spacing: dp(2)
-                    Label:
-                        text: '测验结果 - 总分: ' + str(app.total_score)
-                        font_name: 'simhei'
-                        font_size: dp(24)
-                        bold: True
-                    Label:
-                        text: '总用时: ' + root.format_time(app.total_time_used)
-                        font_name: 'simhei'
-                        font_size: dp(16)
-                        color: (0.4, 0.4, 0.4, 1)
-
-                Button:
-                    text: '重新测试'
-                    on_press: app.restart_quiz()
-                    size_hint_x: 0.3
-                    font_name: 'simhei'
-                    font_size: dp(18)
-                    background_color: (0.2, 0.6, 1, 1)
-
-            BoxLayout:
-                size_hint_y: None
-                height: dp(2)
-                canvas:
-                    Color:
-                        rgb: 0.5, 0.5, 0.5
-                    Rectangle:
-                        pos: self.pos
-                        size: self.size
-
-            RecycleView:
-                data: app.result_details
-                viewclass: 'ResultItem'
-                size_hint_y: None
-                height: dp(400)
-
-                RecycleBoxLayout:
-                    default_size: None, dp(80)
-                    default_size_hint: 1, None
-                    size_hint_y: None
-                    height: self.minimum_height
-                    orientation: 'vertical'
-                    spacing: dp(5)
-
-<ResultItem@BoxLayout>:
-    orientation: 'vertical'
-    padding: dp(10)
-    size_hint_y: None
-    height: self.minimum_height
-    question: ''
-    user_answer: ''
-    correct_answer: ''
-    is_correct: False
-    score: 0
-    time_used: '00:00'
-
-    Label:
-        text: root.question
-        font_name: 'simhei'
-        font_size: dp(18)
-        size_hint_y: 1
-        text_size: self.width - dp(20), None
-        halign: 'left'
-        valign: 'middle'
-        padding: (dp(10), dp(10))
-
-    BoxLayout:
-        size_hint_y: None
-        height: dp(30)
-        spacing: dp(10)
-
-        Label:
-            text: '您的答案: ' + root.user_answer
-            font_name: 'simhei'
-            font_size: dp(16)
-            color: (0, 0.7, 0, 1) if root.is_correct else (1, 0, 0, 1)
-
-        Label:
-            text: '正确答案: ' + root.correct_answer
-            font_name: 'simhei'
-            font_size: dp(16)
-            color: (0, 0.7, 0, 1)
-
-        Label:
-            text: '得分: ' + str(root.score)
-            font_name: 'simhei'
-            font_size: dp(16)
-            color: (0, 0.7, 0, 1) if root.is_correct else (1, 0, 0, 1)
-
-    BoxLayout:
-        size_hint_y: None
-        height: dp(20)
-        Label:
-            text: '用时: ' + root.time_used
-            font_name: 'simhei'
-            font_size: dp(14)
-            color: (0.4, 0.4, 0.4, 1)
-            halign: 'right'
-
-    BoxLayout:
-        size_hint_y: None
-        height: dp(2)
-        canvas:
-            Color:
-                rgb: 0.8, 0.8, 0.8
-            Rectangle:
-                pos: self.pos
-                size: self.size
 ''')
 
 if __name__ == '__main__':
@@ -0,0 +1,112 @@
+"""
+批量生成随机试卷。
+
+每份试卷使用由总seed和试卷序号派生的随机数生成器, 结果可复现:
+先从题库中抽题并打乱顺序, 再打乱每道题的选项, 同时按新的选项顺序改写答案。
+判断题保持"正确/错误"的顺序, 答案无法对应到选项的题目也不打乱选项。
+题库只在内存中保存题目id, 题目内容按试卷逐份读取, 生成的试卷和答案逐行写出。
+"""
+import json
+import random
+
+from question import JUDGE_TYPE, letters_to_mask, mask_to_letters
+
+MAX_DRAW_ATTEMPTS = 10
+
+
+def paper_rng(seed, paper_no):
+    return random.Random(f"{seed}:{paper_no}")
+
+
+def shuffle_question(question, rng):
+    """
+    打乱一道题的选项, 返回(选项列表, 新答案, 选项顺序)。
+    选项顺序order满足: 新的第i个选项是原来的第order[i]个选项。
+    """
+    options = list(question.options)
+    order = list(range(len(options)))
+    answer = question.answer
+    if question.type == JUDGE_TYPE or len(options) < 2:
+        return options, answer, order
+
+    if question.is_multi:
+        mask = question.answer_key
+        if mask is None or mask >> len(options):
+            return options, answer, order
+        rng.shuffle(order)
+        new_mask = 0
+        for new_index, old_index in enumerate(order):
+            if mask >> old_index & 1:
+                new_mask |= 1 << new_index
+        return [options[i] for i in order], mask_to_letters(new_mask), order
+
+    mask = letters_to_mask([answer]) if len(answer) == 1 else None
+    if not mask or mask >> len(options):
+        return options, answer, order
+    rng.shuffle(order)
+    old_index = mask.bit_length() - 1
+    return [options[i] for i in order], chr(65 + order.index(old_index)), order
+
+
+def build_paper(db, question_ids, paper_no, rng, questions_per_paper):
+    ids = rng.sample(question_ids, min(questions_per_paper, len(question_ids)))
+    questions = db.get_questions_map(ids)
+
+    items = []
+    answers = {}
+    option_orders = {}
+    for number, question_id in enumerate(ids, 1):
+        question = questions[question_id]
+        options, answer, order = shuffle_question(question, rng)
+        items.append({
+            'no': number,
+            'id': question_id,
+            'question': question.question,
+            'options': options,
+            'type': question.type,
+            'score': question.score
+        })
+        answers[question_id] = answer
+        option_orders[question_id] = order
+
+    paper = {'paper': paper_no, 'questions': items}
+    key = {'paper': paper_no, 'answers': answers, 'option_orders': option_orders}
+    return ids, paper, key
+
+
+def generate_papers(db, quiz_name, count, questions_per_paper, seed=0):
+    """
+    逐份产生(试卷, 答案)。试卷之间的题目组成和顺序互不相同;
+    题库太小无法再生成不同的试卷时, 提前结束。
+    """
+    question_ids = db.get_question_ids(quiz_name)
+    if not question_ids:
+        return
+
+    seen = set()
+    for paper_no in range(1, count + 1):
+        for attempt in range(MAX_DRAW_ATTEMPTS):
+            rng = paper_rng(seed if attempt == 0 else f"{seed}#{attempt}", paper_no)
+            ids, paper, key = build_paper(db, question_ids, paper_no, rng, questions_per_paper)
+            fingerprint = hash(tuple(ids))
+            if fingerprint not in seen:
+                break
+        else:
+            return
+        seen.add(fingerprint)
+        yield paper, key
+
+
+def write_papers(db, quiz_name, count, questions_per_paper, papers_path, keys_path,
+                 seed=0, progress_callback=None):
+    """把试卷和答案分别逐行写入两个JSONL文件, 返回生成的试卷数"""
+    written = 0
+    with open(papers_path, 'w', encoding='utf-8') as papers, \
+            open(keys_path, 'w', encoding='utf-8') as keys:
+        for paper, key in generate_papers(db, quiz_name, count, questions_per_paper, seed):
+            papers.write(json.dumps(paper, ensure_ascii=False) + '\n')
+            keys.write(json.dumps(key, ensure_ascii=False) + '\n')
+            written += 1
+            if progress_callback:
+                progress_callback(written)
+    return written
@@ -0,0 +1,91 @@
+"""
+从数据库读出的题目。
+
+Question使用__slots__, 题型、选项和答案等重复出现的字符串经过intern共享。
+答案在解码时就规范化好: 单选、判断等为大写字符串, 多选为选项字母的位掩码,
+判分只需要一次比较。
+"""
+import json
+import sys
+
+MULTI_TYPE = 'multi'
+JUDGE_TYPE = 'judge'
+SINGLE_TYPES = ('single', 'grammar', 'vocabulary', 'culture', 'judge', 'cloze')
+
+_intern = sys.intern
+
+
+def letters_to_mask(letters):
+    """把选项字母列表转换为位掩码(A为第0位), 含有非单个字母的元素时返回None"""
+    mask = 0
+    for letter in letters:
+        if not isinstance(letter, str) or len(letter) != 1:
+            return None
+        index = ord(letter.upper()) - 65
+        if not 0 <= index < 26:
+            return None
+        mask |= 1 << index
+    return mask
+
+
+def mask_to_letters(mask):
+    return [chr(65 + i) for i in range(26) if mask >> i & 1]
+
+
+class Question:
+    __slots__ = ('id', 'question', 'options', 'type', 'score', 'answer_key')
+
+    def __init__(self, question, options, answer, q_type='single', score=1, question_id=None):
+        self.id = question_id
+        self.question = question
+        self.options = tuple(_intern(opt) if isinstance(opt, str) else opt for opt in options)
+        self.type = _intern(q_type)
+        self.score = score
+        if q_type == MULTI_TYPE:
+            # 与原来的判分一致: 非列表的答案视为只有一个元素的列表
+            self.answer_key = letters_to_mask(answer if isinstance(answer, list) else [answer])
+        else:
+            self.answer_key = _intern(str(answer).upper())
+
+    @classmethod
+    def from_row(cls, row, question_id=None):
+        """由(question, options, answer, type, score)行创建"""
+        question, options_json, answer, q_type, score = row
+        if q_type == MULTI_TYPE:
+            answer = json.loads(answer)
+        return cls(question, json.loads(options_json), answer, q_type, score, question_id)
+
+    @property
+    def is_multi(self):
+        return self.type == MULTI_TYPE
+
+    @property
+    def answer(self):
+        """用于显示的正确答案: 多选为字母列表, 其他题型为字符串"""
+        if self.type == MULTI_TYPE:
+            return mask_to_letters(self.answer_key) if self.answer_key is not None else []
+        return self.answer_key
+
+    def is_correct(self, user_answer):
+        if self.type == MULTI_TYPE:
+            if self.answer_key is None:
+                return False
+            user_mask = letters_to_mask(user_answer) if isinstance(user_answer, list) else 0
+            return user_mask == self.answer_key
+        if self.type in SINGLE_TYPES:
+            return str(user_answer).upper() == self.answer_key
+        return False
+
+    def grade(self, user_answer):
+        """返回(是否正确, 得分)"""
+        correct = self.is_correct(user_answer)
+        return correct, self.score if correct else 0
+
+    def to_dict(self):
+        return {
+            'question': self.question,
+            'options': list(self.options),
+            'answer': self.answer,
+            'type': self.type,
+            'score': self.score
+        }
@@ -0,0 +1,943 @@
+import json
+import os
+import random
+import re
+import sqlite3
+import time
+from itertools import islice
+
+from bank_cache import BankCache
+from blueprint import allocate, normalize_spec
+from question import Question
+from quiz_migrations import apply_migrations
+from scheduler import answer_quality, review_cutoff, sm2_update
+from search_index import build_match_query, segment, segment_options
+from wrong_book import WrongAnswerBook
+
+BULK_BATCH_SIZE = 2000
+SQL_VARIABLE_CHUNK = 500
+# 题库题数不超过抽题数的该倍数时整体解码并缓存, 之后的抽题不再解码;
+# 更大的题库只解码抽中的k道题, 这些题按id缓存在BankCache中, 占用有上限
+CACHE_BANK_SAMPLE_RATIO = 10
+REVIEW_SESSION_SIZE = 30
+NEW_CARDS_PER_SESSION = 10
+SEARCH_LIMIT = 50
+
+INSERT_QUESTION_SQL = '''
+INSERT INTO questions (
+    quiz_id, question, options, answer, type, score
+) VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+
+INSERT_ATTEMPT_ANSWER_SQL = '''
+INSERT INTO attempt_answers (
+    attempt_id, position, question_id, user_answer, is_correct, score, time_used
+) VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+UPDATE_QUESTION_STATS_SQL = '''
+INSERT INTO question_stats (question_id, quiz_id, attempts, correct, total_time)
+SELECT id, quiz_id, ?, ?, ? FROM questions WHERE id = ?
+ON CONFLICT(question_id) DO UPDATE SET
+    attempts = attempts + excluded.attempts,
+    correct = correct + excluded.correct,
+    total_time = total_time + excluded.total_time
+'''
+
+
+RECORD_MISS_SQL = '''
+INSERT INTO wrong_answers (question_id, quiz_id, miss_count, last_missed_at)
+SELECT id, quiz_id, 1, ? FROM questions WHERE id = ?
+ON CONFLICT(question_id) DO UPDATE SET
+    miss_count = miss_count + 1,
+    last_missed_at = excluded.last_missed_at
+'''
+
+RECORD_HIT_SQL = '''
+UPDATE wrong_answers SET miss_count = miss_count - 1 WHERE question_id = ?
+'''
+
+
+# 把题库中id大于给定值的题目写入全文索引, 分词由连接上注册的Python函数完成
+INDEX_QUESTIONS_SQL = '''
+INSERT INTO question_fts (rowid, question, options)
+SELECT id, search_text(question), search_options(options)
+FROM questions
+WHERE quiz_id = ? AND id > ?
+'''
+
+# 题库导入完成时依次执行, 记录题目数量并分配新的ready_seq
+NEXT_QUIZ_SEQ_SQL = 'UPDATE quiz_list_seq SET seq = seq + 1 WHERE id = 0'
+
+MARK_QUIZ_READY_SQL = '''
+UPDATE quizzes SET
+    status = 'ready',
+    question_count = ?,
+    ready_seq = (SELECT seq FROM quiz_list_seq WHERE id = 0)
+WHERE id = ?
+'''
+
+UNINDEX_QUIZ_SQL = '''
+DELETE FROM question_fts WHERE rowid IN (SELECT id FROM questions WHERE quiz_id = ?)
+'''
+
+
+UPSERT_REVIEW_CARD_SQL = '''
+INSERT INTO review_cards (
+    question_id, quiz_id, ease, interval_days, repetitions, due_at, last_reviewed_at
+)
+SELECT id, quiz_id, ?, ?, ?, ?, ? FROM questions WHERE id = ?
+ON CONFLICT(question_id) DO UPDATE SET
+    ease = excluded.ease,
+    interval_days = excluded.interval_days,
+    repetitions = excluded.repetitions,
+    due_at = excluded.due_at,
+    last_reviewed_at = excluded.last_reviewed_at
+'''
+
+ADVANCE_NEW_CURSOR_SQL = '''
+INSERT INTO review_progress (quiz_id, new_cursor)
+SELECT quiz_id, id FROM questions WHERE id = ?
+ON CONFLICT(quiz_id) DO UPDATE SET
+    new_cursor = MAX(new_cursor, excluded.new_cursor)
+'''
+
+
+def question_to_row(quiz_id, q):
+    """把题目字典转换为questions表的一行"""
+    answer = q['answer']
+    return (
+        quiz_id,
+        q['question'],
+        json.dumps(q['options'], ensure_ascii=False),
+        json.dumps(answer, ensure_ascii=False) if isinstance(answer, list) else answer,
+        q.get('type', 'single'),
+        q.get('score', 1)
+    )
+
+
+def row_to_question(row):
+    """把(id, question, options, answer, type, score)行解码为Question"""
+    return Question.from_row(row[1:], row[0])
+
+
+def _stats_dict(attempts, correct, total_time):
+    return {
+        'attempts': attempts,
+        'correct': correct,
+        'correct_rate': correct / attempts if attempts else 0.0,
+        'avg_time': total_time / attempts if attempts else 0.0,
+    }
+
+
+def _chunks(items, size=SQL_VARIABLE_CHUNK):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class QuizDatabase:
+    def __init__(self, db_path='data/quiz.db', cache=None, wrong_book=None):
+        self.db_path = db_path
+        self.conn = None
+        self.cache = cache if cache is not None else BankCache()
+        self.wrong_book = wrong_book if wrong_book is not None else WrongAnswerBook()
+        self._initialize_database()
+
+    def _initialize_database(self):
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        if not os.path.exists(self.db_path):
+            open(self.db_path, 'a').close()
+
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.create_function('search_text', 1, segment, deterministic=True)
+        self.conn.create_function('search_options', 1, segment_options, deterministic=True)
+        apply_migrations(self.conn)
+
+        # WAL模式下读连接不会被长时间的写事务阻塞
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+
+    def get_available_quizzes(self):
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT name FROM quizzes WHERE status = 'ready'")
+            return [row[0] for row in cursor.fetchall()]
+        except sqlite3.OperationalError:
+            return []
+
+    def get_quiz_summaries(self, after_seq=0):
+        """
+        返回ready_seq大于after_seq的题库[(ready_seq, 名称, 题目数量)], 按完成导入的顺序排列。
+        界面保存最后一个ready_seq, 之后只读取新增或被替换的题库。
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT ready_seq, name, question_count
+        FROM quizzes
+        WHERE ready_seq > ? AND status = 'ready'
+        ORDER BY ready_seq
+        ''', (after_seq,))
+        return cursor.fetchall()
+
+    def iter_display_texts(self):
+        """逐条返回界面上会显示的题库名、组卷方案名、题干和选项, 用于裁剪字体"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT name FROM quizzes WHERE status = 'ready'")
+        for (name,) in cursor:
+            yield name
+        cursor.execute('SELECT name FROM blueprints')
+        for (name,) in cursor:
+            yield name
+        cursor.execute('''
+        SELECT q.question, q.options FROM questions q
+        JOIN quizzes z ON z.id = q.quiz_id
+        WHERE z.status = 'ready'
+        ''')
+        for question, options in cursor:
+            yield question
+            yield from json.loads(options)
+
+    def _get_quiz_id(self, quiz_name):
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT id FROM quizzes WHERE name = ?', (quiz_name,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def get_questions_by_quiz_name(self, quiz_name):
+        quiz_id = self._get_quiz_id(quiz_name)
+        if quiz_id is None:
+            return []
+        return list(self._load_bank(quiz_id))
+
+    def _load_bank(self, quiz_id):
+        questions = self.cache.get(quiz_id)
+        if questions is not None:
+            return questions
+
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT id, question, options, answer, type, score
+        FROM questions
+        WHERE quiz_id = ?
+        ORDER BY id
+        ''', (quiz_id,))
+
+        questions = [row_to_question(row) for row in cursor.fetchall()]
+        self.cache.put(quiz_id, questions)
+        return questions
+
+    def get_cache_stats(self):
+        return self.cache.stats()
+
+    def _read_snapshot(self, func, *args):
+        """
+        在一个读事务中执行func。统计题数和按位置取id是分开的查询,
+        放在同一个事务里才能看到同一个快照, 不会与写线程替换题库交错。
+        """
+        if self.conn.in_transaction:
+            return func(*args)
+        self.conn.execute('BEGIN')
+        try:
+            return func(*args)
+        finally:
+            self.conn.commit()
+
+    def sample_questions(self, quiz_name, k, seed=None):
+        """
+        在SQLite中随机抽取k道题, 只解码被抽中的行。
+        先按题目在题库中的位置抽样, 再把位置映射为id, 最后按id读取题目,
+        内存占用为O(k)。指定seed时抽样结果可复现。抽中的题按id缓存,
+        重新开始考试时再次抽中的题不必重新解码。
+        已缓存的题库直接从缓存中取题; 题数不超过k的CACHE_BANK_SAMPLE_RATIO倍时
+        整体解码也只比抽样多解码几倍的行, 这时解码并缓存整个题库, 重复抽题不再解码。
+        """
+        return self._read_snapshot(self._sample_questions, quiz_name, k, seed)
+
+    def _sample_questions(self, quiz_name, k, seed):
+        quiz_id = self._get_quiz_id(quiz_name)
+        if quiz_id is None:
+            return []
+
+        rng = random.Random(seed)
+        bank = self.cache.get(quiz_id)
+        if bank is None:
+            cursor = self.conn.cursor()
+            cursor.execute('SELECT COUNT(*) FROM questions WHERE quiz_id = ?', (quiz_id,))
+            total = cursor.fetchone()[0]
+            if 0 < total <= k * CACHE_BANK_SAMPLE_RATIO:
+                bank = self._load_bank(quiz_id)
+
+        # 已缓存的题库与SQLite中的题目顺序相同, 同一seed得到相同的结果
+        if bank is not None:
+            k = min(k, len(bank))
+            if k <= 0:
+                return []
+            return [bank[pos] for pos in rng.sample(range(len(bank)), k)]
+
+        k = min(k, total)
+        if k <= 0:
+            return []
+
+        return self.get_questions_by_ids(self._sample_ids(quiz_id, total, k, rng))
+
+    def _count_questions(self, quiz_id, q_type=None):
+        cursor = self.conn.cursor()
+        if q_type is None:
+            cursor.execute('SELECT COUNT(*) FROM questions WHERE quiz_id = ?', (quiz_id,))
+        else:
+            cursor.execute('SELECT COUNT(*) FROM questions WHERE quiz_id = ? AND type = ?',
+                           (quiz_id, q_type))
+        return cursor.fetchone()[0]
+
+    def _sample_ids(self, quiz_id, total, k, rng, q_type=None):
+        """在题库(或题库中的某种题型)的total道题中按位置抽取k个题目id"""
+        positions = rng.sample(range(total), k)
+        condition = 'quiz_id = ?' if q_type is None else 'quiz_id = ? AND type = ?'
+        params = (quiz_id,) if q_type is None else (quiz_id, q_type)
+
+        # 全部位置作为一个JSON数组传入, 窗口函数只扫描一遍题库
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+        SELECT pos, id FROM (
+            SELECT id, ROW_NUMBER() OVER (ORDER BY id) - 1 AS pos
+            FROM questions
+            WHERE {condition}
+        )
+        WHERE pos IN (SELECT value FROM json_each(?))
+        ''', (*params, json.dumps(positions)))
+        position_to_id = dict(cursor.fetchall())
+
+        return [position_to_id[pos] for pos in positions]
+
+    def save_blueprint(self, name, types, banks):
+        """保存组卷方案, 同名方案会被覆盖"""
+        spec = normalize_spec(types, banks)
+        self.conn.execute('''
+        INSERT OR REPLACE INTO blueprints (name, spec) VALUES (?, ?)
+        ''', (name, json.dumps(spec, ensure_ascii=False)))
+        self.conn.commit()
+        return spec
+
+    def delete_blueprint(self, name):
+        self.conn.execute('DELETE FROM blueprints WHERE name = ?', (name,))
+        self.conn.commit()
+
+    def get_blueprint_names(self):
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT name FROM blueprints ORDER BY name')
+        return [row[0] for row in cursor.fetchall()]
+
+    def get_blueprint(self, name):
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT spec FROM blueprints WHERE name = ?', (name,))
+        row = cursor.fetchone()
+        return json.loads(row[0]) if row else None
+
+    def sample_blueprint(self, name, seed=None):
+        """
+        按组卷方案抽题, 每个(题库, 题型)只统计数量并抽取需要的题目id,
+        不加载整个题库。某个题库的题目不够时由方案中的其他题库补足,
+        全部不够时按实际能抽到的题数出题。题目按方案中的题型顺序排列。
+        """
+        return self._read_snapshot(self._sample_blueprint, name, seed)
+
+    def _sample_blueprint(self, name, seed):
+        spec = self.get_blueprint(name)
+        if spec is None:
+            raise ValueError(f"组卷方案 '{name}' 不存在")
+
+        rng = random.Random(seed)
+        quiz_ids = {}
+        for bank in spec['banks']:
+            quiz_id = self._get_quiz_id(bank)
+            if quiz_id is not None:
+                quiz_ids[bank] = quiz_id
+
+        cells = allocate(spec)
+        questions = []
+        for q_type, count in spec['types'].items():
+            available = {
+                bank: self._count_questions(quiz_id, q_type)
+                for bank, quiz_id in quiz_ids.items()
+            }
+            takes = {bank: min(cells[(q_type, bank)], available[bank]) for bank in quiz_ids}
+
+            shortage = count - sum(takes.values())
+            for bank in sorted(quiz_ids, key=lambda b: spec['banks'][b], reverse=True):
+                if shortage <= 0:
+                    break
+                extra = min(shortage, available[bank] - takes[bank])
+                takes[bank] += extra
+                shortage -= extra
+
+            ids = []
+            for bank, take in takes.items():
+                if take > 0:
+                    ids.extend(self._sample_ids(quiz_ids[bank], available[bank], take, rng, q_type))
+            rng.shuffle(ids)
+            questions.extend(self.get_questions_by_ids(ids))
+
+        return questions
+
+    def get_answer_key(self, quiz_name):
+        """返回{题目id: Question}, 用于按题目id批量判分"""
+        quiz_id = self._get_quiz_id(quiz_name)
+        if quiz_id is None:
+            return {}
+
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT id, question, options, answer, type, score
+        FROM questions
+        WHERE quiz_id = ?
+        ''', (quiz_id,))
+        return {row[0]: row_to_question(row) for row in cursor}
+
+    def get_question_ids(self, quiz_name):
+        """返回题库中所有题目的id, 按id排序"""
+        quiz_id = self._get_quiz_id(quiz_name)
+        if quiz_id is None:
+            return []
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT id FROM questions WHERE quiz_id = ? ORDER BY id', (quiz_id,))
+        return [row[0] for row in cursor]
+
+    def get_questions_by_ids(self, ids):
+        """按id读取题目, 返回顺序与ids一致"""
+        rows = self.get_questions_map(ids)
+        return [rows[i] for i in ids if i in rows]
+
+    def get_questions_map(self, ids):
+        """按id读取题目, 返回{题目id: Question}。已按id缓存的题目不再解码"""
+        ids = list(ids)
+        rows = self.cache.get_questions(ids)
+        missing = [i for i in ids if i not in rows]
+        cursor = self.conn.cursor()
+        for chunk in _chunks(missing):
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f'''
+            SELECT id, question, options, answer, type, score, quiz_id
+            FROM questions
+            WHERE id IN ({placeholders})
+            ''', chunk)
+            decoded = {}
+            for row in cursor.fetchall():
+                decoded.setdefault(row[6], []).append(row_to_question(row[:6]))
+            for quiz_id, questions in decoded.items():
+                self.cache.put_questions(quiz_id, questions)
+                rows.update((q.id, q) for q in questions)
+        return rows
+
+    def search_questions(self, query, limit=SEARCH_LIMIT):
+        """
+        在所有题库的题干和选项中全文检索, 按相关度返回至多limit条(题库名称, Question)。
+        题干的权重是选项的两倍。
+        """
+        match = build_match_query(query)
+        if match is None:
+            return []
+
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT f.rowid, z.name
+        FROM question_fts f
+        JOIN questions q ON q.id = f.rowid
+        JOIN quizzes z ON z.id = q.quiz_id
+        WHERE question_fts MATCH ? AND z.status = 'ready'
+        ORDER BY bm25(question_fts, 2.0, 1.0)
+        LIMIT ?
+        ''', (match, limit))
+        hits = cursor.fetchall()
+        questions = self.get_questions_map([qid for qid, _ in hits])
+        return [(name, questions[qid]) for qid, name in hits if qid in questions]
+
+    def get_quiz_info(self, quiz_name):
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT q.id, q.name, q.description, COUNT(qu.id) as question_count, q.source_type
+        FROM quizzes q
+        LEFT JOIN questions qu ON q.id = qu.quiz_id
+        WHERE q.name = ?
+        GROUP BY q.id
+        ''', (quiz_name,))
+
+        result = cursor.fetchone()
+        if not result:
+            return None
+
+        return {
+            'id': result[0],
+            'name': result[1],
+            'description': result[2],
+            'question_count': result[3],
+            'source_type': result[4] or 'json'
+        }
+
+    def unique_quiz_name(self, quiz_name):
+        """题库重名时在名称后追加(1)、(2)等序号"""
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT name FROM quizzes')
+        existing = {row[0] for row in cursor.fetchall()}
+        if quiz_name not in existing:
+            return quiz_name
+
+        base_name = re.sub(r'\(\d+\)$', '', quiz_name)
+        counter = 1
+        while f"{base_name}({counter})" in existing:
+            counter += 1
+        return f"{base_name}({counter})"
+
+    def import_quiz(self, quiz_name, questions, source_type="excel", progress_callback=None):
+        """以不重复的名称写入题库, 返回(实际名称, 题目数量)"""
+        quiz_name = self.unique_quiz_name(quiz_name)
+        count = self.add_quiz(
+            quiz_name, questions,
+            source_type=source_type,
+            progress_callback=progress_callback
+        )
+        return quiz_name, count
+
+    def add_quiz(self, quiz_name, questions_data, description="", source_type="json",
+                 batch_size=BULK_BATCH_SIZE, progress_callback=None):
+        return self.bulk_add_quiz(
+            quiz_name, questions_data,
+            description=description,
+            source_type=source_type,
+            batch_size=batch_size,
+            progress_callback=progress_callback
+        )
+
+    def bulk_add_quiz(self, quiz_name, questions, description="", source_type="json",
+                      batch_size=BULK_BATCH_SIZE, progress_callback=None):
+        """
+        在一个事务中批量写入题库, questions可以是任意可迭代对象或生成器。
+        每batch_size道题执行一次executemany, 内存占用与题库大小无关。
+        progress_callback(已写入题数)在每批写入后调用, 返回写入的题目总数。
+        """
+        cursor = self.conn.cursor()
+        if self.conn.in_transaction:
+            self.conn.commit()
+
+        old = None
+        try:
+            cursor.execute('BEGIN')
+
+            cursor.execute('SELECT id FROM quizzes WHERE name = ?', (quiz_name,))
+            old = cursor.fetchone()
+            if old:
+                cursor.execute(UNINDEX_QUIZ_SQL, (old[0],))
+                cursor.execute('DELETE FROM questions WHERE quiz_id = ?', (old[0],))
+                cursor.execute('DELETE FROM question_stats WHERE quiz_id = ?', (old[0],))
+                cursor.execute('DELETE FROM wrong_answers WHERE quiz_id = ?', (old[0],))
+                cursor.execute('DELETE FROM review_cards WHERE quiz_id = ?', (old[0],))
+                cursor.execute('DELETE FROM review_progress WHERE quiz_id = ?', (old[0],))
+
+            cursor.execute('''
+            INSERT OR REPLACE INTO quizzes (name, description, source_type)
+            VALUES (?, ?, ?)
+            ''', (quiz_name, description, source_type))
+            quiz_id = cursor.lastrowid
+
+            rows = (question_to_row(quiz_id, q) for q in questions)
+            total = 0
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                cursor.executemany(INSERT_QUESTION_SQL, batch)
+                total += len(batch)
+                if progress_callback:
+                    progress_callback(total)
+
+            cursor.execute(INDEX_QUESTIONS_SQL, (quiz_id, 0))
+            cursor.execute(NEXT_QUIZ_SEQ_SQL)
+            cursor.execute(MARK_QUIZ_READY_SQL, (total, quiz_id))
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            # 提交后再失效, 避免读线程在提交前把旧数据重新放回缓存
+            if old:
+                self.cache.invalidate(old[0])
+                self.wrong_book.invalidate()
+
+        return total
+
+    def stream_import_quiz(self, quiz_name, question_chunks, source_type="excel",
+                           description="", progress_callback=None):
+        """
+        分块导入题库, question_chunks依次产生题目字典列表。
+        每块写入后立即提交, 导入完成前题库处于importing状态, 不会出现在题库列表中;
+        任何一块失败都会删除已写入的部分, 数据库恢复到导入前的状态。
+        返回(实际名称, 题目数量)。
+        """
+        quiz_name, quiz_id = self.begin_quiz_import(quiz_name, description, source_type)
+        total = 0
+        try:
+            for chunk in question_chunks:
+                total += self.append_quiz_questions(quiz_id, chunk)
+                if progress_callback:
+                    progress_callback(total)
+            self.finish_quiz_import(quiz_id, total)
+        except BaseException:
+            self.conn.rollback()
+            self.discard_quiz(quiz_id)
+            raise
+
+        return quiz_name, total
+
+    def begin_quiz_import(self, quiz_name, description="", source_type="excel"):
+        """新建一个importing状态的题库, 返回(实际名称, quiz_id)"""
+        quiz_name = self.unique_quiz_name(quiz_name)
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        INSERT INTO quizzes (name, description, source_type, status)
+        VALUES (?, ?, ?, 'importing')
+        ''', (quiz_name, description, source_type))
+        quiz_id = cursor.lastrowid
+        self.conn.commit()
+        return quiz_name, quiz_id
+
+    def finish_quiz_import(self, quiz_id, total):
+        """导入完成, 题库出现在题库列表中"""
+        if total == 0:
+            raise ValueError("没有找到有效的题目数据")
+
+        try:
+            self.conn.execute(NEXT_QUIZ_SEQ_SQL)
+            self.conn.execute(MARK_QUIZ_READY_SQL, (total, quiz_id))
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.cache.invalidate(quiz_id)
+
+    def append_quiz_questions(self, quiz_id, questions):
+        """向importing状态的题库追加一块题目并提交, 返回写入的数量"""
+        rows = [question_to_row(quiz_id, q) for q in questions]
+        try:
+            last_id = self.conn.execute(
+                'SELECT COALESCE(MAX(id), 0) FROM questions WHERE quiz_id = ?', (quiz_id,)
+            ).fetchone()[0]
+            self.conn.executemany(INSERT_QUESTION_SQL, rows)
+            self.conn.execute(INDEX_QUESTIONS_SQL, (quiz_id, last_id))
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        return len(rows)
+
+    def discard_quiz(self, quiz_id):
+        """删除题库及其全部题目、统计和复习记录"""
+        cursor = self.conn.cursor()
+        cursor.execute(UNINDEX_QUIZ_SQL, (quiz_id,))
+        cursor.execute('DELETE FROM questions WHERE quiz_id = ?', (quiz_id,))
+        cursor.execute('DELETE FROM question_stats WHERE quiz_id = ?', (quiz_id,))
+        cursor.execute('DELETE FROM wrong_answers WHERE quiz_id = ?', (quiz_id,))
+        cursor.execute('DELETE FROM review_cards WHERE quiz_id = ?', (quiz_id,))
+        cursor.execute('DELETE FROM review_progress WHERE quiz_id = ?', (quiz_id,))
+        cursor.execute('DELETE FROM quizzes WHERE id = ?', (quiz_id,))
+        self.conn.commit()
+        self.cache.invalidate(quiz_id)
+        self.wrong_book.invalidate()
+
+    def record_attempts(self, attempts):
+        """
+        在一个事务中保存多次交卷记录(QuizSession.attempt_record())并累加每题的统计,
+        复习测验同时更新复习卡片, 返回新记录的id
+        """
+        cursor = self.conn.cursor()
+        if self.conn.in_transaction:
+            self.conn.commit()
+
+        attempt_ids = []
+        question_totals = {}
+        reviews = []
+        try:
+            cursor.execute('BEGIN')
+            for attempt in attempts:
+                cursor.execute('''
+                INSERT INTO attempts (
+                    quiz_name, blueprint_name, started_at, finished_at, total_score,
+                    max_score, correct_count, question_count, total_time
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    attempt['quiz_name'], attempt['blueprint_name'],
+                    attempt['started_at'], attempt['finished_at'], attempt['total_score'],
+                    attempt['max_score'], attempt['correct_count'],
+                    attempt['question_count'], attempt['total_time']
+                ))
+                attempt_id = cursor.lastrowid
+                cursor.executemany(INSERT_ATTEMPT_ANSWER_SQL, [
+                    (
+                        attempt_id,
+                        r['position'],
+                        r['question_id'],
+                        json.dumps(r['user_answer'], ensure_ascii=False)
+                        if isinstance(r['user_answer'], list) else r['user_answer'],
+                        int(r['is_correct']),
+                        r['score'],
+                        r['time_used']
+                    )
+                    for r in attempt['responses']
+                ])
+                attempt_ids.append(attempt_id)
+
+                if attempt.get('review'):
+                    reviews.extend(
+                        (r['question_id'], answer_quality(r['is_correct'], r['time_used']),
+                         attempt['finished_at'])
+                        for r in attempt['responses'] if r['question_id'] is not None
+                    )
+
+                for r in attempt['responses']:
+                    if r['question_id'] is None:
+                        continue
+                    totals = question_totals.setdefault(r['question_id'], [0, 0, 0.0])
+                    totals[0] += 1
+                    totals[1] += int(r['is_correct'])
+                    totals[2] += r['time_used']
+
+                    # 错题本按作答顺序更新: 答错加一, 答对减一
+                    if r['is_correct']:
+                        cursor.execute(RECORD_HIT_SQL, (r['question_id'],))
+                    else:
+                        cursor.execute(RECORD_MISS_SQL, (attempt['finished_at'], r['question_id']))
+
+            # 统计按增量累加, 不扫描历史记录
+            cursor.executemany(UPDATE_QUESTION_STATS_SQL, [
+                (attempt_count, correct, total_time, question_id)
+                for question_id, (attempt_count, correct, total_time) in question_totals.items()
+            ])
+            cursor.executemany(
+                'DELETE FROM wrong_answers WHERE question_id = ? AND miss_count <= 0',
+                [(question_id,) for question_id in question_totals]
+            )
+            if reviews:
+                self._update_review_cards(cursor, reviews)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+        # 没有作答记录时错题本没有变化, 不要让正在进行的加载作废
+        if question_totals:
+            self.wrong_book.touch()
+            if self.wrong_book.loaded:
+                self._sync_wrong_book(list(question_totals))
+        return attempt_ids
+
+    def _update_review_cards(self, cursor, reviews):
+        """
+        reviews为按作答顺序排列的(题目id, 回答质量, 复习时间)。
+        先按id批量读出已有卡片, 在内存中依次计算, 最后一次executemany写回。
+        """
+        question_ids = list(dict.fromkeys(question_id for question_id, _, _ in reviews))
+        cards = {}
+        for chunk in _chunks(question_ids):
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f'''
+            SELECT question_id, ease, interval_days, repetitions
+            FROM review_cards
+            WHERE question_id IN ({placeholders})
+            ''', chunk)
+            for question_id, ease, interval, repetitions in cursor.fetchall():
+                cards[question_id] = (ease, interval, repetitions)
+
+        new_ids = [question_id for question_id in question_ids if question_id not in cards]
+        updated = {}
+        for question_id, quality, reviewed_at in reviews:
+            ease, interval, repetitions, due_at = sm2_update(
+                cards.get(question_id), quality, reviewed_at
+            )
+            cards[question_id] = (ease, interval, repetitions)
+            updated[question_id] = (ease, interval, repetitions, due_at, reviewed_at)
+
+        cursor.executemany(UPSERT_REVIEW_CARD_SQL, [
+            values + (question_id,) for question_id, values in updated.items()
+        ])
+        # 新卡片按id顺序引入, 记录每个题库已经引入到的位置
+        cursor.executemany(ADVANCE_NEW_CURSOR_SQL, [(question_id,) for question_id in new_ids])
+
+    def get_due_questions(self, quiz_name, now=None, limit=REVIEW_SESSION_SIZE,
+                          new_limit=NEW_CARDS_PER_SESSION):
+        """
+        今日复习: 先取到期时间在今天结束之前的卡片, 按到期时间排序;
+        不足limit时按id顺序补充至多new_limit道还没有复习过的新题。
+        两部分都是索引上的范围查询, 与题库大小和卡片总数无关。
+        """
+        quiz_id = self._get_quiz_id(quiz_name)
+        if quiz_id is None:
+            return []
+
+        cutoff = review_cutoff(time.time() if now is None else now)
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT question_id FROM review_cards
+        WHERE quiz_id = ? AND due_at <= ?
+        ORDER BY due_at
+        LIMIT ?
+        ''', (quiz_id, cutoff, limit))
+        ids = [row[0] for row in cursor.fetchall()]
+
+        new_count = min(new_limit, limit - len(ids))
+        if new_count > 0:
+            cursor.execute(
+                'SELECT new_cursor FROM review_progress WHERE quiz_id = ?', (quiz_id,)
+            )
+            row = cursor.fetchone()
+            cursor.execute('''
+            SELECT id FROM questions
+            WHERE quiz_id = ? AND id > ?
+            ORDER BY id
+            LIMIT ?
+            ''', (quiz_id, row[0] if row else 0, new_count))
+            ids.extend(row[0] for row in cursor.fetchall())
+
+        return self.get_questions_by_ids(ids)
+
+    def get_due_count(self, quiz_name, now=None):
+        """今天需要复习的卡片数, 不含新题"""
+        quiz_id = self._get_quiz_id(quiz_name)
+        if quiz_id is None:
+            return 0
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT COUNT(*) FROM review_cards WHERE quiz_id = ? AND due_at <= ?
+        ''', (quiz_id, review_cutoff(time.time() if now is None else now)))
+        return cursor.fetchone()[0]
+
+    def _load_wrong_book(self):
+        generation = self.wrong_book.generation
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT question_id, miss_count, last_missed_at FROM wrong_answers')
+        self.wrong_book.load(cursor.fetchall(), generation)
+
+    def _sync_wrong_book(self, question_ids):
+        cursor = self.conn.cursor()
+        current = {}
+        for chunk in _chunks(question_ids):
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f'''
+            SELECT question_id, miss_count, last_missed_at
+            FROM wrong_answers
+            WHERE question_id IN ({placeholders})
+            ''', chunk)
+            for question_id, miss_count, missed_at in cursor.fetchall():
+                current[question_id] = (miss_count, missed_at)
+
+        for question_id in question_ids:
+            miss_count, missed_at = current.get(question_id, (0, 0.0))
+            self.wrong_book.apply(question_id, miss_count, missed_at)
+
+    def get_wrong_answer_count(self):
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT COUNT(*) FROM wrong_answers')
+        return cursor.fetchone()[0]
+
+    def sample_wrong_questions(self, k, seed=None):
+        """
+        从错题本中按权重抽取k道题: 答错次数越多、最近答错的题越容易被抽到。
+        只加载错题的id和权重, 被抽中的题目再按id读取。
+        """
+        if not self.wrong_book.loaded:
+            self._load_wrong_book()
+        ids = self.wrong_book.sample(k, random.Random(seed))
+        return self.get_questions_by_ids(ids)
+
+    def get_attempts(self, before_id=None, limit=20, quiz_name=None):
+        """
+        按时间倒序分页读取交卷记录。下一页传入上一页最后一条记录的id作为before_id,
+        每页的代价只与limit有关, 与历史记录总数无关。
+        """
+        conditions = []
+        params = []
+        if quiz_name is not None:
+            conditions.append('quiz_name = ?')
+            params.append(quiz_name)
+        if before_id is not None:
+            conditions.append('id < ?')
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+        SELECT id, quiz_name, blueprint_name, started_at, finished_at, total_score,
+               max_score, correct_count, question_count, total_time
+        FROM attempts
+        {where}
+        ORDER BY id DESC
+        LIMIT ?
+        ''', (*params, limit))
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def get_question_stats(self, question_ids):
+        """返回{题目id: {'attempts', 'correct', 'correct_rate', 'avg_time'}}, 没有作答记录的题目不在结果中"""
+        cursor = self.conn.cursor()
+        stats = {}
+        for chunk in _chunks([i for i in question_ids if i is not None]):
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f'''
+            SELECT question_id, attempts, correct, total_time
+            FROM question_stats
+            WHERE question_id IN ({placeholders})
+            ''', chunk)
+            for question_id, attempts, correct, total_time in cursor.fetchall():
+                stats[question_id] = _stats_dict(attempts, correct, total_time)
+        return stats
+
+    def get_hardest_questions(self, quiz_name, limit=50):
+        """返回题库中正确率最低的limit道题, 通过索引直接按正确率读取"""
+        quiz_id = self._get_quiz_id(quiz_name)
+        if quiz_id is None:
+            return []
+
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT s.question_id, q.question, s.attempts, s.correct, s.total_time
+        FROM question_stats s
+        JOIN questions q ON q.id = s.question_id
+        WHERE s.quiz_id = ?
+        ORDER BY 1.0 * s.correct / s.attempts
+        LIMIT ?
+        ''', (quiz_id, limit))
+        result = []
+        for question_id, question, attempts, correct, total_time in cursor.fetchall():
+            stats = _stats_dict(attempts, correct, total_time)
+            stats['question_id'] = question_id
+            stats['question'] = question
+            result.append(stats)
+        return result
+
+    def get_attempt_answers(self, attempt_id):
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT a.position, a.question_id, q.question, a.user_answer, a.is_correct,
+               a.score, a.time_used
+        FROM attempt_answers a
+        LEFT JOIN questions q ON q.id = a.question_id
+        WHERE a.attempt_id = ?
+        ORDER BY a.position
+        ''', (attempt_id,))
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def discard_incomplete_imports(self):
+        """删除上次异常退出时遗留的未完成导入, 返回删除的题库数量"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT id FROM quizzes WHERE status = 'importing'")
+        quiz_ids = [row[0] for row in cursor.fetchall()]
+        for quiz_id in quiz_ids:
+            self.discard_quiz(quiz_id)
+        return len(quiz_ids)
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
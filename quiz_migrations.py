@@ -0,0 +1,291 @@
+"""
+quiz.db的版本化迁移。
+
+数据库版本保存在PRAGMA user_version中, 启动时按顺序执行尚未应用的迁移,
+每个迁移在独立事务中执行并在同一事务内更新版本号。
+新增迁移只能追加到MIGRATIONS末尾, 不要修改已经发布的迁移。
+"""
+from search_index import segment, segment_options
+
+BACKFILL_BATCH_SIZE = 2000
+
+
+def _create_base_tables(cursor):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS quizzes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL,
+        description TEXT,
+        source_type TEXT DEFAULT 'json'
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS questions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        quiz_id INTEGER NOT NULL,
+        question TEXT NOT NULL,
+        options TEXT NOT NULL,
+        answer TEXT NOT NULL,
+        type TEXT NOT NULL,
+        score INTEGER DEFAULT 1,
+        FOREIGN KEY (quiz_id) REFERENCES quizzes(id)
+    )
+    ''')
+
+
+def _add_quiz_source_type(cursor):
+    # 早期版本的quizzes表没有source_type列
+    cursor.execute("PRAGMA table_info(quizzes)")
+    columns = [column[1] for column in cursor.fetchall()]
+    if 'source_type' in columns:
+        return
+
+    cursor.execute('''
+    CREATE TABLE quizzes_temp (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL,
+        description TEXT,
+        source_type TEXT DEFAULT 'json'
+    )
+    ''')
+
+    cursor.execute('''
+    INSERT INTO quizzes_temp (id, name, description, source_type)
+    SELECT id, name, description, 'json' FROM quizzes
+    ''')
+
+    cursor.execute("DROP TABLE quizzes")
+    cursor.execute("ALTER TABLE quizzes_temp RENAME TO quizzes")
+
+
+def _add_question_indexes(cursor):
+    # rowid隐式包含在索引中, 因此按quiz_id过滤后仍按id有序
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_questions_quiz_id
+    ON questions (quiz_id)
+    ''')
+
+
+def _add_quiz_status(cursor):
+    # 分块导入过程中题库处于importing状态, 导入完成后才变为ready
+    cursor.execute('''
+    ALTER TABLE quizzes ADD COLUMN status TEXT NOT NULL DEFAULT 'ready'
+    ''')
+
+
+def _add_blueprints(cursor):
+    # 按题型分层抽题时按(quiz_id, type)定位, 索引中的rowid保证同一题型内按id有序
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_questions_quiz_type
+    ON questions (quiz_id, type)
+    ''')
+
+    # 组卷方案, spec为JSON: {"types": {题型: 题数}, "banks": {题库名称: 权重}}
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS blueprints (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL,
+        spec TEXT NOT NULL
+    )
+    ''')
+
+
+def _add_attempt_history(cursor):
+    # 每次交卷一行, 从题库出题时记录quiz_name, 按组卷方案出题时记录blueprint_name;
+    # 历史记录按id倒序做键集分页
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS attempts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        quiz_name TEXT,
+        blueprint_name TEXT,
+        started_at REAL NOT NULL,
+        finished_at REAL NOT NULL,
+        total_score INTEGER NOT NULL,
+        max_score INTEGER NOT NULL,
+        correct_count INTEGER NOT NULL,
+        question_count INTEGER NOT NULL,
+        total_time REAL NOT NULL
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_attempts_quiz_name
+    ON attempts (quiz_name, id)
+    ''')
+
+    # 每道题的作答, 多选题的user_answer为JSON数组
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS attempt_answers (
+        attempt_id INTEGER NOT NULL,
+        position INTEGER NOT NULL,
+        question_id INTEGER,
+        user_answer TEXT NOT NULL,
+        is_correct INTEGER NOT NULL,
+        score INTEGER NOT NULL,
+        time_used REAL NOT NULL,
+        PRIMARY KEY (attempt_id, position),
+        FOREIGN KEY (attempt_id) REFERENCES attempts(id)
+    ) WITHOUT ROWID
+    ''')
+
+
+def _add_question_stats(cursor):
+    # 每道题的累计作答统计, 交卷时在保存历史记录的同一事务中增量更新
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS question_stats (
+        question_id INTEGER PRIMARY KEY,
+        quiz_id INTEGER NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        correct INTEGER NOT NULL DEFAULT 0,
+        total_time REAL NOT NULL DEFAULT 0
+    )
+    ''')
+
+    # 按正确率从低到高取某个题库中最难的题目, 表达式需与查询中的写法一致
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_question_stats_difficulty
+    ON question_stats (quiz_id, (1.0 * correct / attempts))
+    ''')
+
+
+def _add_wrong_answers(cursor):
+    # 错题本: 答错时miss_count加一, 再次答对时减一, 减到0时删除
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS wrong_answers (
+        question_id INTEGER PRIMARY KEY,
+        quiz_id INTEGER NOT NULL,
+        miss_count INTEGER NOT NULL,
+        last_missed_at REAL NOT NULL
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_wrong_answers_quiz_id
+    ON wrong_answers (quiz_id)
+    ''')
+
+
+def _add_review_cards(cursor):
+    # SM-2复习卡片, 今日复习按(quiz_id, due_at)做范围查询
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS review_cards (
+        question_id INTEGER PRIMARY KEY,
+        quiz_id INTEGER NOT NULL,
+        ease REAL NOT NULL,
+        interval_days REAL NOT NULL,
+        repetitions INTEGER NOT NULL,
+        due_at REAL NOT NULL,
+        last_reviewed_at REAL NOT NULL
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_review_cards_due
+    ON review_cards (quiz_id, due_at)
+    ''')
+
+    # 每个题库按id顺序引入新卡片, new_cursor为已经引入的最大题目id
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS review_progress (
+        quiz_id INTEGER PRIMARY KEY,
+        new_cursor INTEGER NOT NULL
+    )
+    ''')
+
+
+def _add_question_search(cursor):
+    # 全文索引, rowid与questions.id一致, 写入的是search_index分词后的文本
+    cursor.execute('''
+    CREATE VIRTUAL TABLE IF NOT EXISTS question_fts
+    USING fts5(question, options)
+    ''')
+
+    rows = cursor.connection.execute('SELECT id, question, options FROM questions')
+    while True:
+        batch = rows.fetchmany(BACKFILL_BATCH_SIZE)
+        if not batch:
+            break
+        cursor.executemany(
+            'INSERT INTO question_fts (rowid, question, options) VALUES (?, ?, ?)',
+            [(qid, segment(question), segment_options(options)) for qid, question, options in batch]
+        )
+
+
+def _add_quiz_list_columns(cursor):
+    # 题目数量随导入写入, 题库列表不必统计questions表;
+    # ready_seq按题库完成导入的顺序递增, 界面据此只读取新增或被替换的题库
+    cursor.execute('''
+    ALTER TABLE quizzes ADD COLUMN question_count INTEGER NOT NULL DEFAULT 0
+    ''')
+    cursor.execute('''
+    ALTER TABLE quizzes ADD COLUMN ready_seq INTEGER
+    ''')
+    cursor.execute('''
+    UPDATE quizzes SET question_count = (
+        SELECT COUNT(*) FROM questions WHERE questions.quiz_id = quizzes.id
+    )
+    ''')
+    cursor.execute("UPDATE quizzes SET ready_seq = id WHERE status = 'ready'")
+    # 单独保存计数器, 替换题库时删除旧行也不会让序号回退
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS quiz_list_seq (
+        id INTEGER PRIMARY KEY CHECK (id = 0),
+        seq INTEGER NOT NULL
+    )
+    ''')
+    cursor.execute('''
+    INSERT OR IGNORE INTO quiz_list_seq (id, seq)
+    SELECT 0, COALESCE(MAX(ready_seq), 0) FROM quizzes
+    ''')
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_quizzes_ready_seq
+    ON quizzes (ready_seq)
+    ''')
+
+
+MIGRATIONS = [
+    _create_base_tables,
+    _add_quiz_source_type,
+    _add_question_indexes,
+    _add_quiz_status,
+    _add_blueprints,
+    _add_attempt_history,
+    _add_question_stats,
+    _add_wrong_answers,
+    _add_review_cards,
+    _add_question_search,
+    _add_quiz_list_columns,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def apply_migrations(conn):
+    """执行所有未应用的迁移, 返回执行的迁移数量"""
+    version = get_schema_version(conn)
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(
+            f"数据库版本({version})高于程序支持的版本({SCHEMA_VERSION})"
+        )
+
+    if conn.in_transaction:
+        conn.commit()
+
+    applied = 0
+    cursor = conn.cursor()
+    for index in range(version, SCHEMA_VERSION):
+        try:
+            cursor.execute('BEGIN')
+            MIGRATIONS[index](cursor)
+            cursor.execute(f'PRAGMA user_version = {index + 1}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied += 1
+    return applied
@@ -0,0 +1,165 @@
+"""
+一次测验的状态和流程, 不依赖Kivy。
+
+QuizSession负责抽题、翻页、记录作答和每题用时以及交卷判分,
+QuizApp只负责把会话状态显示到界面上。没有窗口时也可以直接驱动会话,
+用于模拟和压力测试。
+"""
+import random
+import time
+
+
+def format_duration(seconds):
+    minutes = int(seconds // 60)
+    seconds = int(seconds % 60)
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+def format_answer(answer):
+    if isinstance(answer, list):
+        return ', '.join(answer)
+    return answer
+
+
+class QuizSession:
+    def __init__(self, questions, clock=time.time, quiz_name=None, blueprint_name=None,
+                 review=False):
+        self.questions = list(questions)
+        self.clock = clock
+        self.quiz_name = quiz_name
+        self.blueprint_name = blueprint_name
+        # 复习测验交卷后还会更新每道题的复习卡片
+        self.review = review
+        self.started_at = clock()
+        self.finished_at = None
+        self.user_answers = [[] if q.is_multi else '' for q in self.questions]
+        self.question_time_records = [0.0] * len(self.questions)
+        self.question_index = 0
+        self.question_start_time = None
+        self.total_time_used = 0.0
+        self.is_submitted = False
+        self.total_score = 0
+        self.result_details = []
+        self.grades = []
+
+    @classmethod
+    def sample(cls, bank, k, rng=None, **kwargs):
+        """从内存中的题库随机抽取k道题开始一次测验"""
+        rng = rng or random
+        return cls(rng.sample(bank, min(k, len(bank))), **kwargs)
+
+    @property
+    def current_question(self):
+        return self.questions[self.question_index]
+
+    @property
+    def current_answer(self):
+        return self.user_answers[self.question_index]
+
+    @property
+    def is_last(self):
+        return self.question_index == len(self.questions) - 1
+
+    def start_timer(self):
+        self.question_start_time = self.clock()
+
+    def current_elapsed(self):
+        if self.question_start_time is None:
+            return 0.0
+        return self.clock() - self.question_start_time
+
+    def record_time(self):
+        """把当前题目的用时累加到记录中, 并停止计时"""
+        if self.question_start_time is None:
+            return
+        time_used = self.clock() - self.question_start_time
+        self.question_time_records[self.question_index] += time_used
+        self.total_time_used += time_used
+        self.question_start_time = None
+
+    def select_answer(self, prefix):
+        """单选、判断等题型选择答案"""
+        if not self.current_question.is_multi:
+            self.user_answers[self.question_index] = prefix
+
+    def set_multi_option(self, prefix, selected):
+        """多选题勾选或取消某个选项"""
+        answers = self.current_answer
+        if not isinstance(answers, list):
+            return
+        if selected and prefix not in answers:
+            answers.append(prefix)
+        elif not selected and prefix in answers:
+            answers.remove(prefix)
+
+    def go_to(self, index):
+        if not 0 <= index < len(self.questions):
+            return False
+        self.record_time()
+        self.question_index = index
+        self.start_timer()
+        return True
+
+    def next(self):
+        """翻到下一题, 已经是最后一题时返回False"""
+        return self.go_to(self.question_index + 1)
+
+    def prev(self):
+        return self.go_to(self.question_index - 1)
+
+    def submit(self):
+        """交卷并判分, 返回每题的结果"""
+        self.record_time()
+        self.is_submitted = True
+        self.finished_at = self.clock()
+        self.total_score = 0
+        self.result_details = []
+        self.grades = []
+
+        for i, (question, user_answer) in enumerate(zip(self.questions, self.user_answers)):
+            is_correct, score = question.grade(user_answer)
+            self.grades.append((is_correct, score))
+            self.total_score += score
+            self.result_details.append({
+                'question': f"{i+1}. {question.question}",
+                'user_answer': format_answer(user_answer) if user_answer else '未作答',
+                'correct_answer': format_answer(question.answer),
+                'is_correct': is_correct,
+                'score': score,
+                'time_used': format_duration(self.question_time_records[i]),
+                'type': question.type,
+                'question_id': question.id
+            })
+
+        return self.result_details
+
+    def attempt_record(self):
+        """交卷后生成用于保存到历史记录的数据"""
+        if not self.is_submitted:
+            raise ValueError("尚未交卷")
+
+        responses = []
+        for i, (question, user_answer) in enumerate(zip(self.questions, self.user_answers)):
+            is_correct, score = self.grades[i]
+            responses.append({
+                'position': i,
+                'question_id': question.id,
+                'user_answer': list(user_answer) if isinstance(user_answer, list) else user_answer,
+                'is_correct': is_correct,
+                'score': score,
+                'time_used': self.question_time_records[i],
+            })
+
+        return {
+            'quiz_name': self.quiz_name,
+            'blueprint_name': self.blueprint_name,
+            'review': self.review,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'total_score': self.total_score,
+            'max_score': sum(q.score for q in self.questions),
+            'correct_count': sum(1 for is_correct, _ in self.grades if is_correct),
+            'question_count': len(self.questions),
+            'total_time': self.total_time_used,
+            'responses': responses,
+        }
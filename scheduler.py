@@ -0,0 +1,56 @@
+"""
+SM-2间隔重复调度。
+
+每道题一张复习卡片, 记录难度系数ease、当前间隔、连续答对次数和下次复习时间。
+复习时根据是否答对和用时换算为0-5分的回答质量, 再按SM-2算法更新卡片。
+"""
+
+import time
+
+DAY_SECONDS = 24 * 3600
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+# 答对且用时不超过该秒数视为轻松回忆
+FAST_ANSWER_SECONDS = 10
+SLOW_ANSWER_SECONDS = 60
+
+
+def answer_quality(is_correct, time_used):
+    """把一次作答换算为SM-2的回答质量(0-5)"""
+    if not is_correct:
+        return 1
+    if time_used <= FAST_ANSWER_SECONDS:
+        return 5
+    if time_used <= SLOW_ANSWER_SECONDS:
+        return 4
+    return 3
+
+
+def sm2_update(card, quality, now):
+    """
+    card为(ease, 间隔天数, 连续答对次数), 新卡片传None。
+    返回更新后的(ease, 间隔天数, 连续答对次数, 下次复习时间)。
+    """
+    ease, interval, repetitions = card or (DEFAULT_EASE, 0.0, 0)
+
+    if quality < 3:
+        repetitions = 0
+        interval = 1.0
+    else:
+        repetitions += 1
+        if repetitions == 1:
+            interval = 1.0
+        elif repetitions == 2:
+            interval = 6.0
+        else:
+            interval = round(interval * ease)
+
+    ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    return ease, interval, repetitions, now + interval * DAY_SECONDS
+
+
+def review_cutoff(now):
+    """今日复习的截止时间: now所在当天(本地时间)结束的时刻"""
+    day = time.localtime(now)
+    # 直接构造次日零点, 夏令时切换的日子也正确
+    return time.mktime((day.tm_year, day.tm_mon, day.tm_mday + 1, 0, 0, 0, 0, 0, -1))
@@ -0,0 +1,59 @@
+"""
+题目全文检索的分词。
+
+FTS5自带的unicode61分词器把连续的中文当成一个词, trigram分词器又要求查询至少三个字,
+所以写入索引前先把中文切成重叠的二元组: "选择题目" -> "选择 择题 题目 目",
+每段末尾再补一个单字, 保证每个字都是某个词的开头, 单字查询用前缀匹配即可。
+英文和数字保持原样, 交给unicode61分词器处理。
+"""
+import json
+import re
+
+CJK_RUN = re.compile(r'[぀-ヿ㐀-䶿一-鿿豈-﫿가-힯]+')
+WORD = re.compile(r'\w+')
+
+
+def _bigrams(match):
+    run = match.group()
+    return ' ' + ' '.join(map(''.join, zip(run, run[1:]))) + ' ' + run[-1] + ' '
+
+
+def segment(text):
+    """把文本转换为写入FTS5表的词序列, 多余的空格不影响分词"""
+    return CJK_RUN.sub(_bigrams, text or '')
+
+
+def segment_options(options):
+    """options为questions表中保存的JSON选项列表"""
+    try:
+        options = json.loads(options)
+    except (TypeError, ValueError):
+        return segment(options)
+    if isinstance(options, list):
+        return segment(' '.join(str(option) for option in options))
+    return segment(str(options))
+
+
+def _quote(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+def build_match_query(query):
+    """
+    把用户输入转换为FTS5查询, 各个词之间是AND关系。
+    中文按二元组组成短语, 单个汉字和英文单词按前缀匹配。
+    没有可检索的内容时返回None。
+    """
+    terms = []
+    position = 0
+    text = query or ''
+    for match in CJK_RUN.finditer(text):
+        terms.extend(_quote(word) + '*' for word in WORD.findall(text[position:match.start()]))
+        run = match.group()
+        if len(run) == 1:
+            terms.append(_quote(run) + '*')
+        else:
+            terms.append(_quote(' '.join(map(''.join, zip(run, run[1:])))))
+        position = match.end()
+    terms.extend(_quote(word) + '*' for word in WORD.findall(text[position:]))
+    return ' '.join(terms) or None
@@ -0,0 +1,270 @@
+"""
+轻量的表格逐行读取, 不依赖pandas和openpyxl。
+
+xlsx直接解析压缩包中的XML, csv使用标准库csv模块, xls仍通过xlrd读取。
+所有读取函数都逐行产生单元格值组成的元组, 空单元格为None, 内存占用与行数无关。
+"""
+import codecs
+import csv
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from itertools import islice
+
+REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+# 判断csv编码时读取的字节数
+CSV_SNIFF_BYTES = 65536
+
+
+def _local(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def _column_index(ref):
+    index = 0
+    for char in ref:
+        if 'A' <= char <= 'Z':
+            index = index * 26 + ord(char) - 64
+        else:
+            break
+    return index - 1
+
+
+def _cast_number(value):
+    # 与openpyxl一致: 含小数点或指数的为float, 否则为int
+    if '.' in value or 'E' in value or 'e' in value:
+        return float(value)
+    return int(value)
+
+
+def _rich_text(element):
+    # 共享字符串和内联字符串可能由多段<r><t>组成, <rPh>是注音, 不属于正文
+    parts = []
+    for child in element:
+        name = _local(child.tag)
+        if name == 't':
+            parts.append(child.text or '')
+        elif name == 'r':
+            for run_child in child:
+                if _local(run_child.tag) == 't':
+                    parts.append(run_child.text or '')
+    return ''.join(parts)
+
+
+def _first_sheet_path(archive):
+    workbook = ET.fromstring(archive.read('xl/workbook.xml'))
+    sheet = next(el for el in workbook.iter() if _local(el.tag) == 'sheet')
+    rel_id = sheet.get(f'{{{REL_NS}}}id')
+
+    rels = ET.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    for rel in rels:
+        if rel.get('Id') == rel_id:
+            target = rel.get('Target')
+            if target.startswith('/'):
+                return target.lstrip('/')
+            return posixpath.normpath(posixpath.join('xl', target))
+    return 'xl/worksheets/sheet1.xml'
+
+
+def _shared_strings(archive):
+    if 'xl/sharedStrings.xml' not in archive.namelist():
+        return []
+    strings = []
+    with archive.open('xl/sharedStrings.xml') as f:
+        for _, element in ET.iterparse(f):
+            if _local(element.tag) == 'si':
+                strings.append(_rich_text(element))
+                element.clear()
+    return strings
+
+
+def _cell_value(cell, shared_strings):
+    cell_type = cell.get('t', 'n')
+    if cell_type == 'inlineStr':
+        for child in cell:
+            if _local(child.tag) == 'is':
+                return _rich_text(child)
+        return None
+
+    value = None
+    for child in cell:
+        if _local(child.tag) == 'v':
+            value = child.text
+            break
+    if value is None:
+        return None
+
+    if cell_type == 's':
+        return shared_strings[int(value)]
+    if cell_type == 'b':
+        return value == '1'
+    # t="d"是ISO 8601格式的日期文本, 原样返回
+    if cell_type in ('str', 'e', 'd'):
+        return value
+    return _cast_number(value)
+
+
+def iter_xlsx_rows(file_path):
+    """逐行读取xlsx的第一个工作表(日期按Excel序列号数值返回, t="d"的日期单元格返回ISO 8601文本)"""
+    with zipfile.ZipFile(file_path) as archive:
+        shared_strings = _shared_strings(archive)
+        expected_row = 1
+
+        with archive.open(_first_sheet_path(archive)) as f:
+            sheet_data = None
+            for event, element in ET.iterparse(f, events=('start', 'end')):
+                name = _local(element.tag)
+                if event == 'start':
+                    if name == 'sheetData':
+                        sheet_data = element
+                    continue
+                if name != 'row':
+                    continue
+
+                row_number = int(element.get('r', expected_row))
+                while expected_row < row_number:
+                    yield ()
+                    expected_row += 1
+
+                values = []
+                for cell in element:
+                    if _local(cell.tag) != 'c':
+                        continue
+                    ref = cell.get('r')
+                    position = _column_index(ref) if ref else len(values)
+                    while len(values) < position:
+                        values.append(None)
+                    values.append(_cell_value(cell, shared_strings))
+
+                yield tuple(values)
+                expected_row = row_number + 1
+
+                # 释放已经处理过的行, 保持内存占用稳定
+                if sheet_data is not None:
+                    sheet_data.clear()
+                else:
+                    element.clear()
+
+
+def count_xlsx_rows(file_path):
+    """从工作表的<dimension>读取行数, 没有该信息时返回None"""
+    with zipfile.ZipFile(file_path) as archive:
+        with archive.open(_first_sheet_path(archive)) as f:
+            for _, element in ET.iterparse(f, events=('start',)):
+                name = _local(element.tag)
+                if name == 'dimension':
+                    ref = element.get('ref', '').split(':')[-1]
+                    digits = ''.join(c for c in ref if c.isdigit())
+                    return int(digits) if digits else None
+                if name == 'sheetData':
+                    return None
+    return None
+
+
+def csv_encoding(file_path):
+    """
+    按文件开头CSV_SNIFF_BYTES字节判断编码: 能按UTF-8解码时用UTF-8,
+    否则按Excel中文环境常用的GB18030读取
+    """
+    with open(file_path, 'rb') as f:
+        head = f.read(CSV_SNIFF_BYTES)
+    try:
+        # 不传final, 开头恰好截断在多字节字符中间时不算错误
+        codecs.getincrementaldecoder('utf-8')().decode(head)
+    except UnicodeDecodeError:
+        return 'gb18030'
+    return 'utf-8-sig'
+
+
+def _csv_rows(file_path, encoding, skip=0):
+    with open(file_path, newline='', encoding=encoding) as f:
+        for row in islice(csv.reader(f), skip, None):
+            yield tuple(value if value != '' else None for value in row)
+
+
+def iter_csv_rows(file_path, encoding=None):
+    encoding = encoding or csv_encoding(file_path)
+    done = 0
+    try:
+        for row in _csv_rows(file_path, encoding):
+            yield row
+            done += 1
+    except UnicodeDecodeError:
+        if encoding == 'gb18030':
+            raise
+        # 开头一段都是ASCII、后面才出现GB18030编码的字时走到这里。
+        # ASCII部分两种编码读出的结果相同, 跳过已经产生的行继续读
+        yield from _csv_rows(file_path, 'gb18030', skip=done)
+
+
+def count_csv_rows(file_path, encoding=None):
+    return sum(1 for _ in iter_csv_rows(file_path, encoding))
+
+
+def _xls_cell_value(value):
+    # 与pd.read_excel一致: 空字符串视为空单元格, 整数值的浮点数转换为int
+    if value == '':
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def iter_xls_rows(file_path):
+    import xlrd
+
+    book = xlrd.open_workbook(file_path, on_demand=True)
+    try:
+        sheet = book.sheet_by_index(0)
+        for index in range(sheet.nrows):
+            yield tuple(_xls_cell_value(value) for value in sheet.row_values(index))
+    finally:
+        book.release_resources()
+
+
+def count_xls_rows(file_path):
+    import xlrd
+
+    book = xlrd.open_workbook(file_path, on_demand=True)
+    try:
+        return book.sheet_by_index(0).nrows
+    finally:
+        book.release_resources()
+
+
+def sheet_format(file_path):
+    """根据文件头判断表格格式, 安卓导入时临时文件的扩展名不一定可靠"""
+    with open(file_path, 'rb') as f:
+        magic = f.read(8)
+    if magic.startswith(b'PK'):
+        return 'xlsx'
+    if magic.startswith(b'\xd0\xcf\x11\xe0'):
+        return 'xls'
+    return 'csv'
+
+
+def sheet_encoding(file_path):
+    """csv文件的编码, 其他格式返回None。先计数再读取时只判断一次, 传给下面两个函数"""
+    if sheet_format(file_path) == 'csv':
+        return csv_encoding(file_path)
+    return None
+
+
+def iter_sheet_rows(file_path, encoding=None):
+    """按文件格式选择读取方式, 逐行产生单元格值元组, 第一行为表头"""
+    file_format = sheet_format(file_path)
+    if file_format == 'xlsx':
+        return iter_xlsx_rows(file_path)
+    if file_format == 'csv':
+        return iter_csv_rows(file_path, encoding)
+    return iter_xls_rows(file_path)
+
+
+def count_sheet_rows(file_path, encoding=None):
+    """返回表格行数(含表头), 无法确定时返回None"""
+    file_format = sheet_format(file_path)
+    if file_format == 'xlsx':
+        return count_xlsx_rows(file_path)
+    if file_format == 'csv':
+        return count_csv_rows(file_path, encoding)
+    return count_xls_rows(file_path)
@@ -0,0 +1,47 @@
+"""
+启动耗时记录。
+
+在启动过程的关键位置调用mark(), 首屏显示后调用report()输出各阶段耗时,
+同时列出已经被导入的重量级模块, 便于发现启动时间的回退。
+"""
+import sys
+import time
+
+# 只应在导入Excel等功能第一次使用时才加载的模块
+HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl', 'xlrd')
+
+
+class StartupTimer:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.marks = []
+        self.reported = False
+
+    def mark(self, name):
+        self.marks.append((name, time.perf_counter()))
+
+    def loaded_heavy_modules(self):
+        return [name for name in HEAVY_MODULES if name in sys.modules]
+
+    def report(self):
+        lines = ["启动耗时:"]
+        previous = self.started
+        for name, moment in self.marks:
+            lines.append(
+                f"  {name:<12} +{(moment - previous) * 1000:7.1f}ms  "
+                f"累计 {(moment - self.started) * 1000:7.1f}ms"
+            )
+            previous = moment
+
+        heavy = self.loaded_heavy_modules()
+        if heavy:
+            lines.append(f"  警告: 启动过程中加载了 {', '.join(heavy)}")
+        return '\n'.join(lines)
+
+    def report_once(self, name):
+        """记录最后一个阶段并输出报告, 只输出一次"""
+        if self.reported:
+            return
+        self.reported = True
+        self.mark(name)
+        print(self.report())
@@ -0,0 +1,66 @@
+"""
+题目文字纹理的LRU缓存。
+
+键由调用方给出(文字、排版宽度、字号等), 值是渲染好的纹理,
+按纹理占用的显存(宽 * 高 * 4字节)淘汰最久未使用的条目。
+只在界面线程中使用, 不加锁; 窗口大小改变后排版宽度全部失效, 由界面调用clear。
+"""
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+def texture_bytes(texture):
+    return texture.width * texture.height * 4
+
+
+class TextureCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, texture):
+        size = texture_bytes(texture)
+        if size > self.max_bytes:
+            return
+
+        old = self._entries.pop(key, None)
+        if old:
+            self.size_bytes -= old[1]
+        self._entries[key] = (texture, size)
+        self.size_bytes += size
+
+        while self.size_bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.size_bytes -= evicted_size
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.size_bytes = 0
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'size_bytes': self.size_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
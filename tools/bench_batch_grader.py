@@ -0,0 +1,65 @@
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bank_cache import BankCache
+from batch_grader import grade_sheets, iter_sheets
+from quiz_db import QuizDatabase
+from bench_bulk_import import generate_questions
+
+BANK_SIZE = 2000
+QUESTIONS_PER_SHEET = 50
+
+
+def write_sheets(path, question_ids, count, seed=0):
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        for n in range(count):
+            answers = {}
+            for question_id in rng.sample(question_ids, QUESTIONS_PER_SHEET):
+                if question_id % 5 == 1:
+                    answers[question_id] = rng.choice(['A', 'C', ''])
+                else:
+                    answers[question_id] = rng.choice(['A', 'B', 'AC', ['A', 'C']])
+            f.write(json.dumps({'student': f"S{n:06d}", 'answers': answers}) + '\n')
+
+
+def bench(count=100000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = QuizDatabase(os.path.join(tmp, 'grade.db'), cache=BankCache(max_bytes=0))
+        db.add_quiz('bank', generate_questions(BANK_SIZE))
+        answer_key = db.get_answer_key('bank')
+        db.close()
+
+        sheets_path = os.path.join(tmp, 'sheets.jsonl')
+        write_sheets(sheets_path, sorted(answer_key), count)
+
+        worker_counts = sorted({1, 2, os.cpu_count() or 1})
+        outputs = []
+        for workers in worker_counts:
+            prefix = os.path.join(tmp, f'grades_{workers}')
+            start = time.perf_counter()
+            graded = grade_sheets(
+                answer_key, iter_sheets(sheets_path),
+                prefix + '_students.csv', prefix + '_questions.csv',
+                workers=workers
+            )
+            elapsed = time.perf_counter() - start
+            print(f"{workers} 个进程: {graded} 份答题卡 {elapsed:6.2f}s  {graded / elapsed:>8.0f} 份/秒")
+            with open(prefix + '_students.csv', encoding='utf-8-sig') as f:
+                outputs.append(f.read())
+
+        if any(output != outputs[0] for output in outputs):
+            print("[FAIL] 不同进程数的判分结果不一致")
+            return 1
+    print(f"(CPU核数: {os.cpu_count()})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(bench(int(sys.argv[1]) if len(sys.argv) > 1 else 100000))
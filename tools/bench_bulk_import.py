@@ -0,0 +1,62 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from quiz_db import QuizDatabase
+
+def generate_questions(count):
+    """按需生成测试题目，不在内存中保存整个题库"""
+    for i in range(count):
+        if i % 5 == 0:
+            yield {
+                'question': f"{i + 1}. 多选测试题目{i}",
+                'options': ['选项一', '选项二', '选项三', '选项四'],
+                'answer': ['A', 'C'],
+                'type': 'multi',
+                'score': 2
+            }
+        elif i % 5 == 1:
+            yield {
+                'question': f"{i + 1}. 判断测试题目{i}",
+                'options': ['正确', '错误'],
+                'answer': 'A',
+                'type': 'judge',
+                'score': 1
+            }
+        else:
+            yield {
+                'question': f"{i + 1}. 单选测试题目{i}",
+                'options': ['选项一', '选项二', '选项三', '选项四'],
+                'answer': 'B',
+                'type': 'single',
+                'score': 1
+            }
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux上单位是KB，macOS上是字节
+    return rss / 1024 / 1024 if sys.platform == 'darwin' else rss / 1024
+
+def bench(sizes=(10000, 100000, 1000000)):
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            db = QuizDatabase(os.path.join(tmp, f'bench_{size}.db'))
+            start = time.perf_counter()
+            count = db.add_quiz(f'bench_{size}', generate_questions(size))
+            elapsed = time.perf_counter() - start
+            db.close()
+
+            rss = peak_rss_mb()
+            rss_str = f"{rss:.1f}MB" if rss is not None else "n/a"
+            print(f"{count:>9} 题: {elapsed:7.2f}s  {count / elapsed:>10.0f} 行/秒  峰值RSS {rss_str}")
+
+if __name__ == '__main__':
+    sizes = [int(s) for s in sys.argv[1:]] or (10000, 100000, 1000000)
+    bench(sizes)
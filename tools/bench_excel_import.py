@@ -0,0 +1,25 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from check_excel_import import legacy_process_excel_data, synthetic_sheet
+from excel_import import process_excel_data
+
+def timed(func, df):
+    start = time.perf_counter()
+    result = func(df)
+    return result, time.perf_counter() - start
+
+def bench(rows=100000):
+    for layout in ('columns', 'single'):
+        df = synthetic_sheet(rows, layout)
+        legacy, legacy_time = timed(legacy_process_excel_data, df)
+        current, current_time = timed(process_excel_data, df)
+        same = '一致' if legacy == current else '不一致'
+        print(f"{layout:>8} {rows} 行: iterrows {legacy_time:6.2f}s  按列 {current_time:6.2f}s  "
+              f"加速 {legacy_time / current_time:5.1f}x  结果{same}")
+
+if __name__ == '__main__':
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,137 @@
+"""
+比较答题界面翻页时重建选项控件和复用选项控件的帧时间与内存分配。
+需要安装Kivy; 没有显示器时可以用 KIVY_GL_BACKEND=mock 运行。
+"""
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+
+from kivy.config import Config
+# 不限制帧率, 否则每帧都会睡眠到1/60秒
+Config.set('graphics', 'maxfps', '0')
+
+from kivy.base import EventLoop
+from kivy.core.window import Window
+from kivy.uix.gridlayout import GridLayout
+
+os.chdir(ROOT)
+from main import DynamicOptionButton, MultiSelectOption, OptionWidgetPool
+from question import SINGLE_TYPES, Question
+from quiz_session import QuizSession
+
+
+def generate_exam(count, seed=0):
+    rng = random.Random(seed)
+    questions = []
+    for i in range(count):
+        options = [f'选项{c}的内容说明{rng.randint(0, 999)}' for c in range(rng.randint(2, 5))]
+        kind = i % 4
+        if kind == 0:
+            questions.append(Question(f'多选题{i}', options, ['A', 'B'], 'multi', 2))
+        elif kind == 1:
+            questions.append(Question(f'判断题{i}', ['正确', '错误'], 'A', 'judge'))
+        else:
+            questions.append(Question(f'单选题{i}', options, 'A', 'single'))
+    return questions
+
+
+def rebuild_options(container, session):
+    """原来的做法: 每题清空容器并重新创建选项控件"""
+    container.clear_widgets()
+    question = session.current_question
+    answer = session.current_answer
+    for i, option in enumerate(question.options):
+        prefix = chr(65 + i)
+        if question.is_multi:
+            widget = MultiSelectOption(prefix=prefix, text=f"{prefix}. {option}")
+            widget.selected = prefix in answer
+            widget.bind(selected=lambda instance, value, p=prefix: session.set_multi_option(p, value))
+            container.add_widget(widget)
+        elif question.type in SINGLE_TYPES:
+            btn = DynamicOptionButton(
+                text=f"{prefix}. {option}",
+                on_press=lambda instance, p=prefix: session.select_answer(p),
+                group='answers_' + str(session.question_index),
+            )
+            btn.state = 'down' if answer == prefix else 'normal'
+            container.add_widget(btn)
+
+
+def page_through(session, render, container):
+    """顺序翻完整套试卷再翻回第一题, 返回每一帧的用时"""
+    order = list(range(len(session.questions)))
+    frames = []
+    for index in order + order[::-1]:
+        session.go_to(index)
+        start = time.perf_counter()
+        render()
+        EventLoop.idle()
+        frames.append(time.perf_counter() - start)
+    return frames
+
+
+def measure(name, make_render, questions):
+    container = GridLayout(cols=1, size_hint_y=None)
+    container.bind(minimum_height=container.setter('height'))
+    Window.add_widget(container)
+
+    # 第一轮只计时
+    session = QuizSession(questions)
+    frames = page_through(session, make_render(container, session), container)
+
+    # 第二轮统计内存分配和垃圾回收
+    session = QuizSession(questions)
+    render = make_render(container, session)
+    gc.collect()
+    collections = sum(stat['collections'] for stat in gc.get_stats())
+    tracemalloc.start()
+    peaks = []
+    for index in range(len(questions)):
+        session.go_to(index)
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        render()
+        EventLoop.idle()
+        peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+    collections = sum(stat['collections'] for stat in gc.get_stats()) - collections
+
+    Window.remove_widget(container)
+    container.clear_widgets()
+
+    frames.sort()
+    print(f"{name}: 帧时间 平均 {sum(frames) / len(frames) * 1000:.2f}ms, "
+          f"P95 {frames[int(len(frames) * 0.95)] * 1000:.2f}ms, "
+          f"每页峰值分配 {sum(peaks) / len(peaks) / 1024:.1f}KB, 垃圾回收 {collections} 次")
+    return sum(frames) / len(frames)
+
+
+def bench(count=1000):
+    EventLoop.ensure_window()
+    questions = generate_exam(count)
+    print(f"翻阅 {count} 题的试卷(往返共 {count * 2} 帧)")
+
+    rebuild = measure(
+        '重建控件',
+        lambda container, session: (lambda: rebuild_options(container, session)),
+        questions
+    )
+
+    def make_pool(container, session):
+        pool = OptionWidgetPool(container, session.select_answer, session.set_multi_option)
+        return lambda: pool.show(session.current_question, session.current_answer)
+
+    pooled = measure('复用控件', make_pool, questions)
+    print(f"复用后平均帧时间为原来的 {pooled / rebuild:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(bench(int(sys.argv[1]) if len(sys.argv) > 1 else 1000))
@@ -0,0 +1,104 @@
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from question import Question
+
+SINGLE_TYPES = ['single', 'grammar', 'vocabulary', 'culture', 'judge', 'cloze']
+
+
+def legacy_row_to_question(row):
+    """改用Question之前的解码方式, 作为对照"""
+    question, options_json, answer, q_type, score = row
+    return {
+        'question': question,
+        'options': json.loads(options_json),
+        'answer': json.loads(answer) if q_type == 'multi' else answer,
+        'type': q_type,
+        'score': score
+    }
+
+
+def legacy_grade(q, user_answer):
+    """改用Question之前submit_quiz中的判分逻辑"""
+    correct_answer = q.get('answer', '')
+    q_type = q.get('type', 'single')
+    if q_type in SINGLE_TYPES:
+        return str(user_answer).upper() == str(correct_answer).upper()
+    correct_answers = sorted([x.upper() for x in (correct_answer if isinstance(correct_answer, list) else [correct_answer])])
+    user_answers = sorted([x.upper() for x in (user_answer if isinstance(user_answer, list) else [])])
+    return correct_answers == user_answers
+
+
+def generate_rows(count):
+    """与数据库中存储格式相同的行; 单选题的选项各不相同, 判断题和多选题的选项重复"""
+    rows = []
+    answers = []
+    for i in range(count):
+        if i % 5 == 0:
+            options = ['选项一', '选项二', '选项三', '选项四']
+            rows.append((f"{i + 1}. 多选测试题目{i}", json.dumps(options, ensure_ascii=False),
+                         json.dumps(['A', 'C']), 'multi', 2))
+            answers.append(['C', 'A'] if i % 2 else ['A'])
+        elif i % 5 == 1:
+            rows.append((f"{i + 1}. 判断测试题目{i}", json.dumps(['正确', '错误'], ensure_ascii=False),
+                         'A', 'judge', 1))
+            answers.append('A' if i % 3 else 'B')
+        else:
+            options = [f"第{i}题的选项{n}" for n in range(4)]
+            rows.append((f"{i + 1}. 单选测试题目{i}", json.dumps(options, ensure_ascii=False),
+                         'B', 'single', 1))
+            answers.append('b' if i % 2 else 'C')
+    return rows, answers
+
+
+def measure(decode, rows):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    questions = [decode(row) for row in rows]
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return questions, size, elapsed
+
+
+def time_grading(grade, questions, answers, rounds=5):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for q, a in zip(questions, answers):
+            grade(q, a)
+    return (time.perf_counter() - start) / rounds
+
+
+def bench(count=100000):
+    rows, answers = generate_rows(count)
+
+    legacy, legacy_size, legacy_decode = measure(legacy_row_to_question, rows)
+    legacy_grade_time = time_grading(legacy_grade, legacy, answers)
+    legacy_results = [legacy_grade(q, a) for q, a in zip(legacy, answers)]
+    del legacy
+
+    compact, compact_size, compact_decode = measure(Question.from_row, rows)
+    compact_grade_time = time_grading(Question.is_correct, compact, answers)
+    compact_results = [q.is_correct(a) for q, a in zip(compact, answers)]
+
+    if legacy_results != compact_results:
+        print("[FAIL] Question的判分结果与原逻辑不一致")
+        return 1
+
+    mb = 1024 * 1024
+    print(f"{count} 题")
+    print(f"  字典:     内存 {legacy_size / mb:7.1f}MB  解码 {legacy_decode:.3f}s  判分 {legacy_grade_time:.3f}s")
+    print(f"  Question: 内存 {compact_size / mb:7.1f}MB  解码 {compact_decode:.3f}s  判分 {compact_grade_time:.3f}s")
+    print(f"  内存节省 {1 - compact_size / legacy_size:.0%}, 判分加速 {legacy_grade_time / compact_grade_time:.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(bench(int(sys.argv[1]) if len(sys.argv) > 1 else 100000))
@@ -0,0 +1,138 @@
+"""
+在临时数据库中创建数百个题库, 运行QuizApp并测量题库列表的首次显示、
+新增题库后的增量刷新以及来回切换页面的耗时。
+需要安装Kivy; 没有显示器时可以用 KIVY_GL_BACKEND=mock 运行。
+"""
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+
+from kivy.config import Config
+# 不限制帧率, 否则每帧都会睡眠到1/60秒
+Config.set('graphics', 'maxfps', '0')
+
+from kivy.clock import Clock
+from kivy.uix.screenmanager import NoTransition
+
+from main import QuizApp
+from quiz_db import QuizDatabase
+
+ROUND_TRIPS = 20
+
+
+def make_bank(count):
+    return [{
+        'question': f'题目{i}',
+        'options': ['A. 甲', 'B. 乙'],
+        'answer': 'A',
+        'type': 'single'
+    } for i in range(count)]
+
+
+class ListBench:
+    def __init__(self, app, banks):
+        self.app = app
+        self.banks = banks
+        self.results = []
+        self.failed = False
+        self.entered = 0
+
+    def wait_for(self, condition, then, started):
+        """每帧检查condition, 满足后调用then(耗时)"""
+        def poll(dt):
+            if condition():
+                then(time.perf_counter() - started)
+                return False
+            if time.perf_counter() - started > 30:
+                print("[FAIL] 等待超时")
+                self.failed = True
+                self.app.stop()
+                return False
+        Clock.schedule_interval(poll, 0)
+
+    @property
+    def screen(self):
+        return self.app.file_select_screen
+
+    def start(self):
+        # 关闭切换动画, 只测量列表本身
+        self.app.sm.transition = NoTransition()
+        self.screen.bind(on_enter=self.on_screen_enter)
+        started = time.perf_counter()
+        self.wait_for(
+            lambda: len(self.screen.list_view.data) >= self.banks
+            and self.screen.list_view.layout_manager.children,
+            self.on_first_list, started
+        )
+
+    def on_screen_enter(self, screen):
+        self.entered += 1
+
+    def on_first_list(self, elapsed):
+        self.results.append(f"首次显示 {self.banks} 个题库: {elapsed * 1000:.1f}ms, "
+                            f"创建行控件 {len(self.screen.list_view.layout_manager.children)} 个")
+        self.rows_before = list(self.screen.list_view.data)
+
+        # 在后台写入一个新题库并替换第一个题库, 然后回到列表
+        db = QuizDatabase('data/quiz.db')
+        db.add_quiz('新增题库', make_bank(5))
+        db.add_quiz('题库0', make_bank(7))
+        db.close()
+
+        self.app.sm.current = 'history'
+        started = time.perf_counter()
+        self.app.sm.current = 'file_select'
+        self.wait_for(lambda: len(self.screen.list_view.data) > len(self.rows_before),
+                      self.on_refreshed, started)
+
+    def on_refreshed(self, elapsed):
+        data = self.screen.list_view.data
+        changed = [i for i, row in enumerate(data[:len(self.rows_before)])
+                   if row is not self.rows_before[i]]
+        self.results.append(f"增量刷新: {elapsed * 1000:.1f}ms, "
+                            f"替换 {len(changed)} 行, 新增 {len(data) - len(self.rows_before)} 行")
+        if changed != [0] or data[0]['count'] != 7 or data[self.banks]['name'] != '新增题库':
+            print(f"[FAIL] 增量刷新结果不正确: {changed}")
+            self.failed = True
+        self.round_trip(0, 0.0)
+
+    def round_trip(self, done, total):
+        if done == ROUND_TRIPS:
+            self.results.append(f"列表与历史记录来回切换 {ROUND_TRIPS} 次: "
+                                f"平均 {total / ROUND_TRIPS * 1000:.1f}ms")
+            self.app.stop()
+            return
+        started = time.perf_counter()
+        entered = self.entered
+        self.app.sm.current = 'history'
+        self.app.sm.current = 'file_select'
+        self.wait_for(lambda: self.entered > entered and not self.screen._refreshing,
+                      lambda elapsed: self.round_trip(done + 1, total + elapsed), started)
+
+
+def bench(banks=500):
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        db = QuizDatabase('data/quiz.db')
+        for i in range(banks):
+            db.add_quiz(f'题库{i}', make_bank(3))
+        db.close()
+
+        app = QuizApp()
+        runner = ListBench(app, banks)
+        Clock.schedule_once(lambda dt: runner.start(), 0)
+        app.run()
+        os.chdir(ROOT)
+
+    for line in runner.results:
+        print(line)
+    return 1 if runner.failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(bench(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
@@ -0,0 +1,71 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from question import Question
+from quiz_session import QuizSession
+
+QUESTIONS_PER_SESSION = 30
+
+
+def generate_bank(count, seed=0):
+    rng = random.Random(seed)
+    bank = []
+    for i in range(count):
+        kind = i % 5
+        if kind == 0:
+            answer = sorted(rng.sample('ABCD', rng.randint(2, 3)))
+            bank.append(Question(f"{i + 1}. 多选测试题目{i}", ['选项一', '选项二', '选项三', '选项四'],
+                                 answer, 'multi', 2))
+        elif kind == 1:
+            bank.append(Question(f"{i + 1}. 判断测试题目{i}", ['正确', '错误'], rng.choice('AB'), 'judge'))
+        else:
+            bank.append(Question(f"{i + 1}. 单选测试题目{i}", ['选项一', '选项二', '选项三', '选项四'],
+                                 rng.choice('ABCD'), 'single'))
+    return bank
+
+
+def simulate(session, rng):
+    """模拟一名考生: 逐题作答, 偶尔回到上一题, 最后交卷"""
+    while True:
+        question = session.current_question
+        if question.is_multi:
+            for prefix in 'ABCD':
+                session.set_multi_option(prefix, rng.random() < 0.5)
+        else:
+            session.select_answer(chr(65 + rng.randrange(len(question.options))))
+
+        if session.question_index and rng.random() < 0.05:
+            session.prev()
+            session.next()
+        if not session.next():
+            break
+    return session.submit()
+
+
+def bench(sessions=20000, bank_size=5000):
+    bank = generate_bank(bank_size)
+    rng = random.Random(1)
+
+    start = time.perf_counter()
+    total_score = 0
+    for _ in range(sessions):
+        session = QuizSession.sample(bank, QUESTIONS_PER_SESSION, rng)
+        simulate(session, rng)
+        total_score += session.total_score
+    elapsed = time.perf_counter() - start
+
+    loaded_kivy = 'kivy' in sys.modules
+    print(f"{sessions} 次测验(每次 {QUESTIONS_PER_SESSION} 题, 题库 {bank_size} 题): "
+          f"{elapsed:.2f}s, {sessions / elapsed:.0f} 次/秒, 平均得分 {total_score / sessions:.1f}")
+    if loaded_kivy:
+        print("[FAIL] 会话引擎加载了kivy")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(bench(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
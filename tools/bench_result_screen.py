@@ -0,0 +1,98 @@
+"""
+比较结果页一次创建全部结果行和用RecycleView只创建可见行的打开耗时, 并测量滚动帧时间。
+需要安装Kivy; 没有显示器时可以用 KIVY_GL_BACKEND=mock 运行。
+"""
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+
+from kivy.config import Config
+# 不限制帧率, 否则每帧都会睡眠到1/60秒
+Config.set('graphics', 'maxfps', '0')
+
+from kivy.base import EventLoop
+from kivy.core.window import Window
+from kivy.metrics import dp
+from kivy.uix.gridlayout import GridLayout
+from kivy.uix.scrollview import ScrollView
+
+os.chdir(ROOT)
+from main import ResultItem, ResultScreen
+from question import Question
+from quiz_session import QuizSession
+
+SCROLL_STEPS = 300
+
+
+def result_details(count, seed=0):
+    rng = random.Random(seed)
+    questions = [
+        Question(f'第{i}题的题干内容' * rng.randint(1, 4), ['甲', '乙', '丙', '丁'], 'A', 'single')
+        for i in range(count)
+    ]
+    session = QuizSession(questions)
+    for _ in questions:
+        session.select_answer(rng.choice('ABCD'))
+        session.next()
+    return session.submit()
+
+
+def open_all_rows(details):
+    """原来的做法: 每道题都创建一行控件"""
+    scroll = ScrollView()
+    layout = GridLayout(cols=1, size_hint_y=None, spacing=dp(10))
+    layout.bind(minimum_height=layout.setter('height'))
+    for index, detail in enumerate(details):
+        item = ResultItem()
+        item.refresh_view_attrs(None, index, dict(detail, stats=''))
+        layout.add_widget(item)
+    scroll.add_widget(layout)
+    return scroll, layout
+
+
+def open_recycle_view(details):
+    view = ResultScreen().build_results_view(details)
+    return view, view.layout_manager
+
+
+def time_open(build, details):
+    start = time.perf_counter()
+    view, layout = build(details)
+    Window.add_widget(view)
+    EventLoop.idle()
+    EventLoop.idle()
+    elapsed = time.perf_counter() - start
+    return view, len(layout.children), elapsed
+
+
+def time_scroll(view):
+    frames = []
+    for step in range(SCROLL_STEPS + 1):
+        view.scroll_y = 1 - step / SCROLL_STEPS
+        start = time.perf_counter()
+        EventLoop.idle()
+        frames.append(time.perf_counter() - start)
+    frames.sort()
+    return sum(frames) / len(frames), frames[int(len(frames) * 0.95)]
+
+
+def bench(sizes=(100, 1000, 5000)):
+    EventLoop.ensure_window()
+    for count in sizes:
+        details = result_details(count)
+        for name, build in (('全部创建', open_all_rows), ('RecycleView', open_recycle_view)):
+            view, rows, elapsed = time_open(build, details)
+            mean, p95 = time_scroll(view)
+            Window.remove_widget(view)
+            print(f"{count:>5} 题 {name:<12} 打开 {elapsed * 1000:8.1f}ms  行控件 {rows:>5}  "
+                  f"滚动帧 平均 {mean * 1000:.2f}ms P95 {p95 * 1000:.2f}ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(bench())
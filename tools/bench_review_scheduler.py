@@ -0,0 +1,92 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bank_cache import BankCache
+from quiz_db import QuizDatabase
+from scheduler import DAY_SECONDS, review_cutoff
+
+# 初始化卡片时每次提交的作答数
+SEED_BATCH = 2000
+
+
+def review_attempt(questions, finished_at, rng, correct_rate=0.8):
+    responses = [{
+        'position': i,
+        'question_id': q.id,
+        'user_answer': 'A',
+        'is_correct': rng.random() < correct_rate,
+        'score': 1,
+        'time_used': rng.uniform(2, 90),
+    } for i, q in enumerate(questions)]
+    return {
+        'quiz_name': 'bank',
+        'blueprint_name': None,
+        'review': True,
+        'started_at': finished_at - 60,
+        'finished_at': finished_at,
+        'total_score': 0,
+        'max_score': len(questions),
+        'correct_count': 0,
+        'question_count': len(questions),
+        'total_time': 60.0,
+        'responses': responses,
+    }
+
+
+def bench(cards=100000, days=30):
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = QuizDatabase(os.path.join(tmp, 'review.db'), cache=BankCache(max_bytes=0))
+        db.bulk_add_quiz('bank', ({
+            'question': f'题目{i}',
+            'options': ['A', 'B', 'C', 'D'],
+            'answer': 'A',
+            'type': 'single'
+        } for i in range(cards)))
+
+        # 第0天把所有题目作为新卡片复习一遍, 分批提交
+        now = time.time() - days * DAY_SECONDS
+        start = time.perf_counter()
+        seeded = 0
+        while seeded < cards:
+            questions = db.get_due_questions('bank', now=now, limit=SEED_BATCH, new_limit=SEED_BATCH)
+            db.record_attempts([review_attempt(questions, now, rng)])
+            seeded += len(questions)
+        elapsed = time.perf_counter() - start
+        print(f"初始化 {seeded} 张卡片: {elapsed:.2f}s, {seeded / elapsed:.0f} 张/秒")
+
+        query_times = []
+        submit_times = []
+        due_counts = []
+        for day in range(1, days + 1):
+            now += DAY_SECONDS
+            due_counts.append(db.get_due_count('bank', now=now))
+
+            start = time.perf_counter()
+            questions = db.get_due_questions('bank', now=now)
+            query_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            db.record_attempts([review_attempt(questions, now, rng)])
+            submit_times.append(time.perf_counter() - start)
+
+        cutoff = review_cutoff(now)
+        remaining = db.conn.execute(
+            'SELECT COUNT(*) FROM review_cards WHERE due_at <= ?', (cutoff,)
+        ).fetchone()[0]
+        db.close()
+
+    print(f"{days} 天, 每天到期 {min(due_counts)}-{max(due_counts)} 张, "
+          f"今日复习查询平均 {sum(query_times) / days * 1000:.2f}ms, "
+          f"交卷更新平均 {sum(submit_times) / days * 1000:.2f}ms")
+    print(f"最后一天仍到期 {remaining} 张")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(bench(int(sys.argv[1]) if len(sys.argv) > 1 else 100000))
@@ -0,0 +1,72 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bank_cache import BankCache
+from quiz_db import QuizDatabase
+
+CHARS = '的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行学法所民得经十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点从业本去把性好应开它合还因由其些然前外天政四日那社义事平形相全表间样与关各重新线内数正心反你明看原又么利比或但质气第向道命此变条只没结解问意建月公无系军很情者最立代想已通并提直题党程展五果料象员革位入常文总次品式活设及管特件长求老头基资边流路级少图山统接知较将组见计别她手角期根论运农指几九区强放决西被干做必战先回则任取据处队南给色光门即保治北造百规热领七海口东导器压志世金增争济阶油思术极交受联什认六共权收证改清己美再采转更单风切打白教速花带安场身车例真务具万每目至达走积示议声报斗完类八离华名确才科张信马节话米整空元况今集温传土许步群广石记需段研界拉林律叫且究观越织装影算低持音众书布复容儿须际商非验连断深难近矿千周委素技备半办青省列习响约支般史感劳便团往酸历市克何除消构府称太准精值号率族维划选标写存候毛亲快效斯院查江型眼王按格养易置派层片始却专状育厂京识适属圆包火住调满县局照参红细引听该铁价严'
+
+
+def random_text(rng, length):
+    return ''.join(rng.choice(CHARS) for _ in range(length))
+
+
+def generate(rng, count):
+    for i in range(count):
+        yield {
+            'question': f'{random_text(rng, rng.randint(12, 30))}？',
+            'options': [f'{p}. {random_text(rng, rng.randint(2, 8))}' for p in 'ABCD'],
+            'answer': 'A',
+            'type': 'single'
+        }
+
+
+def bench(total=100000, banks=4, queries=200):
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = QuizDatabase(os.path.join(tmp, 'search.db'), cache=BankCache(max_bytes=0))
+
+        start = time.perf_counter()
+        for b in range(banks):
+            db.bulk_add_quiz(f'题库{b}', generate(rng, total // banks))
+        elapsed = time.perf_counter() - start
+        print(f"导入 {total} 道题并建立全文索引: {elapsed:.2f}s")
+
+        # 查询词取自题干中的片段, 长度1-4个字
+        texts = [row[0] for row in db.conn.execute(
+            'SELECT question FROM questions ORDER BY random() LIMIT ?', (queries,)
+        )]
+        terms = []
+        for text in texts:
+            length = rng.randint(1, 4)
+            offset = rng.randrange(len(text) - length)
+            terms.append(text[offset:offset + length])
+
+        timings = []
+        misses = 0
+        for term in terms:
+            start = time.perf_counter()
+            hits = db.search_questions(term)
+            timings.append(time.perf_counter() - start)
+            if not any(term in q.question for _, q in hits):
+                misses += 1
+        db.close()
+
+    timings.sort()
+    print(f"{queries} 次检索: 中位数 {timings[len(timings) // 2] * 1000:.2f}ms, "
+          f"P95 {timings[int(len(timings) * 0.95)] * 1000:.2f}ms, "
+          f"最慢 {timings[-1] * 1000:.2f}ms")
+    if misses:
+        print(f"[FAIL] {misses} 次检索没有找到查询词所在的题目")
+        return 1
+    print("[OK] 每次检索都找到了包含查询词的题目")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(bench(int(sys.argv[1]) if len(sys.argv) > 1 else 100000))
@@ -0,0 +1,136 @@
+"""
+运行QuizApp, 比较不使用和使用文字纹理缓存(含空闲帧预渲染)时翻页那一帧的耗时,
+并检查窗口大小改变后缓存被清空。
+需要安装Kivy; 没有显示器时可以用 KIVY_GL_BACKEND=mock 运行。
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+
+from kivy.config import Config
+# 不限制帧率, 否则每帧都会睡眠到1/60秒
+Config.set('graphics', 'maxfps', '0')
+
+from kivy.clock import Clock
+from kivy.core.window import Window
+from kivy.uix.screenmanager import NoTransition
+
+import main
+from main import QuizApp, text_textures
+from question import Question
+
+# 两次翻页之间留给预渲染的空闲帧数, 相当于用户读题的时间
+IDLE_FRAMES = 15
+
+
+def generate_exam(count, seed=0):
+    rng = random.Random(seed)
+    questions = []
+    for i in range(count):
+        text = f'第{i}题 ' + '关于安全生产管理规定的题干内容说明' * rng.randint(1, 6)
+        options = [f'选项内容{rng.randint(0, 9999)}' * rng.randint(1, 3)
+                   for _ in range(rng.randint(2, 5))]
+        if i % 4 == 0:
+            questions.append(Question(text, options, ['A', 'B'], 'multi', 2))
+        else:
+            questions.append(Question(text, options, 'A', 'single'))
+    return questions
+
+
+class TextureBench:
+    def __init__(self, app, questions, pages):
+        self.app = app
+        self.questions = questions
+        self.pages = pages
+        self.results = []
+        self.failed = False
+
+    def start(self):
+        self.app.sm.transition = NoTransition()
+        self.modes = [('不缓存', 0, 0), ('缓存+预渲染', main.PRERENDER_NEIGHBORS,
+                                          text_textures.max_bytes)]
+        self.next_mode()
+
+    def next_mode(self):
+        if not self.modes:
+            self.check_resize()
+            return
+        self.name, neighbors, max_bytes = self.modes.pop(0)
+        main.PRERENDER_NEIGHBORS = neighbors
+        text_textures.max_bytes = max_bytes
+        text_textures.clear()
+        text_textures.hits = text_textures.misses = 0
+
+        self.app.start_quiz(self.questions)
+        # 先往后翻再翻回来
+        self.plan = ['next'] * self.pages + ['prev'] * self.pages
+        self.frames = []
+        self.idle = IDLE_FRAMES
+        self.started = None
+        Clock.schedule_interval(self.tick, 0)
+
+    def tick(self, dt):
+        now = time.perf_counter()
+        if self.started is not None:
+            self.frames.append(now - self.started)
+            self.started = None
+        if self.idle:
+            self.idle -= 1
+            return
+        if not self.plan:
+            self.report()
+            Clock.schedule_once(lambda dt: self.next_mode(), 0)
+            return False
+        action = self.plan.pop(0)
+        self.started = time.perf_counter()
+        if action == 'next':
+            self.app.next_question()
+        else:
+            self.app.prev_question()
+        self.idle = IDLE_FRAMES
+
+    def report(self):
+        frames = sorted(self.frames)
+        stats = text_textures.stats()
+        self.results.append(
+            f"{self.name:<8} 翻页帧 平均 {sum(frames) / len(frames) * 1000:.2f}ms "
+            f"P95 {frames[int(len(frames) * 0.95)] * 1000:.2f}ms  "
+            f"缓存 {stats['entries']} 项 {stats['size_bytes'] / 1024 / 1024:.1f}MB "
+            f"命中 {stats['hits']} 未命中 {stats['misses']}"
+        )
+
+    def check_resize(self):
+        before = text_textures.stats()['entries']
+        Window.size = (Window.width + 50, Window.height)
+        after = text_textures.stats()['entries']
+        self.results.append(f"窗口大小改变: 缓存 {before} 项 -> {after} 项")
+        if not before or after:
+            print("[FAIL] 窗口大小改变后缓存没有清空")
+            self.failed = True
+        self.app.stop()
+
+
+def bench(count=1000, pages=200):
+    questions = generate_exam(count)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        app = QuizApp()
+        runner = TextureBench(app, questions, pages)
+        Clock.schedule_once(lambda dt: runner.start(), 0)
+        app.run()
+        os.chdir(ROOT)
+
+    print(f"{count} 题的试卷, 往后翻 {pages} 题再翻回来")
+    for line in runner.results:
+        print(line)
+    return 1 if runner.failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(bench(int(sys.argv[1]) if len(sys.argv) > 1 else 1000))
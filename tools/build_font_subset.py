@@ -0,0 +1,132 @@
+"""
+扫描assets/json和quiz.db里的全部题库以及界面源码中的字符串, 生成只含这些字的裁剪字体,
+并比较完整字体和裁剪字体的文件大小、加载渲染耗时和进程内存(RSS)。
+生成字体需要安装fontTools; 比较耗时和内存需要安装Kivy, 没有显示器时可以用 KIVY_GL_BACKEND=mock 运行。
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from font_subset import (build_subset, collect_chars, json_bank_strings,
+                         source_strings, subset_font_path)
+from quiz_db import QuizDatabase
+
+UI_SOURCES = ['main.py']
+PROBE_RUNS = 5
+
+
+def read_rss_kb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def probe(font_path, sample):
+    """在子进程里运行: 注册字体并渲染sample, 输出耗时和RSS增量"""
+    os.environ.setdefault('KIVY_NO_ARGS', '1')
+    from kivy.base import EventLoop
+    from kivy.core.text import Label as CoreLabel, LabelBase
+
+    # 渲染纹理需要GL上下文, 先创建窗口再开始计量
+    EventLoop.ensure_window()
+    rss = read_rss_kb()
+    start = time.perf_counter()
+    LabelBase.register(name='probe', fn_regular=font_path)
+    label = CoreLabel(text=sample, font_name='probe', font_size=32)
+    label.refresh()
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'seconds': elapsed, 'rss_kb': read_rss_kb() - rss}))
+
+
+def measure(font_path, sample):
+    """多次启动子进程, 取耗时和内存增量的中位数"""
+    runs = []
+    for _ in range(PROBE_RUNS):
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--probe', font_path],
+            input=sample, capture_output=True, text=True, encoding='utf-8'
+        )
+        if result.returncode != 0:
+            print(f"测量失败: {result.stderr.strip().splitlines()[-1:]}")
+            return None
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    runs.sort(key=lambda run: run['seconds'])
+    seconds = runs[len(runs) // 2]['seconds']
+    rss_kb = sorted(run['rss_kb'] for run in runs)[len(runs) // 2]
+    return seconds, rss_kb
+
+
+def gather_texts(json_dir, db_path, sources):
+    texts = list(source_strings(sources))
+    if os.path.isdir(json_dir):
+        texts.extend(json_bank_strings(json_dir))
+    if os.path.exists(db_path):
+        db = QuizDatabase(db_path)
+        try:
+            texts.extend(db.iter_display_texts())
+        finally:
+            db.close()
+    return texts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='按题库和界面用到的字生成裁剪字体')
+    parser.add_argument('--font', default='assets/font/simhei.ttf', help='完整字体路径')
+    parser.add_argument('--json-dir', default='assets/json', help='JSON题库目录')
+    parser.add_argument('--db', default='data/quiz.db', help='数据库路径')
+    parser.add_argument('--out', help='裁剪字体路径, 默认与完整字体同目录的 *_subset.ttf')
+    parser.add_argument('--no-measure', action='store_true', help='不比较加载耗时和内存')
+    parser.add_argument('--probe', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.probe:
+        probe(args.probe, sys.stdin.read())
+        return 0
+
+    if not os.path.exists(args.font):
+        print(f"字体文件不存在: {args.font}")
+        return 1
+
+    out_path = args.out or subset_font_path(args.font)
+    texts = gather_texts(args.json_dir, args.db,
+                         [os.path.join(ROOT, path) for path in UI_SOURCES])
+    chars = collect_chars(texts)
+    absent = build_subset(args.font, out_path, chars)
+
+    full_size = os.path.getsize(args.font)
+    subset_size = os.path.getsize(out_path)
+    print(f"共 {len(chars)} 个字符, 完整字体中缺少 {len(absent)} 个")
+    print(f"完整字体 {full_size / 1024:.0f}KB -> 裁剪字体 {subset_size / 1024:.0f}KB "
+          f"(减少 {1 - subset_size / full_size:.0%})")
+    print(f"已生成: {out_path}")
+
+    if args.no_measure:
+        return 0
+
+    # 渲染用到的全部字符, 让两种字体加载同样多的字形
+    ordered = sorted(chars)
+    sample = '\n'.join(''.join(ordered[i:i + 40]) for i in range(0, len(ordered), 40))
+    full = measure(args.font, sample)
+    subset = measure(out_path, sample)
+    if full is None or subset is None:
+        return 1
+    print(f"加载并渲染: 完整字体 {full[0] * 1000:.1f}ms RSS +{full[1] / 1024:.1f}MB, "
+          f"裁剪字体 {subset[0] * 1000:.1f}ms RSS +{subset[1] / 1024:.1f}MB")
+    print(f"节省 {(full[0] - subset[0]) * 1000:.1f}ms, {(full[1] - subset[1]) / 1024:.1f}MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
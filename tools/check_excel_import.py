@@ -0,0 +1,298 @@
+import importlib.util
+import math
+import os
+import random
+import re
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from excel_import import process_excel_data, read_questions
+
+def legacy_process_excel_data(df):
+    """原ExcelImportScreen.process_excel_data的逐行实现, 作为对照基准, 不要修改"""
+    questions = []
+
+    columns = [col.strip() for col in df.columns]
+
+    serial_col = None
+    for col in columns:
+        if col in ['序号', '编号', '题号']:
+            serial_col = col
+            break
+
+    question_col = None
+    for col in columns:
+        if col in ['题目', '题干', '问题', '试题']:
+            question_col = col
+            break
+
+    if question_col is None:
+        return questions
+
+    type_col = None
+    for col in columns:
+        if col in ['题型', '题目类型', '类型']:
+            type_col = col
+            break
+
+    option_cols = []
+    for col in columns:
+        if col.startswith('选项') or col in ['A', 'B', 'C', 'D', 'E', 'F']:
+            option_cols.append(col)
+
+    answer_col = None
+    for col in columns:
+        if col in ['答案', '正确答案', '标准答案']:
+            answer_col = col
+            break
+
+    for idx, row in df.iterrows():
+        serial = idx + 1
+        if serial_col and serial_col in row:
+            try:
+                serial = int(row[serial_col])
+            except:
+                serial = idx + 1
+
+        question = str(row[question_col]) if question_col in row else f"题目{serial}"
+
+        q_type = 'single'
+        if type_col and type_col in row:
+            type_str = str(row[type_col]).strip()
+            if type_str in ['多选', '多选题']:
+                q_type = 'multi'
+            elif type_str in ['判断', '判断题']:
+                q_type = 'judge'
+
+        options = []
+        if q_type == 'judge':
+            options = ['正确', '错误']
+        elif option_cols:
+            if len(option_cols) > 1:
+                for col in option_cols:
+                    if col in row and pd.notna(row[col]):
+                        options.append(str(row[col]))
+            else:
+                option_str = str(row[option_cols[0]]) if option_cols[0] in row else ''
+                if option_str:
+                    separators = [r'[A-Z][\.、:：]', r'\n', r'[;；]']
+                    for sep in separators:
+                        if re.search(sep, option_str):
+                            split_options = re.split(sep, option_str)
+                            options = [opt.strip() for opt in split_options if opt.strip()]
+                            if options:
+                                break
+                    
+                    if not options:
+                        pattern = r'([A-Z][\.、:：]\s*[^A-Z]+)'
+                        matches = re.findall(pattern, option_str)
+                        if matches:
+                            options = [m.strip() for m in matches]
+                        else:
+                            options = [option_str]
+
+        cleaned_options = []
+        for opt in options:
+            opt = re.sub(r'^[A-Z][\.、:：]\s*', '', opt.strip())
+            cleaned_options.append(opt)
+        options = cleaned_options
+
+        answer = ''
+        if answer_col and answer_col in row:
+            answer = str(row[answer_col]).strip().upper()
+            
+            if q_type == 'multi':
+                answer = re.sub(r'[、\s]', ',', answer)
+                answer = [c for c in answer if c in 'ABCDEF']
+            elif q_type == 'judge':
+                answer = 'A' if answer in ['A', '正确', '对', '是', 'Y', 'YES'] else 'B'
+
+        score = 1
+        if q_type == 'multi':
+            score = 2
+
+        question_data = {
+            'question': f"{serial}. {question}",
+            'options': options,
+            'answer': answer if q_type != 'multi' else list(answer),
+            'type': q_type,
+            'score': score
+        }
+
+        questions.append(question_data)
+
+    return questions
+
+# 空单元格与pd.read_excel的结果一致, 使用NaN表示
+TYPE_VALUES = ['单选', '单选题', '多选', '多选题', ' 多选 ', '判断', '判断题', '填空', math.nan]
+ANSWER_VALUES = ['A', 'b', 'A、C', 'a c d', 'ABCDEFG', '正确', '对', 'yes', 'n', '错误', math.nan, 3]
+OPTION_CELLS = [
+    'A.苹果 B.香蕉 C.橙子',
+    'A、一\nB、二\nC、三',
+    '甲;乙；丙',
+    'A:第一项 B：第二项',
+    '只有一个选项',
+    'A.',
+    '',
+    math.nan,
+    '苹果\n\n香蕉',
+]
+
+def synthetic_sheet(rows, layout='columns', seed=0):
+    """生成包含各种边界情况的测试表格"""
+    rng = random.Random(seed)
+    data = {
+        '序号': [rng.choice([i + 1, f'{i + 1}', '第一', math.nan, 3.0, f' {i} ']) for i in range(rows)],
+        '题目': [rng.choice([f'题目内容{i}', math.nan, 12, 'A. 带前缀的题目']) for i in range(rows)],
+        '题型': [rng.choice(TYPE_VALUES) for _ in range(rows)],
+        '答案': [rng.choice(ANSWER_VALUES) for _ in range(rows)],
+    }
+    if layout == 'columns':
+        for letter in 'ABCD':
+            data[f'选项{letter}'] = [
+                rng.choice([f'{letter}. 选项{i}', f'选项{i}', math.nan, 1.5, f' {letter}、x ']) for i in range(rows)
+            ]
+    elif layout == 'letters':
+        for letter in 'ABC':
+            data[letter] = [rng.choice([f'内容{i}', math.nan]) for i in range(rows)]
+    elif layout == 'single':
+        data['选项'] = [rng.choice(OPTION_CELLS) for _ in range(rows)]
+    return pd.DataFrame(data)
+
+def golden_cases():
+    yield 'columns', synthetic_sheet(500, 'columns', seed=1)
+    yield 'letters', synthetic_sheet(500, 'letters', seed=2)
+    yield 'single', synthetic_sheet(500, 'single', seed=3)
+    yield 'no_options', synthetic_sheet(200, 'none', seed=4)
+    yield 'no_question', pd.DataFrame({'序号': [1, 2], '答案': ['A', 'B']})
+    yield 'padded_headers', pd.DataFrame({' 题目 ': ['x', 'y'], '答案': ['A', 'B'], '题型': ['多选', '判断']})
+    yield 'no_answer', pd.DataFrame({'试题': ['x', 'y', 'z'], '类型': ['多选题', '判断题', '单选']})
+    yield 'numeric_only', pd.DataFrame({'题号': [1, 2], '题目': [1.5, 2.5], '答案': [1, 2]})
+    # object列, 写出的文件里是整数12而不是12.0
+    yield 'numeric_blanks', pd.DataFrame({'题目': ['x', 'y', 'z'],
+                                          '答案': pd.Series([12, math.nan, 3], dtype=object)})
+    yield 'string_dtype', synthetic_sheet(300, 'single', seed=5).astype(str)
+    yield 'custom_index', synthetic_sheet(100, 'columns', seed=6).set_index(pd.RangeIndex(10, 110))
+    yield 'empty', pd.DataFrame({'题目': [], '答案': []})
+
+    # 经过xlsx文件读写, 与实际导入时pd.read_excel得到的DataFrame相同
+    if importlib.util.find_spec('openpyxl') is None:
+        return
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        for layout in ('columns', 'single'):
+            path = os.path.join(tmp, f'{layout}.xlsx')
+            synthetic_sheet(300, layout, seed=7).to_excel(path, index=False)
+            yield f'xlsx_{layout}', pd.read_excel(path, engine='openpyxl')
+
+def write_date_cell_xlsx(path):
+    """手工写一个含t="d"日期单元格的xlsx, Excel和LibreOffice会这样保存日期"""
+    import zipfile
+
+    def inline(ref, text):
+        return f'<c r="{ref}" t="inlineStr"><is><t>{text}</t></is></c>'
+
+    sheet = (
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+        f'<row r="1">{inline("A1", "题目")}{inline("B1", "选项A")}{inline("C1", "选项B")}{inline("D1", "答案")}</row>'
+        f'<row r="2">{inline("A2", "哪一天是元旦")}'
+        '<c r="B2" t="d"><v>2024-01-01T00:00:00</v></c>'
+        '<c r="C2" t="d"><v>2024-05-01</v></c>'
+        f'{inline("D2", "A")}</row>'
+        '</sheetData></worksheet>'
+    )
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('xl/workbook.xml', (
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets></workbook>'
+        ))
+        archive.writestr('xl/_rels/workbook.xml.rels', (
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+            '</Relationships>'
+        ))
+        archive.writestr('xl/worksheets/sheet1.xml', sheet)
+
+
+def check_date_cells():
+    """t="d"的日期单元格按文本读取, 不能中断导入"""
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'dates.xlsx')
+        write_date_cell_xlsx(path)
+        try:
+            questions = read_questions(path)
+        except Exception as e:
+            print(f"[FAIL] xlsx_date_cells: {e}")
+            return False
+    ok = len(questions) == 1 and questions[0]['options'] == ['2024-01-01T00:00:00', '2024-05-01']
+    print(f"[{'OK' if ok else 'FAIL'}] xlsx_date_cells: {questions}")
+    return ok
+
+# 整数值的数字单元格: pandas会把整列(或iterrows时整行)转成float, 旧实现得到"12.0";
+# 流式读取按单元格原样取值, 得到"12"。这是有意的差异, 只在这些用例里按此规则比较
+FLOAT_TEXT_CASES = {'numeric_only', 'numeric_blanks'}
+
+
+def strip_float_text(question):
+    question = dict(question)
+    question['answer'] = re.sub(r'^(-?\d+)\.0$', r'\1', question['answer'])
+    return question
+
+
+def check_written_files():
+    """
+    把用例写成xlsx和csv文件, 比较read_questions(path)和
+    旧实现处理pd.read_excel / pd.read_csv结果的输出
+    """
+    import tempfile
+    formats = [('csv', pd.DataFrame.to_csv, pd.read_csv)]
+    if importlib.util.find_spec('openpyxl') is not None:
+        formats.insert(0, ('xlsx', pd.DataFrame.to_excel, pd.read_excel))
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, df in golden_cases():
+            if name.startswith('xlsx_'):
+                continue
+            for ext, write, read in formats:
+                path = os.path.join(tmp, f'{name}.{ext}')
+                write(df, path, index=False)
+                expected = legacy_process_excel_data(read(path))
+                actual = read_questions(path)
+                if name in FLOAT_TEXT_CASES:
+                    expected = [strip_float_text(q) for q in expected]
+                ok = expected == actual
+                print(f"[{'OK' if ok else 'FAIL'}] file_{ext}_{name}: {len(actual)} 题")
+                if not ok:
+                    failures += 1
+                    for i, (e, a) in enumerate(zip(expected, actual)):
+                        if e != a:
+                            print(f"       第{i}行\n       期望: {e}\n       实际: {a}")
+                            break
+    return failures
+
+def main():
+    failures = 0
+    if not check_date_cells():
+        failures += 1
+    for name, df in golden_cases():
+        expected = legacy_process_excel_data(df)
+        actual = process_excel_data(df)
+        ok = expected == actual
+        print(f"[{'OK' if ok else 'FAIL'}] {name}: {len(actual)} 题")
+        if not ok:
+            failures += 1
+            for i, (e, a) in enumerate(zip(expected, actual)):
+                if e != a:
+                    print(f"       第{i}行\n       期望: {e}\n       实际: {a}")
+                    break
+    failures += check_written_files()
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bank_cache import BankCache
+from quiz_db import QuizDatabase
+from quiz_migrations import SCHEMA_VERSION, get_schema_version
+
+# 需要检查的热点查询: (名称, 调用方式)
+HOT_CALLS = [
+    ('get_questions_by_quiz_name', lambda db: db.get_questions_by_quiz_name('bank')),
+    ('get_quiz_info', lambda db: db.get_quiz_info('bank')),
+    ('get_quiz_summaries', lambda db: db.get_quiz_summaries(1)),
+    ('sample_questions', lambda db: db.sample_questions('bank', 5, seed=1)),
+    ('sample_blueprint', lambda db: db.sample_blueprint('mix', seed=1)),
+    ('get_attempts', lambda db: db.get_attempts(before_id=1000, limit=20)),
+    ('get_attempts(quiz_name)', lambda db: db.get_attempts(before_id=1000, limit=20, quiz_name='bank')),
+    ('get_attempt_answers', lambda db: db.get_attempt_answers(1)),
+    ('get_question_stats', lambda db: db.get_question_stats([1, 2, 3])),
+    ('get_hardest_questions', lambda db: db.get_hardest_questions('bank', 50)),
+    ('get_due_questions', lambda db: db.get_due_questions('bank', now=0)),
+    ('get_due_count', lambda db: db.get_due_count('bank', now=0)),
+    ('search_questions', lambda db: db.search_questions('题目1')),
+]
+
+def trace_statements(db, call):
+    """执行call并返回其间执行的SELECT语句（参数已展开）"""
+    statements = []
+    db.conn.set_trace_callback(statements.append)
+    try:
+        call(db)
+    finally:
+        db.conn.set_trace_callback(None)
+    return [sql for sql in statements if sql.lstrip().upper().startswith('SELECT')]
+
+def full_scans(db, sql):
+    plan = [row[-1] for row in db.conn.execute('EXPLAIN QUERY PLAN ' + sql)]
+    scans = [
+        detail for detail in plan
+        if detail.startswith('SCAN') and 'subquery' not in detail and ' INDEX ' not in detail
+    ]
+    return plan, scans
+
+def check_query_plans(db):
+    """检查热点查询是否全部走索引, 返回存在全表扫描的查询名称列表"""
+    failures = []
+    for name, call in HOT_CALLS:
+        ok = True
+        details = []
+        for sql in trace_statements(db, call):
+            plan, scans = full_scans(db, sql)
+            details.extend(plan)
+            if scans:
+                ok = False
+        print(f"[{'OK' if ok else 'FAIL'}] {name}")
+        for detail in details:
+            print(f"       {detail}")
+        if not ok:
+            failures.append(name)
+    return failures
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        # 关闭题库缓存, 保证每次调用都执行SQL
+        db = QuizDatabase(os.path.join(tmp, 'plan.db'), cache=BankCache(max_bytes=0))
+        version = get_schema_version(db.conn)
+        if version != SCHEMA_VERSION:
+            print(f"[FAIL] 数据库版本 {version}, 期望 {SCHEMA_VERSION}")
+            return 1
+
+        for name in ('bank', 'other'):
+            db.add_quiz(name, ({
+                'question': f'题目{i}',
+                'options': ['A', 'B'],
+                'answer': ['A'] if i % 3 == 1 else 'A',
+                'type': ('single', 'multi', 'judge')[i % 3]
+            } for i in range(1000)))
+        db.save_blueprint('mix', {'single': 6, 'multi': 2, 'judge': 2}, {'bank': 0.5, 'other': 0.5})
+
+        failures = check_query_plans(db)
+        db.close()
+
+    if failures:
+        print(f"{len(failures)} 个查询存在全表扫描")
+        return 1
+    print("所有热点查询均使用索引")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
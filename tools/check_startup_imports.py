@@ -0,0 +1,83 @@
+import ast
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+sys.path.insert(0, ROOT)
+
+from startup_timing import HEAVY_MODULES
+
+# 启动时不应加载的模块: 只在导入Excel时才需要的库、进程池和只在构建字体时使用的fontTools
+DENIED_MODULES = HEAVY_MODULES + ('concurrent.futures.process', 'multiprocessing', 'fontTools')
+
+
+def _top_level_statements(body):
+    """模块顶层执行的语句, 包括顶层if/try里的语句, 不进入函数和类"""
+    for node in body:
+        yield node
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        for field in ('body', 'orelse', 'finalbody'):
+            yield from _top_level_statements(getattr(node, field, []))
+        for handler in getattr(node, 'handlers', []):
+            yield from _top_level_statements(handler.body)
+
+
+def startup_modules(path=os.path.join(ROOT, 'main.py')):
+    """
+    main.py顶层导入的本项目模块, 按出现顺序排列。
+    Kivy等第三方库和标准库不在其中, 它们间接导入的本项目模块由导入本身带入。
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    modules = []
+    for node in _top_level_statements(tree.body):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            root = name.split('.')[0]
+            local = (os.path.exists(os.path.join(ROOT, root + '.py'))
+                     or os.path.exists(os.path.join(ROOT, root, '__init__.py')))
+            if local and name not in modules:
+                modules.append(name)
+    return modules
+
+PROBE = '''
+import sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = (time.perf_counter() - start) * 1000
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(f"{{elapsed:.1f}}")
+print(",".join(heavy))
+'''
+
+def main():
+    """在新进程中导入启动模块, 检查耗时以及是否提前加载了重量级模块"""
+    modules = startup_modules()
+    probe = PROBE.format(modules=modules, heavy=DENIED_MODULES)
+    output = subprocess.run(
+        [sys.executable, '-c', probe],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout.splitlines()
+
+    elapsed = float(output[0])
+    heavy = [name for name in output[1].split(',') if name] if len(output) > 1 else []
+
+    print(f"导入 {', '.join(modules)} 耗时 {elapsed:.1f}ms")
+    if heavy:
+        print(f"[FAIL] 启动时加载了 {', '.join(heavy)}")
+        return 1
+    print("[OK] 启动时没有加载 " + ', '.join(DENIED_MODULES))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
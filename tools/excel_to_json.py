@@ -1,10 +1,15 @@
 
-import pandas as pd
 import json
+import os
 import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from sheet_reader import iter_sheet_rows
 
 def is_empty_value(value):
-    return pd.isna(value) or str(value).strip() in ('', 'nan')
+    return value is None or str(value).strip() in ('', 'nan')
 
 def parse_options(option_str):
     if is_empty_value(option_str):
@@ -35,9 +40,22 @@ def determine_question_type(row):
         return 'judge'
     return 'single'
 
-def convert_to_json_format(df):
+def iter_sheet_records(excel_path):
+    """逐行读取表格, 以{表头: 单元格文本}的形式产生每一行, 空单元格为空字符串"""
+    rows = iter_sheet_rows(excel_path)
+    header = next(rows, None)
+    if header is None:
+        return
+    columns = ['' if name is None else str(name) for name in header]
+    for row in rows:
+        yield {
+            col: '' if value is None else str(value)
+            for col, value in zip(columns, row)
+        }
+
+def convert_to_json_format(records):
     result = []
-    for _, row in df.iterrows():
+    for row in records:
         if is_empty_value(row.get('题目')):
             continue
             
@@ -53,8 +71,7 @@ def convert_to_json_format(df):
 
 def excel_to_json(excel_path, json_path):
     try:
-        df = pd.read_excel(excel_path, dtype='str').fillna('')
-        json_data = convert_to_json_format(df)
+        json_data = convert_to_json_format(iter_sheet_records(excel_path))
         with open(json_path, 'w', encoding='utf-8') as f:
             json.dump(json_data, f, ensure_ascii=False, indent=2)
         print(f"转换成功，共处理 {len(json_data)} 条数据")
@@ -0,0 +1,50 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bank_cache import BankCache
+from paper_generator import write_papers
+from quiz_db import QuizDatabase
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='从题库批量生成随机试卷和答案')
+    parser.add_argument('quiz_name', help='题库名称')
+    parser.add_argument('--count', type=int, default=100, help='试卷份数')
+    parser.add_argument('--questions', type=int, default=30, help='每份试卷的题目数')
+    parser.add_argument('--seed', default='0', help='随机种子, 相同的种子生成相同的试卷')
+    parser.add_argument('--db', default='data/quiz.db', help='数据库路径')
+    parser.add_argument('--out', default='papers', help='输出文件前缀')
+    args = parser.parse_args(argv)
+
+    papers_path = f"{args.out}_papers.jsonl"
+    keys_path = f"{args.out}_keys.jsonl"
+    db = QuizDatabase(args.db, cache=BankCache(max_bytes=0))
+    try:
+        start = time.perf_counter()
+        count = write_papers(
+            db, args.quiz_name, args.count, args.questions,
+            papers_path, keys_path,
+            seed=args.seed,
+            progress_callback=lambda n: print(f"\r已生成 {n} 份", end='', flush=True)
+        )
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+
+    if not count:
+        print(f"题库 '{args.quiz_name}' 不存在或没有题目")
+        return 1
+    if count < args.count:
+        print(f"\n题库太小, 只能生成 {count} 份不同的试卷")
+    print(f"\n共 {count} 份试卷, 用时 {elapsed:.2f}s ({count / elapsed:.0f} 份/秒)")
+    print(f"试卷: {papers_path}")
+    print(f"答案: {keys_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
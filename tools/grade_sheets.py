@@ -0,0 +1,52 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bank_cache import BankCache
+from batch_grader import SHEET_BATCH_SIZE, grade_sheets, iter_sheets
+from quiz_db import QuizDatabase
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='按题库批量判分纸质考试答题卡')
+    parser.add_argument('sheets', help='答题卡文件(.jsonl或.csv)')
+    parser.add_argument('quiz_name', help='题库名称')
+    parser.add_argument('--db', default='data/quiz.db', help='数据库路径')
+    parser.add_argument('--out', default='grades', help='输出文件前缀')
+    parser.add_argument('--workers', type=int, default=None, help='判分进程数, 默认为CPU核数')
+    parser.add_argument('--batch-size', type=int, default=SHEET_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    db = QuizDatabase(args.db, cache=BankCache(max_bytes=0))
+    try:
+        answer_key = db.get_answer_key(args.quiz_name)
+    finally:
+        db.close()
+    if not answer_key:
+        print(f"题库 '{args.quiz_name}' 不存在或没有题目")
+        return 1
+
+    student_output = f"{args.out}_students.csv"
+    question_output = f"{args.out}_questions.csv"
+    start = time.perf_counter()
+    count = grade_sheets(
+        answer_key,
+        iter_sheets(args.sheets),
+        student_output,
+        question_output,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        progress_callback=lambda n: print(f"\r已判分 {n} 份", end='', flush=True)
+    )
+    elapsed = time.perf_counter() - start
+    print(f"\n共 {count} 份答题卡, 用时 {elapsed:.2f}s ({count / elapsed:.0f} 份/秒)")
+    print(f"考生成绩: {student_output}")
+    print(f"每题统计: {question_output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,66 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from blueprint import allocate
+from quiz_db import QuizDatabase
+
+
+def parse_pairs(text, value_type):
+    """把"single=20,multi=5"解析为有序字典"""
+    pairs = {}
+    for item in text.split(','):
+        key, _, value = item.rpartition('=')
+        if not key:
+            raise argparse.ArgumentTypeError(f"格式错误: {item}, 应为 名称=数值")
+        pairs[key.strip()] = value_type(value)
+    return pairs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='管理组卷方案')
+    parser.add_argument('--db', default='data/quiz.db', help='数据库路径')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    save = commands.add_parser('save', help='保存方案, 例如: save 期末 --types single=20,multi=5,judge=5 --banks 题库A=0.6,题库B=0.4')
+    save.add_argument('name')
+    save.add_argument('--types', required=True, type=lambda t: parse_pairs(t, int))
+    save.add_argument('--banks', required=True, type=lambda t: parse_pairs(t, float))
+
+    commands.add_parser('list', help='列出所有方案')
+
+    delete = commands.add_parser('delete', help='删除方案')
+    delete.add_argument('name')
+
+    args = parser.parse_args(argv)
+    db = QuizDatabase(args.db)
+    try:
+        if args.command == 'save':
+            spec = db.save_blueprint(args.name, args.types, args.banks)
+            missing = [bank for bank in spec['banks'] if db.get_quiz_info(bank) is None]
+            if missing:
+                print(f"警告: 题库不存在: {', '.join(missing)}")
+            for (q_type, bank), count in allocate(spec).items():
+                print(f"  {bank} / {q_type}: {count} 题")
+            print(f"已保存组卷方案 '{args.name}'")
+        elif args.command == 'list':
+            for name in db.get_blueprint_names():
+                spec = db.get_blueprint(name)
+                types = ', '.join(f"{t}={n}" for t, n in spec['types'].items())
+                banks = ', '.join(f"{b}={w:.0%}" for b, w in spec['banks'].items())
+                print(f"{name}: {types}; {banks}")
+        else:
+            db.delete_blueprint(args.name)
+            print(f"已删除组卷方案 '{args.name}'")
+    except ValueError as e:
+        print(f"保存失败: {e}")
+        return 1
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+按权重随机抽样的树状数组(Fenwick tree)。
+
+修改单个权重、按权重抽取一个位置都是O(log n), 适合权重随作答不断变化的场景。
+"""
+
+
+class FenwickSampler:
+    def __init__(self, weights=()):
+        self.weights = [float(w) for w in weights]
+        size = len(self.weights)
+        self._tree = [0.0] * (size + 1)
+        for i in range(1, size + 1):
+            self._tree[i] += self.weights[i - 1]
+            parent = i + (i & -i)
+            if parent <= size:
+                self._tree[parent] += self._tree[i]
+
+    def __len__(self):
+        return len(self.weights)
+
+    def prefix_sum(self, count):
+        """前count个位置的权重之和"""
+        total = 0.0
+        while count > 0:
+            total += self._tree[count]
+            count -= count & -count
+        return total
+
+    @property
+    def total(self):
+        return self.prefix_sum(len(self.weights))
+
+    def append(self, weight):
+        """追加一个位置, 返回它的下标"""
+        index = len(self.weights) + 1
+        self.weights.append(float(weight))
+        # 新节点覆盖(index - lowbit, index]区间
+        covered = self.prefix_sum(index - 1) - self.prefix_sum(index - (index & -index))
+        self._tree.append(covered + weight)
+        return index - 1
+
+    def update(self, position, weight):
+        delta = float(weight) - self.weights[position]
+        self.weights[position] = float(weight)
+        index = position + 1
+        while index < len(self._tree):
+            self._tree[index] += delta
+            index += index & -index
+
+    def find(self, value):
+        """返回前缀和首次超过value的位置"""
+        position = 0
+        step = 1 << (len(self.weights).bit_length())
+        while step:
+            next_position = position + step
+            if next_position < len(self._tree) and self._tree[next_position] <= value:
+                position = next_position
+                value -= self._tree[next_position]
+            step >>= 1
+        return min(position, len(self.weights) - 1)
+
+    def sample(self, rng):
+        total = self.total
+        if total <= 0:
+            return None
+        position = self.find(rng.random() * total)
+        if self.weights[position] > 0:
+            return position
+        # 浮点误差可能落到权重为0的位置上, 改用最近的有效位置
+        for candidate in range(position + 1, len(self.weights)):
+            if self.weights[candidate] > 0:
+                return candidate
+        for candidate in range(position - 1, -1, -1):
+            if self.weights[candidate] > 0:
+                return candidate
+        return None
+
+    def sample_distinct(self, k, rng):
+        """不放回地抽取至多k个位置, 抽中的位置暂时置零, 结束后恢复"""
+        picked = []
+        try:
+            while len(picked) < k:
+                position = self.sample(rng)
+                if position is None:
+                    break
+                picked.append((position, self.weights[position]))
+                self.update(position, 0.0)
+        finally:
+            for position, weight in reversed(picked):
+                self.update(position, weight)
+        return [position for position, _ in picked]
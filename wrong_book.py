@@ -0,0 +1,105 @@
+"""
+错题本的内存抽样索引。
+
+错题记录保存在wrong_answers表中, 这里只保存每道错题的id和权重, 不加载题目内容。
+权重 = 答错次数 * 2 ^ ((最近答错时间 - 基准时间) / 半衰期), 即越久以前答错的题权重越低;
+指数衰减只取决于时间差, 不需要随时间重新计算所有权重。
+读写两个数据库连接共用同一个错题本, 写线程保存交卷记录后同步更新。
+"""
+import threading
+
+from weighted_sampler import FenwickSampler
+
+HALF_LIFE_SECONDS = 7 * 24 * 3600
+# 与基准时间相差过多个半衰期时重建, 避免权重溢出
+MAX_HALF_LIVES = 64
+
+
+class WrongAnswerBook:
+    def __init__(self, half_life=HALF_LIFE_SECONDS):
+        self.half_life = half_life
+        self._lock = threading.Lock()
+        self.loaded = False
+        self.generation = 0
+        self._reset([])
+
+    def _reset(self, entries):
+        self._base_time = max((missed_at for _, _, missed_at in entries), default=0.0)
+        self._slots = {}
+        self._free_slots = []
+        self._ids = []
+        weights = []
+        for question_id, miss_count, missed_at in entries:
+            self._slots[question_id] = len(self._ids)
+            self._ids.append(question_id)
+            weights.append(self._weight(miss_count, missed_at))
+        self._sampler = FenwickSampler(weights)
+
+    def _weight(self, miss_count, missed_at):
+        return miss_count * 2.0 ** ((missed_at - self._base_time) / self.half_life)
+
+    def load(self, entries, generation):
+        """
+        entries为(题目id, 答错次数, 最近答错时间)的列表, generation为读取前的generation。
+        读取期间写线程修改过错题本时, 这次的数据仍可用于抽题, 但下次抽题会重新加载。
+        """
+        with self._lock:
+            self._reset(list(entries))
+            self.loaded = generation == self.generation
+
+    def touch(self):
+        """写线程修改wrong_answers表后调用"""
+        with self._lock:
+            self.generation += 1
+
+    def invalidate(self):
+        """题库被替换或删除后调用, 下次抽题时重新加载"""
+        with self._lock:
+            self.generation += 1
+            self.loaded = False
+            self._reset([])
+
+    def __len__(self):
+        with self._lock:
+            return len(self._slots)
+
+    def apply(self, question_id, miss_count, missed_at):
+        """同步一道题的最新状态, miss_count为0时移出错题本"""
+        with self._lock:
+            if not self.loaded:
+                return
+            if miss_count > 0 and (missed_at - self._base_time) / self.half_life > MAX_HALF_LIVES:
+                self._rebase(missed_at)
+
+            slot = self._slots.get(question_id)
+            if miss_count <= 0:
+                if slot is not None:
+                    self._sampler.update(slot, 0.0)
+                    self._ids[slot] = None
+                    self._free_slots.append(slot)
+                    del self._slots[question_id]
+                return
+
+            weight = self._weight(miss_count, missed_at)
+            if slot is None:
+                if self._free_slots:
+                    slot = self._free_slots.pop()
+                    self._ids[slot] = question_id
+                    self._sampler.update(slot, weight)
+                else:
+                    slot = self._sampler.append(weight)
+                    self._ids.append(question_id)
+                self._slots[question_id] = slot
+            else:
+                self._sampler.update(slot, weight)
+
+    def _rebase(self, new_base_time):
+        scale = 2.0 ** ((self._base_time - new_base_time) / self.half_life)
+        weights = [w * scale for w in self._sampler.weights]
+        self._base_time = new_base_time
+        self._sampler = FenwickSampler(weights)
+
+    def sample(self, k, rng):
+        """按权重不放回地抽取至多k道错题的id"""
+        with self._lock:
+            return [self._ids[slot] for slot in self._sampler.sample_distinct(k, rng)]